@@ -0,0 +1,87 @@
+"""
+This file contains a benchmark of the numbers of the game: BigNumber against mpmath's mpf, which the game used before.
+Run it from the root of the repository with 'python benchmarks/benchmark_big_number.py' (mpmath is required).
+"""
+
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+from mpmath import mpf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ollama_cli_board_game.ollama_cli_board_game import BigNumber, triangular
+
+
+# Number type -> (number from an int, 10 ** n), written the way the game computes with each of them.
+NUMBER_TYPES: dict = {
+    "mpf": (lambda n: mpf(n), lambda n: mpf("10") ** n),
+    "BigNumber": (lambda n: BigNumber(n), lambda n: BigNumber.power_of_ten(n)),
+}
+
+
+def time_operation(operation, repeat, number):
+    # type: (callable, int, int) -> float
+    # Returning the best time of a single call in microseconds.
+    return min(timeit.repeat(operation, repeat=repeat, number=number)) / number * 1e6
+
+
+def benchmark_number_type(name, seed, repeat, number):
+    # type: (str, int, int, int) -> dict
+    from_int, power_of_ten = NUMBER_TYPES[name]
+    rng: random.Random = random.Random(seed)
+    gold_cost = power_of_ten(rng.randint(5, 2000))
+    gold = from_int(1000000)
+    exp = from_int(0)
+    required_exp = from_int(1000000)
+    gold_per_turn = gold_cost / power_of_ten(3)
+    exp_per_turn = gold_cost / power_of_ten(5)
+    reward_exponents: list = [rng.randint(1000, 100000) for _ in range(number)]
+    reward = power_of_ten(100000)
+    level: int = 5
+
+    def place_level_up():
+        return gold_cost * power_of_ten(triangular(level))
+
+    def add_reward():
+        return gold + reward
+
+    def turn():
+        # Turn reward, a random reward and the level up of a place, as played on every turn of a game.
+        new_gold = gold + gold_per_turn
+        new_exp = exp + exp_per_turn
+        random_exponent: int = reward_exponents[rng.randrange(len(reward_exponents))]
+        new_gold += power_of_ten(random_exponent)
+        new_exp += power_of_ten(random_exponent)
+        new_exp >= required_exp
+        new_cost = gold_cost * power_of_ten(triangular(level + 1))
+        new_gold_per_turn = gold_per_turn * power_of_ten(triangular(level + 1) - 1)
+        new_exp_per_turn = exp_per_turn * power_of_ten(triangular(level + 1) - 1)
+        return new_gold, new_exp, new_cost, new_gold_per_turn, new_exp_per_turn
+
+    return {"place_level_up_us": time_operation(place_level_up, repeat, number),
+            "add_reward_us": time_operation(add_reward, repeat, number),
+            "turn_us": time_operation(turn, repeat, number),
+            "bytes_per_value": sys.getsizeof(gold_cost)}
+
+
+def main():
+    # type: () -> int
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Compares BigNumber with mpmath's mpf.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="timings taken of every operation, the best is kept")
+    parser.add_argument("--number", type=int, default=2000, help="calls of an operation in a timing")
+    args: argparse.Namespace = parser.parse_args()
+    res: dict = {name: benchmark_number_type(name, args.seed, args.repeat, args.number) for name in NUMBER_TYPES}
+    res["speedup"] = {key: res["mpf"][key] / res["BigNumber"][key] for key in res["mpf"] if key.endswith("_us")}
+    print(json.dumps(res, indent=4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+This file contains a benchmark of saving and loading games: the binary save format, with and without compression
+and loaded eagerly or lazily, against the first version of the game, which pickled the whole game with mpmath
+numbers. The saved games of the first version are written with the classes in tests/legacy_game.py.
+Run it from the root of the repository with 'python benchmarks/benchmark_saves.py' (mpmath is required).
+"""
+
+
+import argparse
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests"))
+
+import legacy_game
+from ollama_cli_board_game.ollama_cli_board_game import SavedGameData, load_game_data, save_game_data
+
+
+def create_benchmark_game(tile_count, seed):
+    # type: (int, int) -> legacy_game.SavedGameData
+    # Returning a game of the first version in which the players own every other place, some of them acquired from
+    # the other player, and a few upgrades.
+    rng: random.Random = random.Random(seed)
+    game_data: legacy_game.SavedGameData = legacy_game.create_legacy_game("BENCHMARK", seed, tile_count)
+    players: list = [game_data.player_data, game_data.ai_player]
+    for i, place in enumerate(legacy_game.get_places(game_data)[::2]):
+        players[i % 2].buy_place(place)
+        if rng.random() < 0.1:
+            players[(i + 1) % 2].acquire_place(place, players[i % 2])
+
+    upgrade_shop: legacy_game.UpgradeShop = next(tile for tile in game_data.board.get_tiles()
+                                                 if isinstance(tile, legacy_game.UpgradeShop))
+    for upgrade in upgrade_shop.get_upgrades_sold()[:4]:
+        players[rng.randint(0, 1)].buy_upgrade(upgrade)
+
+    game_data.turn = 1000
+    return game_data
+
+
+def save_legacy_game_data(game_data, file_name):
+    # type: (legacy_game.SavedGameData, str) -> None
+    with open(file_name, "wb") as f:
+        pickle.dump(game_data, f)
+
+
+def load_legacy_game_data(file_name):
+    # type: (str) -> legacy_game.SavedGameData
+    with open(file_name, "rb") as f:
+        return pickle.load(f)
+
+
+def time_call(function, repeat):
+    # type: (callable, int) -> float
+    # Returning the best time of a call in milliseconds.
+    best: float = float("inf")
+    for _ in range(repeat):
+        start_time: float = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start_time)
+
+    return best * 1000
+
+
+def benchmark_saves(tile_count, seed, repeat):
+    # type: (int, int, int) -> dict
+    legacy_game_data: legacy_game.SavedGameData = create_benchmark_game(tile_count, seed)
+    res: dict = {"tile_count": tile_count}
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_file_name: str = os.path.join(directory, "legacy")
+        save_legacy_game_data(legacy_game_data, legacy_file_name)
+        # The same game in the current version, as importing the saved game of the first version makes it.
+        game_data: SavedGameData = load_game_data(legacy_file_name)
+        formats: dict = {
+            "legacy_pickle": (lambda file_name: save_legacy_game_data(legacy_game_data, file_name),
+                              load_legacy_game_data),
+            "legacy_import": (lambda file_name: save_legacy_game_data(legacy_game_data, file_name),
+                              lambda file_name: load_game_data(file_name)),
+            "binary": (lambda file_name: save_game_data(game_data, file_name, compress=False),
+                       lambda file_name: load_game_data(file_name)),
+            "binary_lazy": (lambda file_name: save_game_data(game_data, file_name, compress=False),
+                            lambda file_name: load_game_data(file_name, lazy=True)),
+            "binary_zlib": (lambda file_name: save_game_data(game_data, file_name, compress=True),
+                            lambda file_name: load_game_data(file_name)),
+        }
+        for name, (save, load) in formats.items():
+            file_name: str = os.path.join(directory, name)
+            res[name] = {"save_ms": time_call(lambda: save(file_name), repeat),
+                         "load_ms": time_call(lambda: load(file_name), repeat),
+                         "size_kb": os.path.getsize(file_name) / 1024}
+
+    return res
+
+
+def main():
+    # type: () -> int
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Compares the ways of saving games.")
+    parser.add_argument("--tiles", type=int, default=800, help="tiles on the board of the saved game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20, help="timings taken of every operation, the best is kept")
+    args: argparse.Namespace = parser.parse_args()
+    print(json.dumps(benchmark_saves(args.tiles, args.seed, args.repeat), indent=4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,20 +10,42 @@ Author: SoftwareApkDev
 # Importing necessary libraries
 
 
-import sys
 import time
+
+STARTUP_TIME: float = time.perf_counter()
+
+import sys
+import argparse
+import array
+import math
 import uuid
 import pickle
 import copy
-from langchain_ollama import OllamaLLM
 import random
 import os
-from functools import reduce
+import shutil
+import tempfile
+import bisect
+import mmap
+import struct
+import zlib
+from functools import reduce, lru_cache
+from decimal import Decimal, localcontext, MAX_EMAX, MIN_EMIN
 import subprocess
-
-from mpmath import mp, mpf
-
-mp.pretty = True
+import json
+import re
+import threading
+import urllib.request
+import http.client
+import queue
+import urllib.parse
+from collections import deque
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# mpmath is only imported to convert the numbers in saved games of older versions.
+# numpy is only imported by the batch movement kernel of the balance simulator.
 
 
 # Creating static variables to be used throughout the game.
@@ -33,105 +55,3054 @@ LETTERS: str = "abcdefghijklmnopqrstuvwxyz"
 MODELS: list = ["llama3.2", "llama3.2:1b", "llama3.1", "llama3.1:70b", "llama3.1:405b", "phi3", "phi3:medium",
                 "gemma2:2b", "gemma2", "gemma2:27b", "mistral", "moondream", "neural-chat", "starling-lm", "codellama",
                 "llama2-uncensored", "llava", "solar"]
+PLACE_NAME_PROMPT: str = "Please enter a name of a jungle, mountain, pirate cove, lake, forest, desert, harbor, sea, " \
+                         "castle, island, or beach (include the place name only please)!"
+UPGRADE_NAME_PROMPT: str = "Please enter a good name of an upgrade (safe one word response only please)!"
+LLM_MAX_CONCURRENCY: int = 4  # maximum number of LLM requests in flight while generating the board
+LLM_CALL_TIMEOUT: float = 120.0  # seconds allowed for a single LLM request
+LLM_MAX_RETRIES: int = 2  # extra attempts made after a failed or timed out LLM request
+LLM_MAX_IN_FLIGHT: int = LLM_MAX_CONCURRENCY + 1  # requests the LLM client sends at once (workers + keep-alive)
+# errors of a failed LLM request (connection errors and timeouts are OSError), any other error is a bug
+LLM_REQUEST_ERRORS: tuple = (OSError, http.client.HTTPException, json.JSONDecodeError)
+LLM_STATS_WINDOW: int = 10000  # number of most recent request latencies kept for percentiles
+LLM_AI_DECISIONS: bool = False  # let the LLM make the decisions of the AI player (see LLMPolicy)
+LLM_DECISION_DEADLINE: float = 0.5  # seconds the AI player waits for the LLM before deciding at random
+LLM_DECISION_WORKERS: int = 2  # LLM requests for decisions of the AI player in flight at once
+LLM_DECISION_CACHE_SIZE: int = 4096  # decisions of the LLM kept by the signature of the situation they were made in
+LLM_DECISION_BUCKET_LIMIT: int = 6  # ratios in the signatures of decisions are rounded to powers of ten up to this
+AI_DIFFICULTY: str = "normal"  # "normal" decides at random, "hard" searches the next turns (see SearchPolicy)
+SEARCH_TIME_BUDGET: float = 0.05  # seconds the AI player searches before each decision on the "hard" difficulty
+SEARCH_MAX_DEPTH: int = 6  # turns searched ahead at most
+SEARCH_INCOME_TURNS: int = 10  # turns of income the gold of a player is worth when evaluating a searched game
+SEARCH_INCOME_WEIGHT: float = 0.1  # weight of the log10 of the income of a player when evaluating a searched game
+HISTORY_MAX_TURNS: int = 1000  # most recent turns which can be undone, older ones are forgotten
+NAME_BATCH_SIZE: int = 20  # number of names asked for in a single LLM request (1 asks for one name per request)
+MAX_NAME_LENGTH: int = 60
+CACHE_DIRECTORY: str = "../cache"
+SAVED_GAMES_DIRECTORY: str = "../saved"
+NAME_POOL_FILE_NAME: str = "name_pool.json"
+NAME_POOL_CAPACITY: int = 5000  # maximum number of names kept for each (model, prompt) pair
+NAME_POOL_MAX_AGE: float = 30 * 24 * 60 * 60  # seconds before a cached name is considered stale
+OLLAMA_HOST: str = os.environ.get("OLLAMA_HOST", "127.0.0.1:11434")
+MODEL_CHECK_TIMEOUT: float = 2.0  # seconds allowed for asking Ollama which models are installed
+MODEL_CHECK_TTL: float = 300.0  # seconds for which the list of installed models is cached
+MODEL_CHECK_CACHE_FILE_NAME: str = "installed_models.json"
+OLLAMA_KEEP_ALIVE: str = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")  # how long Ollama keeps the model loaded
+KEEP_ALIVE_INTERVAL: float = 600.0  # seconds between two keep-alive requests while the game is running
+STARTUP_TIME_TARGET: float = 0.25  # seconds from importing the game to showing the first prompt
+PROGRESS_REFRESH_INTERVAL: float = 0.1  # minimum seconds between two progress screens
+ANSI_CLEAR_SCREEN: str = "\033[H\033[2J"  # moves the cursor to the top left corner and clears the terminal
+ANSI_CLEAR_LINE: str = "\033[K"  # clears the rest of the line the cursor is on
+ANSI_CLEAR_BELOW: str = "\033[J"  # clears everything after the cursor
+RENDER_EVENT_COUNT: int = 6  # latest events shown under the stats of the players
+NUMBER_TEXT_CACHE_SIZE: int = 65536  # formatted big numbers kept for formatting them again
+ENTITY_TEXT_CACHE_SIZE: int = 65536  # texts of places, upgrades and players kept until they change
+COMPACT_SIGNIFICANT_DIGITS: int = 4  # significant digits of numbers in compact notation (scientific from 10 ** this)
+DETAIL_VIEWS: dict = {"MY PLACES": "Your places", "MY UPGRADES": "Your upgrades", "CPU PLACES": "CPU's places",
+                      "CPU UPGRADES": "CPU's upgrades"}  # command -> title of the pages listing what a player owns
+LAZY_BOARD_GENERATION: bool = True  # generate names of places only when the players get close to them
+LAZY_BOARD_LOOKAHEAD: int = 12  # tiles beyond dice range (1 - 6) prefetched ahead of each player
+LAZY_BOARD_WAIT_INTERVAL: float = 0.5  # seconds between two checks that the prefetcher is running while waiting
+SAVE_FILE_MAGIC: bytes = b"OCBGSAVE"
+SAVE_FILE_VERSION: int = 2
+# magic, version, flags, static table CRC32, state CRC32, static table offset and length, state offset and length
+SAVE_FILE_HEADER: struct.Struct = struct.Struct("<8sHHIIQQQQ")
+SAVE_FLAG_STATIC_COMPRESSED: int = 1
+SAVE_FLAG_STATE_COMPRESSED: int = 2
+SAVE_JSON_ENCODER: json.JSONEncoder = json.JSONEncoder(separators=(",", ":"))
+SAVE_COMPRESSION: bool = False  # compress saved games with zlib (smaller files, slower saving and loading)
+LAZY_BOARD_LOADING: bool = True  # map the tiles of a loaded game into memory and decode them only when needed
+LAZY_BOARD_CACHE_SIZE: int = 256  # decoded tiles kept in memory besides those which have changed since loading
+JOURNAL_FILE_SUFFIX: str = ".journal"  # appended to the name of a saved game to get the name of its turn journal
+JOURNAL_RECORD_HEADER: struct.Struct = struct.Struct("<II")  # length and CRC32 of a journal record
+JOURNAL_VERSION: int = 1
+SNAPSHOT_INTERVAL: int = 100  # turns between two full saves, the turns in between are appended to the journal
+REPLAY_FILE_SUFFIX: str = ".replay"  # appended to the name of a saved game to get the name of its replay trace
+REPLAY_VERSION: int = 2  # version 2 records the decisions of the AI player made by the LLM as well
+GAME_SEED_BITS: int = 63  # size of the seeds of new games
+CATALOG_FILE_NAME: str = ".catalog.json"  # index of the saved games, kept in the directory of the saved games
+CATALOG_PAGE_SIZE: int = 10  # saved games listed on one page of the LOAD GAME menu
+CATALOG_SORT_KEYS: dict = {"NAME": "player_name", "TURN": "turn", "LEVEL": "level", "GOLD": "gold_magnitude",
+                           "LAST PLAYED": "last_played", "SIZE": "file_size"}  # LOAD GAME menu option -> entry key
+CATALOG_REBUILD_WORKERS: int = os.cpu_count() or 1  # processes reading saved games when the catalog is rebuilt
+CATALOG_REBUILD_CHUNK_SIZE: int = 64  # saved games read by a worker process at a time
+SIMULATION_WORKERS: int = os.cpu_count() or 1  # processes playing simulated games
+SIMULATION_SAMPLE_INTERVAL: int = 100  # turns between two samples of the levels and gold of simulated players
+SIMULATION_MAX_CHUNK_SIZE: int = 16  # simulated games played by a worker process at a time
+MOVEMENT_KERNEL_MIN_P_VALUE: float = 0.001  # smallest p-value of compare_movement_kernel() deemed to move alike
+TILE_TYPE_COUNT: int = 5  # tile types are numbered from 0 (see TILE_TYPE of the tile classes)
+TILE_TYPE_NAMES: list = ["StartTile", "EmptySpace", "Place", "RandomRewardTile", "UpgradeShop"]  # by type
+LEGACY_SAVE_CLASSES: list = ["Board", "Tile", "StartTile", "EmptySpace", "Place", "RandomRewardTile", "UpgradeShop",
+                             "Upgrade", "Player", "AIPlayer", "SavedGameData"]
+
+
+startup_timings: dict = {}  # name of a startup milestone -> seconds since the game was imported
 
 
 # Creating static functions to be used throughout the game.
 
 
-def is_number(string: str) -> bool:
+def create_llm_client(model):
+    # type: (str) -> LLMClient
+    return LLMClient(OllamaBackend(model))
+
+
+def get_ollama_base_url():
+    # type: () -> str
+    host: str = OLLAMA_HOST.strip().rstrip("/")
+    if "://" not in host:
+        host = "http://" + host
+    return host
+
+
+def normalize_model_name(model):
+    # type: (str) -> str
+    return model if ":" in model else model + ":latest"
+
+
+def fetch_installed_models():
+    # type: () -> list
+    # Asking the Ollama server for its tags first and falling back to parsing the output of 'ollama list'.
+    try:
+        with urllib.request.urlopen(get_ollama_base_url() + "/api/tags", timeout=MODEL_CHECK_TIMEOUT) as response:
+            data: dict = json.loads(response.read().decode("utf-8"))
+        return [normalize_model_name(model.get("name", model.get("model", ""))) for model in data.get("models", [])]
+    except (OSError, ValueError, AttributeError):
+        pass  # fall back to the command line
+
+    try:
+        output: subprocess.CompletedProcess = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
+    except OSError:
+        return []
+
+    return [normalize_model_name(line.split()[0]) for line in output.stdout.splitlines()[1:] if line.strip() != ""]
+
+
+def is_model_installed(model):
+    # type: (str) -> bool
+    # Matching the exact model name (an untagged name means the 'latest' tag) against the installed models, which
+    # are cached for MODEL_CHECK_TTL seconds.
+    cache_file_name: str = os.path.join(CACHE_DIRECTORY, MODEL_CHECK_CACHE_FILE_NAME)
+    try:
+        with open(cache_file_name, "r", encoding="utf-8") as f:
+            cache: dict = json.load(f)
+        if cache["host"] == get_ollama_base_url() and 0 <= time.time() - cache["time"] <= MODEL_CHECK_TTL and \
+                normalize_model_name(model) in cache["models"]:
+            return True
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # ask Ollama
+
+    installed_models: list = fetch_installed_models()
+    try:
+        write_file_atomically(cache_file_name, json.dumps({"host": get_ollama_base_url(), "time": time.time(),
+                                                           "models": installed_models}).encode("utf-8"))
+    except OSError:
+        pass  # the list of installed models is only a cache
+
+    return normalize_model_name(model) in installed_models
+
+
+def is_number(value):
+    # type: (object) -> bool
     try:
-        mpf(string)
+        BigNumber(value)
         return True
-    except ValueError:
+    except (TypeError, ValueError):
         return False
 
 
+def big_number_magnitude(value):
+    # type: (BigNumber) -> int
+    # Returning the power of ten of a number of at least one, 0 for smaller numbers.
+    return math.floor(value.log10()) if value >= 1 else 0
+
+
 def triangular(n: int) -> int:
     return int(n * (n - 1) / 2)
 
 
-def mpf_sum_of_list(a_list: list) -> mpf:
-    return mpf(str(sum(mpf(str(elem)) for elem in a_list if is_number(str(elem)))))
+def big_number_sum_of_list(a_list):
+    # type: (list) -> BigNumber
+    return sum((BigNumber(elem) for elem in a_list if is_number(elem)), BigNumber(0))
+
+
+def big_number_product_of_list(a_list):
+    # type: (list) -> BigNumber
+    return reduce(lambda x, y: x * BigNumber(y) if is_number(y) else x, a_list, BigNumber(1))
+
+
+def generate_random_name(rng=None) -> str:
+    # Drawing from the given random number generator, or from the global one if none is given.
+    rng = random if rng is None else rng
+    res: str = ""  # initial value
+    name_length: int = rng.randint(3, 25)
+    for i in range(name_length):
+        res += LETTERS[rng.randint(0, len(LETTERS) - 1)]
+
+    return res.capitalize()
+
+
+def build_name_batch_prompt(prompt, count):
+    # type: (str, int) -> str
+    return str(prompt) + " Please give " + str(count) + " different answers, formatted as a JSON array of " \
+                                                         "strings only (no numbering and no explanations)."
+
+
+def parse_name_list(response):
+    # type: (str) -> list
+    # Reading the JSON array in the response first and falling back to one name per line.
+    candidates: list = []  # initial value
+    start: int = response.find("[")
+    end: int = response.rfind("]")
+    if 0 <= start < end:
+        try:
+            parsed = json.loads(response[start:end + 1])
+            if isinstance(parsed, list):
+                candidates = [elem for elem in parsed if isinstance(elem, str)]
+        except ValueError:
+            candidates = []
+
+    if len(candidates) == 0:
+        candidates = [re.sub(r"^\s*(?:[-*\u2022]|\d+[.):])\s*", "", line) for line in response.splitlines()]
+
+    res: list = []  # initial value
+    seen: set = set()  # initial value
+    for candidate in candidates:
+        name: str = candidate.strip().strip("\"',.").strip()
+        if name == "" or len(name) > MAX_NAME_LENGTH or name.lower() in seen:
+            continue
+
+        seen.add(name.lower())
+        res.append(name)
+
+    return res
+
+
+def invoke_llm_for_names(llm, prompt, count, used_names, lock, retries=LLM_MAX_RETRIES):
+    # type: (LLMClient, str, int, set, threading.Lock, int) -> list
+    res: list = []  # initial value
+    for attempt in range(retries + 1):
+        # Only asking again for the names which are still missing.
+        missing: int = count - len(res)
+        try:
+            if missing == 1:
+                names: list = [str(llm.invoke(prompt)).strip()]
+            else:
+                names = parse_name_list(str(llm.invoke(build_name_batch_prompt(prompt, missing))))
+        except LLM_REQUEST_ERRORS:
+            names = []  # ask again, the error is counted in the stats of the LLM client
+
+        with lock:
+            for name in names:
+                if len(res) < count and name != "" and name.lower() not in used_names:
+                    used_names.add(name.lower())
+                    res.append(name)
+
+        if len(res) == count:
+            return res
+
+    # Falling back to random names so that board generation never gets stuck on the LLM.
+    while len(res) < count:
+        res.append(generate_random_name())
+
+    with lock:
+        used_names.update(name.lower() for name in res)
+
+    return res
+
+
+def generate_llm_responses(llm, prompts, on_response, batch_size=NAME_BATCH_SIZE, max_workers=LLM_MAX_CONCURRENCY,
+                           used_names=None):
+    # type: (LLMClient, list, callable, int, int, set or None) -> None
+    # Grouping runs of identical prompts into batches of at most batch_size names, sending the batches concurrently
+    # and handing every name (with the index of its prompt) to on_response in the calling thread as soon as its
+    # batch arrives.
+    batches: list = []  # initial value
+    for i, prompt in enumerate(prompts):
+        if len(batches) > 0 and batches[-1][0] == prompt and batches[-1][2] < max(1, batch_size):
+            batches[-1][2] += 1
+        else:
+            batches.append([prompt, i, 1])
+
+    used_names = set() if used_names is None else used_names
+    lock: threading.Lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures: dict = {executor.submit(invoke_llm_for_names, llm, prompt, count, used_names, lock): start
+                         for prompt, start, count in batches}
+        for future in as_completed(futures):
+            for offset, name in enumerate(future.result()):
+                on_response(futures[future] + offset, name)
+
+
+def generate_names_with_pool(llm, model, name_pool, prompts, on_response, used_names=None):
+    # type: (LLMClient, str, NamePool, list, callable, set or None) -> None
+    # Drawing as many names as possible from the name pool and only asking the LLM for the rest. Names in used_names
+    # (lower case) are skipped and every name handed out is added to it.
+    missing_indices: list = []  # initial value
+    used_names = set() if used_names is None else used_names
+    for prompt in list(OrderedDict.fromkeys(prompts)):
+        indices: list = [i for i, elem in enumerate(prompts) if elem == prompt]
+        names: list = name_pool.draw(model, prompt, len(indices), used_names)
+        for index, name in zip(indices, names):
+            used_names.add(name.lower())
+            on_response(index, name)
+
+        missing_indices += indices[len(names):]
+
+    if len(missing_indices) > 0:
+        def on_missing_response(index, name):
+            # type: (int, str) -> None
+            name_pool.add(model, prompts[missing_indices[index]], name)
+            on_response(missing_indices[index], name)
+
+        generate_llm_responses(llm, [prompts[i] for i in missing_indices], on_missing_response, used_names=used_names)
+
+    if len(prompts) > 0:
+        # Saving the pool whenever names were handed out, drawn ones included, so that the next game continues
+        # from the least recently used names instead of drawing the same ones again.
+        name_pool.save()
+
+
+def get_placeholder_targets(tile):
+    # type: (Tile) -> list
+    # Returning (object, prompt) pairs for every name on the tile which has not been generated yet.
+    if isinstance(tile, Place) and tile.name is None:
+        return [(tile, PLACE_NAME_PROMPT)]
+    elif isinstance(tile, UpgradeShop):
+        return [(upgrade, UPGRADE_NAME_PROMPT) for upgrade in tile.get_upgrades_sold() if upgrade.name is None]
+    return []
+
+
+def write_file_atomically(file_name, data):
+    # type: (str, bytes) -> None
+    # Writing to a temporary file next to the destination first so that a crash never leaves a half written file.
+    # Every writer gets a temporary file of its own, as threads and processes may write the same file at once.
+    directory: str = os.path.dirname(os.path.abspath(file_name))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_file_name = tempfile.mkstemp(suffix=".tmp", prefix=os.path.basename(file_name) + ".",
+                                                       dir=directory)
+    try:
+        with os.fdopen(file_descriptor, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_file_name, file_name)
+    except BaseException:
+        try:
+            os.unlink(temp_file_name)
+        except OSError:
+            pass  # already replaced or removed
+        raise
+
+
+def convert_legacy_numbers(game_data):
+    # type: (SavedGameData) -> SavedGameData
+    # Replacing the mpf values in saved games of older versions with equal BigNumber values.
+    objects: list = [game_data, game_data.player_data, game_data.ai_player]
+    for player in [game_data.player_data, game_data.ai_player]:
+        objects += player.get_owned_list() + player.get_upgrade_list()
+
+    for tile in game_data.board.get_tiles():
+        objects.append(tile)
+        if isinstance(tile, UpgradeShop):
+            objects += tile.get_upgrades_sold()
+
+    for obj in objects:
+        for key, value in list(vars(obj).items()):
+            if hasattr(value, "_mpf_"):
+                setattr(obj, key, BigNumber(value))
+
+    return game_data
+
+
+def repair_owned_places(game_data):
+    # type: (SavedGameData) -> int
+    # Making the places owned by the players agree with the owners of the places. Older versions left an acquired
+    # place in the list of its previous owner too, which counted its income twice. Returning how many entries were
+    # repaired, the income of the players has to be recomputed afterwards.
+    players: list = [game_data.player_data, game_data.ai_player]
+    repaired: int = 0
+    for player in players:
+        for place in player.get_owned_list():
+            if place.owner is not player:
+                player.get_owned_places().remove(place)
+                repaired += 1
+
+    for _, tile in game_data.board.get_loaded_tiles():
+        if isinstance(tile, Place) and tile.owner is not None and tile not in tile.owner.get_owned_places():
+            if any(tile.owner is player for player in players):
+                tile.owner.get_owned_places().add(tile)
+            else:
+                tile.owner = None
+            repaired += 1
+
+    return repaired
+
+
+def import_legacy_game_data(file_name):
+    # type: (str) -> SavedGameData
+    # Importing a pickled saved game of an older version. Only the game's own classes and mpmath numbers can be
+    # unpickled, so a tampered file cannot run arbitrary code.
+    with open(file_name, "rb") as f:
+        game_data: SavedGameData = convert_legacy_numbers(LegacySaveUnpickler(f).load())
+
+    repair_owned_places(game_data)
+
+    # Games saved before they had seeds are given one.
+    game_data.seed = random.getrandbits(GAME_SEED_BITS)
+    game_data.rng = random.Random()
+    game_data.resume_random()
+    for player in [game_data.player_data, game_data.ai_player]:
+        player.recompute_income()
+
+    return game_data
+
+
+def encode_static_table(board):
+    # type: (Board) -> tuple
+    # Returning the static table of the board (tile types, names, descriptions and costs) together with the indices
+    # of its places and the (shop, upgrade) indices of its upgrades.
+    if isinstance(board, LazyBoard):
+        # The static table of a lazily loaded board is copied as it is, only the tiles decoded so far can differ.
+        upgrade_refs: dict = {id(upgrade): [i, j] for i, shop in enumerate(board.get_shops())
+                              for j, upgrade in enumerate(shop.get_upgrades_sold())}
+        return board.get_static_table(), {id(tile): i for i, tile in board.get_loaded_tiles()}, upgrade_refs
+
+    records: list = []  # initial value
+    shops: list = []  # initial value
+    shop_indices: dict = {}  # id(shop) -> shop index
+    tile_indices: dict = {}  # id(place) -> tile index
+    upgrade_refs: dict = {}  # id(upgrade) -> [shop index, upgrade index]
+    tiles: list or ArrayTileList = board.get_tiles()
+    for i, tile_type in enumerate(tiles.tile_types if isinstance(tiles, ArrayTileList) else
+                                  [tile.TILE_TYPE for tile in tiles]):
+        if tile_type == Place.TILE_TYPE and isinstance(tiles, ArrayTileList):
+            # Reading the arrays instead of creating a view of every place, only the views in use are indexed.
+            record: list = tiles.encode_record(i)
+            records.append(SAVE_JSON_ENCODER.encode(record).encode("utf-8"))
+            continue
+
+        tile: Tile = tiles[i]
+        if isinstance(tile, Place):
+            tile_indices[id(tile)] = i
+            record = [tile.TILE_TYPE, tile.name, tile.description, tile.gold_cost.to_json(),
+                      tile.gold_per_turn.to_json(), tile.exp_per_turn.to_json()]
+        elif isinstance(tile, UpgradeShop):
+            if id(tile) not in shop_indices:
+                shop_indices[id(tile)] = len(shops)
+                for j, upgrade in enumerate(tile.get_upgrades_sold()):
+                    upgrade_refs[id(upgrade)] = [len(shops), j]
+                shops.append(tile)
+            record = [tile.TILE_TYPE, shop_indices[id(tile)]]
+        else:
+            record = [tile.TILE_TYPE]
+        records.append(SAVE_JSON_ENCODER.encode(record).encode("utf-8"))
+
+    if isinstance(tiles, ArrayTileList):
+        tile_indices.update((id(tile), i) for i, tile in board.get_loaded_tiles())
+
+    upgrades: bytes = json.dumps([[[upgrade.name, upgrade.description, upgrade.gold_cost.to_json(),
+                                    upgrade.gold_gain_multiplier.to_json(), upgrade.exp_gain_multiplier.to_json()]
+                                   for upgrade in shop.get_upgrades_sold()] for shop in shops],
+                                 separators=(",", ":")).encode("utf-8")
+    offsets: list = [0]  # initial value
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    # Tile count, size of the upgrades, offsets of the tile records, tile records and upgrades.
+    data: bytes = struct.pack("<II", len(records), len(upgrades)) + struct.pack("<%dI" % len(offsets), *offsets) + \
+        b"".join(records) + upgrades
+    return data, tile_indices, upgrade_refs
+
+
+def decode_tile_record(record, shops):
+    # type: (list, list) -> Tile
+    if record[0] == Place.TILE_TYPE:
+        return Place(record[1], record[2], BigNumber.from_json(record[3]), BigNumber.from_json(record[4]),
+                     BigNumber.from_json(record[5]))
+    elif record[0] == UpgradeShop.TILE_TYPE:
+        return shops[record[1]]
+    elif record[0] == StartTile.TILE_TYPE:
+        return StartTile()
+    elif record[0] == EmptySpace.TILE_TYPE:
+        return EmptySpace()
+    elif record[0] == RandomRewardTile.TILE_TYPE:
+        return RandomRewardTile()
+    raise ValueError("Unknown tile type " + str(record[0]))
+
+
+def decode_upgrade_shops(data):
+    # type: (bytes) -> list
+    return [UpgradeShop([Upgrade(name, description, BigNumber.from_json(gold_cost),
+                                 BigNumber.from_json(gold_gain_multiplier), BigNumber.from_json(exp_gain_multiplier))
+                         for name, description, gold_cost, gold_gain_multiplier, exp_gain_multiplier in shop])
+            for shop in json.loads(data)]
+
+
+def decode_static_table(data):
+    # type: (bytes) -> tuple
+    # Returning the tiles (as an ArrayTileList) and the upgrade shops stored in a static table.
+    tile_count, upgrades_length = struct.unpack_from("<II", data, 0)
+    offsets: tuple = struct.unpack_from("<%dI" % (tile_count + 1), data, 8)
+    records_start: int = 8 + 4 * (tile_count + 1)
+    shops: list = decode_upgrade_shops(data[records_start + offsets[-1]:records_start + offsets[-1] + upgrades_length])
+    # Parsing all the tile records at once is much faster than parsing them one by one.
+    records: list = json.loads(b"[" + b",".join(data[records_start + offsets[i]:records_start + offsets[i + 1]]
+                                                for i in range(tile_count)) + b"]")
+    tiles: ArrayTileList = ArrayTileList()
+    for record in records:
+        tiles.append_record(record, shops)
+    return tiles, shops
+
+
+def encode_game_state(game_data, tile_indices, upgrade_refs):
+    # type: (SavedGameData, dict, dict) -> bytes
+    # Encoding everything that changes while playing: turn, players and the places which are owned or upgraded.
+    players: list = [game_data.player_data, game_data.ai_player]
+    places: list = []  # initial value
+    for i, tile in game_data.board.get_loaded_tiles():
+        if isinstance(tile, Place) and (tile.level != 1 or tile.owner is not None):
+            places.append([i, tile.level,
+                           None if tile.owner is None else [id(player) for player in players].index(id(tile.owner)),
+                           tile.gold_cost.to_json(), tile.gold_per_turn.to_json(), tile.exp_per_turn.to_json()])
+
+    # Sorting by tile index, as a lazily loaded board lists its tiles in the order they were decoded, so that the
+    # same game is always saved the same way.
+    places.sort(key=lambda place: place[0])
+    state: dict = {
+        "player_name": game_data.player_name,
+        "turn": game_data.turn,
+        "seed": game_data.seed,
+        "start_bonus": game_data.start_bonus.to_json(),
+        "players": [{
+            "player_id": player.player_id,
+            "name": player.name,
+            "level": player.level,
+            "location": player.location,
+            "gold": player.gold.to_json(),
+            "exp": player.exp.to_json(),
+            "required_exp": player.required_exp.to_json(),
+            "owned": [tile_indices[id(place)] for place in player.get_owned_places()],
+            "upgrades": [upgrade_refs[id(upgrade)] for upgrade in player.get_upgrade_list()]
+        } for player in players],
+        "places": places,
+        "names": [[i, name] for i, name in sorted(game_data.board.get_name_overrides().items())]
+    }
+    return json.dumps(state, separators=(",", ":")).encode("utf-8")
+
+
+def decode_game_state(data, board, shops):
+    # type: (bytes, Board, list) -> SavedGameData
+    state: dict = json.loads(data.decode("utf-8"))
+    tiles: list = board.get_tiles()
+    players: list = [Player(""), AIPlayer()]
+    # Changing the places before the players refer to them, so that a lazily loaded board keeps them decoded.
+    for i, level, owner, gold_cost, gold_per_turn, exp_per_turn in state["places"]:
+        place: Place = tiles[i]
+        place.level = level
+        place.owner = None if owner is None else players[owner]
+        place.gold_cost = BigNumber.from_json(gold_cost)
+        place.gold_per_turn = BigNumber.from_json(gold_per_turn)
+        place.exp_per_turn = BigNumber.from_json(exp_per_turn)
+
+    board.rename_places(dict(state.get("names", [])))
+
+    for player, player_state in zip(players, state["players"]):
+        player.player_id = player_state["player_id"]
+        player.name = player_state["name"]
+        player.level = player_state["level"]
+        player.location = player_state["location"]
+        player.gold = BigNumber.from_json(player_state["gold"])
+        player.exp = BigNumber.from_json(player_state["exp"])
+        player.required_exp = BigNumber.from_json(player_state["required_exp"])
+        for i in player_state["owned"]:
+            player.get_owned_places().add(tiles[i])
+        player.get_upgrade_list().extend(shops[i].get_upgrades_sold()[j] for i, j in player_state["upgrades"])
+
+    game_data: SavedGameData = SavedGameData(state["player_name"], BigNumber.from_json(state["start_bonus"]),
+                                             players[0], players[1], board, state.get("seed"))
+    game_data.turn = state["turn"]
+    repair_owned_places(game_data)
+    for player in players:
+        player.recompute_income()
+
+    return game_data
+
+
+def load_game_data(file_name, lazy=False):
+    # type: (str, bool) -> SavedGameData
+    with open(file_name, "rb") as f:
+        if lazy:
+            # Mapping the file instead of reading it, the pages of the tiles are only read once they are decoded.
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                data = b""  # an empty file cannot be mapped
+        else:
+            data = f.read()
+
+    if data[:len(SAVE_FILE_MAGIC)] != SAVE_FILE_MAGIC:
+        return import_legacy_game_data(file_name)
+
+    magic, version, flags, static_crc, state_crc, static_offset, static_length, state_offset, state_length = \
+        SAVE_FILE_HEADER.unpack_from(data, 0)
+    if version > SAVE_FILE_VERSION:
+        raise ValueError("Saved game data " + str(file_name) + " was written by a newer version of the game!")
+
+    state: bytes = data[state_offset:state_offset + state_length]
+    if zlib.crc32(memoryview(data)[static_offset:static_offset + static_length]) != static_crc or \
+            zlib.crc32(state) != state_crc:
+        raise ValueError("Saved game data " + str(file_name) + " is corrupted!")
+
+    state = zlib.decompress(state) if flags & SAVE_FLAG_STATE_COMPRESSED else state
+    if lazy and not flags & SAVE_FLAG_STATIC_COMPRESSED:
+        board: Board = LazyBoard(LazyTileList(data, static_offset, static_length))
+        return decode_game_state(state, board, board.get_shops())
+
+    static_table: bytes = data[static_offset:static_offset + static_length]
+    tiles, shops = decode_static_table(zlib.decompress(static_table) if flags & SAVE_FLAG_STATIC_COMPRESSED
+                                       else static_table)
+    return decode_game_state(state, ArrayBoard(tiles), shops)
+
+
+def encode_game_data(game_data, compress=None):
+    # type: (SavedGameData, bool or None) -> tuple
+    # Returning the contents of a saved game together with the indices of its places and upgrades.
+    compress = SAVE_COMPRESSION if compress is None else compress
+    static_table, tile_indices, upgrade_refs = encode_static_table(game_data.board)
+    state: bytes = encode_game_state(game_data, tile_indices, upgrade_refs)
+    flags: int = 0
+    if compress:
+        static_table, state = zlib.compress(static_table), zlib.compress(state)
+        flags |= SAVE_FLAG_STATIC_COMPRESSED | SAVE_FLAG_STATE_COMPRESSED
+
+    header: bytes = SAVE_FILE_HEADER.pack(SAVE_FILE_MAGIC, SAVE_FILE_VERSION, flags, zlib.crc32(static_table),
+                                          zlib.crc32(state), SAVE_FILE_HEADER.size, len(static_table),
+                                          SAVE_FILE_HEADER.size + len(static_table), len(state))
+    return header + static_table + state, tile_indices, upgrade_refs
+
+
+def save_game_data(game_data, file_name, compress=None):
+    # type: (SavedGameData, str, bool or None) -> None
+    write_file_atomically(file_name, encode_game_data(game_data, compress)[0])
+
+
+def encode_journal_record(record):
+    # type: (dict) -> bytes
+    data: bytes = SAVE_JSON_ENCODER.encode(record).encode("utf-8")
+    return JOURNAL_RECORD_HEADER.pack(len(data), zlib.crc32(data)) + data
+
+
+def read_journal_records(file_name):
+    # type: (str) -> list
+    # Returning every complete record of a journal. Reading stops at the first torn or corrupted record, which is
+    # what a crash in the middle of appending leaves behind.
+    try:
+        with open(file_name, "rb") as f:
+            data: bytes = f.read()
+    except FileNotFoundError:
+        return []
+
+    records: list = []  # initial value
+    offset: int = 0
+    while offset + JOURNAL_RECORD_HEADER.size <= len(data):
+        length, crc = JOURNAL_RECORD_HEADER.unpack_from(data, offset)
+        record: bytes = data[offset + JOURNAL_RECORD_HEADER.size:offset + JOURNAL_RECORD_HEADER.size + length]
+        if len(record) < length or zlib.crc32(record) != crc:
+            break
+
+        records.append(json.loads(record.decode("utf-8")))
+        offset += JOURNAL_RECORD_HEADER.size + length
+
+    return records
+
+
+def apply_journal_entry(game_data, entry, shops):
+    # type: (SavedGameData, dict, list) -> None
+    # Every value in an entry is absolute, so applying an entry twice is harmless.
+    players: list = [game_data.player_data, game_data.ai_player]
+    tiles: list = game_data.board.get_tiles()
+    game_data.turn = entry["turn"]
+    for i, level, location, gold, exp, required_exp in entry.get("players", []):
+        players[i].level = level
+        players[i].location = location
+        players[i].gold = BigNumber.from_json(gold)
+        players[i].exp = BigNumber.from_json(exp)
+        players[i].required_exp = BigNumber.from_json(required_exp)
+
+    for i, start, refs in entry.get("upgrades", []):
+        del players[i].get_upgrade_list()[start:]
+        players[i].get_upgrade_list().extend(shops[j].get_upgrades_sold()[k] for j, k in refs)
+
+    for i, level, owner, gold_cost, gold_per_turn, exp_per_turn in entry.get("places", []):
+        place: Place = tiles[i]
+        new_owner: Player or None = None if owner is None else players[owner]
+        if place.owner is not new_owner:
+            if place.owner is not None and place in place.owner.get_owned_places():
+                place.owner.get_owned_places().remove(place)
+            if new_owner is not None:
+                new_owner.get_owned_places().add(place)
+            place.owner = new_owner
+
+        place.level = level
+        place.gold_cost = BigNumber.from_json(gold_cost)
+        place.gold_per_turn = BigNumber.from_json(gold_per_turn)
+        place.exp_per_turn = BigNumber.from_json(exp_per_turn)
+
+    game_data.board.rename_places(dict(entry.get("names", [])))
+
+    for i, j, name in entry.get("upgrade_names", []):
+        shops[i].get_upgrades_sold()[j].name = name
+
+
+def recover_game_data(file_name, lazy=LAZY_BOARD_LOADING):
+    # type: (str, bool) -> SavedGameData
+    # Loading the latest full save and replaying the turns journaled after it.
+    game_data: SavedGameData = load_game_data(file_name, lazy)
+    records: list = read_journal_records(file_name + JOURNAL_FILE_SUFFIX)
+    if len(records) == 0 or records[0].get("version") != JOURNAL_VERSION or \
+            records[0].get("player_id") != game_data.player_data.player_id:
+        return game_data
+
+    shops: list = game_data.board.get_shops()
+    replayed: bool = False
+    for entry in records[1:]:
+        # A crash between writing a full save and starting its journal leaves the previous journal behind.
+        if entry["turn"] > game_data.turn:
+            apply_journal_entry(game_data, entry, shops)
+            replayed = True
+
+    if replayed:
+        for player in [game_data.player_data, game_data.ai_player]:
+            player.recompute_income()
+
+    return game_data
+
+
+def summarise_game_data(game_data):
+    # type: (SavedGameData) -> dict
+    # Returning what the catalog of saved games shows about a game.
+    return {"player_name": game_data.player_name, "turn": game_data.turn, "level": game_data.player_data.level,
+            "gold_magnitude": big_number_magnitude(game_data.player_data.gold)}
+
+
+def read_save_summary(file_name):
+    # type: (str) -> dict
+    # Summarising a saved game from its state section and journal alone, without decoding its board. This runs in
+    # the worker processes rebuilding the catalog.
+    with open(file_name, "rb") as f:
+        header: bytes = f.read(SAVE_FILE_HEADER.size)
+        if not header.startswith(SAVE_FILE_MAGIC):
+            summary: dict = summarise_game_data(import_legacy_game_data(file_name))
+        else:
+            magic, version, flags, static_crc, state_crc, static_offset, static_length, state_offset, state_length = \
+                SAVE_FILE_HEADER.unpack(header)
+            f.seek(state_offset)
+            state: bytes = f.read(state_length)
+            if zlib.crc32(state) != state_crc:
+                raise ValueError("Saved game data " + str(file_name) + " is corrupted!")
+
+            state_data: dict = json.loads(zlib.decompress(state) if flags & SAVE_FLAG_STATE_COMPRESSED else state)
+            player_state: dict = state_data["players"][0]
+            gold: BigNumber = BigNumber.from_json(player_state["gold"])
+            summary = {"player_name": state_data["player_name"], "turn": state_data["turn"],
+                       "level": player_state["level"], "gold_magnitude": big_number_magnitude(gold)}
+            records: list = read_journal_records(file_name + JOURNAL_FILE_SUFFIX)
+            if len(records) > 0 and records[0].get("player_id") == player_state["player_id"]:
+                for entry in records[1:]:
+                    if entry["turn"] > summary["turn"]:
+                        summary["turn"] = entry["turn"]
+                        for i, level, location, gold_json, exp, required_exp in entry.get("players", []):
+                            if i == 0:
+                                gold = BigNumber.from_json(gold_json)
+                                summary["level"] = level
+                                summary["gold_magnitude"] = big_number_magnitude(gold)
+
+    summary["file_size"] = os.path.getsize(file_name)
+    summary["last_played"] = max(os.path.getmtime(file_name), os.path.getmtime(file_name + JOURNAL_FILE_SUFFIX)
+                                 if os.path.exists(file_name + JOURNAL_FILE_SUFFIX) else 0.0)
+    return summary
+
+
+def read_save_summaries(file_names):
+    # type: (list) -> list
+    # Summarising a chunk of saved games in a worker process, None for every saved game which cannot be read.
+    res: list = []  # initial value
+    for file_name in file_names:
+        try:
+            res.append(read_save_summary(file_name))
+        except (OSError, ValueError, KeyError, TypeError, EOFError, pickle.UnpicklingError):
+            res.append(None)
+
+    return res
+
+
+def rebuild_catalog():
+    # type: () -> int
+    """
+    This function rebuilds the catalog of the saved games by reading every saved game in parallel. The directory of
+    the saved games can be given as the first argument.
+    :return: an integer
+    """
+    directory: str = sys.argv[1] if len(sys.argv) > 1 else SAVED_GAMES_DIRECTORY
+    start_time: float = time.perf_counter()
+    catalog: SaveCatalog = SaveCatalog(os.path.join(directory, CATALOG_FILE_NAME))
+    failed: list = catalog.rebuild(directory)
+    catalog.save()
+    for file_name in failed:
+        print("Cannot read saved game data " + str(file_name) + "!")
+
+    print(str(len(catalog)) + " saved games catalogued in " + str(round(time.perf_counter() - start_time, 2)) +
+          " seconds.")
+    return 0 if len(failed) == 0 else 1
+
+
+def list_saved_games(directory):
+    # type: (str) -> list
+    # Returning the names of the saved games, leaving out their journals, replay traces and unfinished temporary
+    # files.
+    return [f for f in os.listdir(directory) if not f.startswith(".") and not f.endswith(JOURNAL_FILE_SUFFIX)
+            and not f.endswith(REPLAY_FILE_SUFFIX) and not f.endswith(".tmp")]
+
+
+# Creating the turn engine, which applies the rules of the game without any input or output so that games can be
+# played by the CLI and simulated alike.
+
+
+def start_turn(game_data):
+    # type: (SavedGameData) -> Player
+    # Starting the next turn and granting its income to the player whose turn it is, the player on odd turns and
+    # the AI player on even turns.
+    game_data.turn += 1
+    player: Player = game_data.player_data if game_data.turn % 2 == 1 else game_data.ai_player
+    player.gain_turn_reward()
+    return player
+
+
+def move_player(game_data, player):
+    # type: (SavedGameData, Player) -> int
+    # Rolling the dice for the player, returning the value rolled.
+    return player.roll_dice(game_data)
+
+
+def resolve_nothing(game_data, player, tile, policy):
+    # type: (SavedGameData, Player, Tile, DecisionPolicy) -> list
+    return []
+
+
+def resolve_place(game_data, player, tile, policy):
+    # type: (SavedGameData, Player, Place, DecisionPolicy) -> list
+    owner: Player or None = tile.owner
+    if owner is None:
+        if policy.decide_buy_place(game_data, player, tile):
+            return [TurnEvent(TurnEvent.BUY_PLACE, tile, player.buy_place(tile))]
+    elif owner is player:
+        if policy.decide_upgrade_place(game_data, player, tile):
+            return [TurnEvent(TurnEvent.UPGRADE_PLACE, tile, player.upgrade_place(tile))]
+    else:
+        if policy.decide_acquire_place(game_data, player, tile):
+            return [TurnEvent(TurnEvent.ACQUIRE_PLACE, tile, player.acquire_place(tile, owner))]
+
+    return []
+
+
+def resolve_random_reward_tile(game_data, player, tile, policy):
+    # type: (SavedGameData, Player, RandomRewardTile, DecisionPolicy) -> list
+    random_reward: RandomReward = RandomReward(game_data.rng)
+    player.get_random_reward(random_reward)
+    return [TurnEvent(TurnEvent.RANDOM_REWARD, random_reward, True)]
+
+
+def resolve_upgrade_shop(game_data, player, tile, policy):
+    # type: (SavedGameData, Player, UpgradeShop, DecisionPolicy) -> list
+    upgrade: Upgrade or None = policy.choose_upgrade(game_data, player, tile)
+    if upgrade is not None:
+        return [TurnEvent(TurnEvent.BUY_UPGRADE, upgrade, player.buy_upgrade(upgrade))]
+
+    return []
+
+
+TILE_RESOLVERS: list = [resolve_nothing, resolve_nothing, resolve_place, resolve_random_reward_tile,
+                        resolve_upgrade_shop]  # TILE_TYPE -> function applying a tile of that type
+
+
+def resolve_tile(game_data, player, policy):
+    # type: (SavedGameData, Player, DecisionPolicy) -> list
+    # Applying the tile the player has landed on with the decisions of the policy, returning what has happened.
+    # The tile is dispatched on its type code, which an ArrayBoard reads without creating the tile.
+    board: Board = game_data.board
+    location: int = player.location
+    resolver = TILE_RESOLVERS[board.get_tile_type(location)]
+    if resolver is resolve_nothing:
+        return []
+
+    return resolver(game_data, player, board.get_tiles()[location], policy)
+
+
+def create_new_game(player_name, settings, seed=None):
+    # type: (str, GameSettings, int or None) -> tuple
+    # Returning a new game laid out with the given settings together with its places and upgrades, whose names are
+    # left to be generated. The same seed lays out the same game.
+    seed = random.getrandbits(GAME_SEED_BITS) if seed is None else seed
+    rng: random.Random = random.Random(seed)
+    # Initialising the upgrade shop.
+    upgrades: list = []  # initial value.
+    num_upgrades: int = rng.randint(*settings.upgrade_count_range)
+    for j in range(num_upgrades):
+        upgrade_description: str = "An upgrade"
+        upgrade: Upgrade = Upgrade(None, upgrade_description,
+                                   BigNumber.power_of_ten(rng.randint(*settings.upgrade_cost_exponent_range)),
+                                   BigNumber(rng.randint(*settings.upgrade_multiplier_range)),
+                                   BigNumber(rng.randint(*settings.upgrade_multiplier_range)))
+        upgrades.append(upgrade)
+
+    upgrade_shop: UpgradeShop = UpgradeShop(upgrades)
+
+    # Initialising the board.
+    board_tiles: ArrayTileList = ArrayTileList()  # Initial value
+    places: list = []  # Initial value
+    num_tiles: int = rng.randint(*settings.tile_count_range)
+    for i in range(num_tiles):
+        if i == 0:
+            board_tiles.append_tile(StartTile.TILE_TYPE)
+        else:
+            num: int = rng.randint(1, 4)
+            if num == 1:
+                board_tiles.append_tile(EmptySpace.TILE_TYPE)
+            elif num == 2:
+                place_description: str = "A " + str(rng.choice(["jungle", "mountain", "pirate cove", "lake",
+                                                                   "forest", "desert", "harbor", "sea", "castle",
+                                                                   "island", "beach"]))
+                place_gold_cost: BigNumber = BigNumber.power_of_ten(rng.randint(*settings.place_cost_exponent_range))
+                places.append(board_tiles.append_place(None, place_description, place_gold_cost,
+                                                       place_gold_cost / BigNumber("1e3"),
+                                                       place_gold_cost / BigNumber("1e5")))
+            elif num == 3:
+                board_tiles.append_tile(RandomRewardTile.TILE_TYPE)
+            elif num == 4:
+                board_tiles.append_tile(UpgradeShop.TILE_TYPE, upgrade_shop)
+
+    game_data: SavedGameData = SavedGameData(player_name, BigNumber(rng.randint(*settings.start_bonus_range)),
+                                             Player(player_name), AIPlayer(), ArrayBoard(board_tiles), seed)
+    for player in [game_data.player_data, game_data.ai_player]:
+        player.player_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    return game_data, places, upgrades
+
+
+def play_turn(game_data, player_policy, ai_policy):
+    # type: (SavedGameData, DecisionPolicy, DecisionPolicy) -> TurnResult
+    # Playing a whole turn with the policy of the player whose turn it is.
+    player: Player = start_turn(game_data)
+    dice_value: int = move_player(game_data, player)
+    events: list = resolve_tile(game_data, player, player_policy if player is game_data.player_data else ai_policy)
+    return TurnResult(game_data.turn, player, dice_value, game_data.board.get_tiles()[player.location], events)
+
+
+# Creating the balance simulator, which plays AI versus AI games in worker processes.
+
+
+def simulate_game(seed, settings, turns, sample_interval=SIMULATION_SAMPLE_INTERVAL):
+    # type: (int, GameSettings, int, int) -> dict
+    # Playing a game from the given seed with both players deciding like the AI player. Names are made up instead
+    # of asking the LLM. The winner is the player with the higher level, then with more gold. The global random
+    # number generator is left alone, as the games of a chunk are played one after another in the same process.
+    name_rng: random.Random = random.Random(seed)
+    game_data, places, upgrades = create_new_game("SIMULATION", settings, seed)
+    for obj in places + upgrades:
+        obj.name = generate_random_name(name_rng)
+
+    policy: DecisionPolicy = RandomPolicy(settings.ai_probability)
+    players: list = [game_data.player_data, game_data.ai_player]
+    level_trajectories: list = [[], []]  # levels of every player every sample_interval turns
+    gold_trajectories: list = [[], []]  # powers of ten of the gold of every player every sample_interval turns
+    level_turns: list = [[0, 0], [0, 0]]  # turn in which every player has reached each level (index = level)
+    landings_by_type: dict = {}  # name of tile type -> number of landings
+    landings_by_position: list = [0] * len(game_data.board.get_tiles())
+    for _ in range(turns):
+        result: TurnResult = play_turn(game_data, policy, policy)
+        tile_type_name: str = TILE_TYPE_NAMES[result.tile.TILE_TYPE]
+        landings_by_type[tile_type_name] = landings_by_type.get(tile_type_name, 0) + 1
+        landings_by_position[result.player.location] += 1
+        for i, player in enumerate(players):
+            while len(level_turns[i]) <= player.level:
+                level_turns[i].append(game_data.turn)
+
+        if game_data.turn % sample_interval == 0 or game_data.turn == turns:
+            for i, player in enumerate(players):
+                level_trajectories[i].append(player.level)
+                gold_trajectories[i].append(big_number_magnitude(player.gold))
+
+    ranks: list = [(player.level, player.gold) for player in players]
+    return {
+        "seed": seed,
+        "turns": game_data.turn,
+        "tile_count": len(game_data.board.get_tiles()),
+        "winner": "DRAW" if ranks[0] == ranks[1] else "PLAYER" if ranks[0] > ranks[1] else "AI PLAYER",
+        "levels": [player.level for player in players],
+        "gold_magnitudes": [big_number_magnitude(player.gold) for player in players],
+        "places_owned": [len(player.get_owned_places()) for player in players],
+        "upgrades_owned": [len(player.get_upgrade_list()) for player in players],
+        "level_trajectories": level_trajectories,
+        "gold_trajectories": gold_trajectories,
+        "level_turns": level_turns,
+        "landings_by_type": landings_by_type,
+        "landings_by_position": landings_by_position
+    }
+
+
+def simulate_games(seeds, settings, turns, sample_interval=SIMULATION_SAMPLE_INTERVAL):
+    # type: (list, GameSettings, int, int) -> list
+    # Playing a chunk of games in a worker process.
+    return [simulate_game(seed, settings, turns, sample_interval) for seed in seeds]
+
+
+def run_simulation(games, seed, settings, turns, on_result, sample_interval=SIMULATION_SAMPLE_INTERVAL,
+                   max_workers=SIMULATION_WORKERS):
+    # type: (int, int, GameSettings, int, callable, int, int) -> None
+    # Playing games from consecutive seeds across worker processes, passing the result of every game to on_result
+    # as soon as its chunk is done.
+    seeds: list = list(range(seed, seed + games))
+    if max_workers <= 1:
+        for game_seed in seeds:
+            on_result(simulate_game(game_seed, settings, turns, sample_interval))
+        return
+
+    # Small chunks keep every worker busy until the end and stream results back often.
+    chunk_size: int = max(1, min(SIMULATION_MAX_CHUNK_SIZE, games // (max_workers * 8)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures: list = [executor.submit(simulate_games, seeds[i:i + chunk_size], settings, turns, sample_interval)
+                         for i in range(0, games, chunk_size)]
+        for future in as_completed(futures):
+            for result in future.result():
+                on_result(result)
+
+
+def simulate_landings(games, turns, seed, settings):
+    # type: (int, int, int, GameSettings) -> dict
+    # Moving the two players of many games at once with the movement kernel, without playing the tiles. The boards
+    # are laid out like create_new_game() does: a start tile followed by tiles of the other four types at random.
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    board_lengths = rng.integers(settings.tile_count_range[0], settings.tile_count_range[1] + 1, size=games)
+    tile_types = rng.integers(EmptySpace.TILE_TYPE, UpgradeShop.TILE_TYPE + 1, size=(games, int(board_lengths.max())),
+                              dtype=np.int8)
+    tile_types[:, 0] = StartTile.TILE_TYPE
+    kernel: MovementKernel = MovementKernel(tile_types, board_lengths, np.repeat(np.arange(games), 2), rng)
+    kernel.run(turns // 2)
+    return {
+        "landing_frequencies_by_type": {tile_type.__name__: int(kernel.landings_by_type[tile_type.TILE_TYPE]) /
+                                        int(kernel.landings_by_type.sum())
+                                        for tile_type in [StartTile, EmptySpace, Place, RandomRewardTile, UpgradeShop]},
+        "landing_frequencies_by_position": (kernel.landings.sum(axis=0) / kernel.landings.sum()).tolist(),
+        "mean_laps": float(kernel.laps.mean())
+    }
+
+
+def compare_movement_kernel(players=2000, steps=300, seed=0, board_length=37, early_steps=3):
+    # type: (int, int, int, int, int) -> dict
+    # Checking that the movement kernel moves players like Player.roll_dice() does. The same board is played by
+    # players moved one at a time and by the kernel. The locations after the first few steps (which depend on every
+    # dice value and are independent between players) are compared with a chi-squared test, and how often the
+    # players have passed the start tile after all the steps with a z-test. Small p-values mean the two differ.
+    import numpy as np
+    rng: random.Random = random.Random(seed)
+    tiles: list = [StartTile()] + [rng.choice([EmptySpace, RandomRewardTile])() for _ in range(board_length - 1)]
+    game_data: SavedGameData = SavedGameData("", BigNumber(1), Player(""), AIPlayer(), Board(tiles), seed)
+    scalar_early_locations: list = [0] * board_length
+    scalar_laps: list = []  # initial value
+    for _ in range(players):
+        player: Player = Player("")
+        player.gold = BigNumber(0)
+        for step in range(steps):
+            player.roll_dice(game_data)
+            if step == early_steps - 1:
+                scalar_early_locations[player.location] += 1
+
+        scalar_laps.append(int(player.gold))  # the start bonus is 1 gold
+
+    kernel: MovementKernel = MovementKernel(np.array([[tile.TILE_TYPE for tile in tiles]], dtype=np.int8),
+                                            np.array([board_length]), np.zeros(players, dtype=np.int64),
+                                            np.random.default_rng(seed))
+    kernel.run(early_steps)
+    kernel_early_locations: list = np.bincount(kernel.locations, minlength=board_length).tolist()
+    kernel.run(steps - early_steps)
+    kernel_laps: list = kernel.laps.tolist()
+
+    # Chi-squared test of homogeneity of two samples of the same size.
+    cells: list = [(a, b) for a, b in zip(scalar_early_locations, kernel_early_locations) if a + b > 0]
+    chi_square: float = sum((a - b) ** 2 / (a + b) for a, b in cells)
+    degrees_of_freedom: int = max(1, len(cells) - 1)
+    # Wilson-Hilferty approximation of the chi-squared distribution with a normal distribution.
+    z: float = ((chi_square / degrees_of_freedom) ** (1 / 3) - (1 - 2 / (9 * degrees_of_freedom))) / \
+        math.sqrt(2 / (9 * degrees_of_freedom))
+    mean_scalar_laps: float = sum(scalar_laps) / players
+    mean_kernel_laps: float = sum(kernel_laps) / players
+    variance: float = (sum((laps - mean_scalar_laps) ** 2 for laps in scalar_laps) +
+                       sum((laps - mean_kernel_laps) ** 2 for laps in kernel_laps)) / (2 * players - 2)
+    laps_z: float = (mean_scalar_laps - mean_kernel_laps) / math.sqrt(2 * variance / players) if variance > 0 else 0.0
+    return {
+        "players": players,
+        "location_chi_square": chi_square,
+        "degrees_of_freedom": degrees_of_freedom,
+        "location_p_value": 0.5 * math.erfc(z / math.sqrt(2)),
+        "mean_scalar_laps": mean_scalar_laps,
+        "mean_kernel_laps": mean_kernel_laps,
+        "laps_p_value": math.erfc(abs(laps_z) / math.sqrt(2))
+    }
+
+
+def benchmark_search(seed=0, warmup_turns=200, positions=20, time_budget=SEARCH_TIME_BUDGET):
+    # type: (int, int, int, float) -> dict
+    # Measuring the nodes per second of SearchPolicy making and unmaking moves and deep copying the game for every
+    # move instead, on the same positions of a game played at random: every decision of its next turns after the
+    # warmup turns, until the given number of positions has been searched.
+    game_data, _, _ = create_new_game("BENCHMARK", GameSettings(), seed)
+    game_data.resume_random()
+    policy: RandomPolicy = RandomPolicy()
+    for _ in range(warmup_turns):
+        play_turn(game_data, policy, policy)
+
+    searches: dict = {"make_unmake": SearchPolicy(policy, time_budget),
+                      "deepcopy": SearchPolicy(policy, time_budget, copy_state=True)}
+    searched: int = 0  # initial value
+    while searched < positions:
+        player: Player = start_turn(game_data)
+        move_player(game_data, player)
+        tile: Tile = game_data.board.get_tiles()[player.location]
+        if len(SearchPolicy.get_actions(player, tile)) > 1:
+            for search in searches.values():
+                search.search(game_data, player, tile)
+            searched += 1
+
+        resolve_tile(game_data, player, policy)
+
+    res: dict = {"positions": positions, "time_budget": time_budget, "tile_count": len(game_data.board.get_tiles())}
+    for name, search in searches.items():
+        res[name] = {"nodes": search.nodes, "nodes_per_second": search.nodes / max(search.search_time, 1e-9),
+                     "mean_depth": sum(search.depths) / len(search.depths)}
+
+    res["speedup"] = res["make_unmake"]["nodes_per_second"] / max(res["deepcopy"]["nodes_per_second"], 1e-9)
+    return res
+
+
+def simulate():
+    # type: () -> int
+    """
+    This function plays AI versus AI games without the LLM and writes their results and statistics to a file, so
+    that the numbers of the game can be balanced.
+    :return: an integer
+    """
+    defaults: GameSettings = GameSettings()
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Simulates AI versus AI games.")
+    parser.add_argument("output", help="file the results are written to (JSON, one list per column)")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=1000, help="turns played in every game")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the others follow it")
+    parser.add_argument("--workers", type=int, default=SIMULATION_WORKERS)
+    parser.add_argument("--sample-interval", type=int, default=SIMULATION_SAMPLE_INTERVAL,
+                        help="turns between two samples of the levels and gold of the players")
+    parser.add_argument("--movement-only", action="store_true",
+                        help="only move the players with the NumPy movement kernel to measure landing frequencies")
+    parser.add_argument("--check-movement-kernel", action="store_true",
+                        help="compare the NumPy movement kernel with rolling the dice one player at a time and exit")
+    parser.add_argument("--benchmark-search", action="store_true",
+                        help="measure the nodes per second of the searching AI player against deep copying the game "
+                             "for every move and exit")
+    for name, value in vars(defaults).items():
+        if isinstance(value, list):
+            parser.add_argument("--" + name.replace("_", "-"), type=int, nargs=2, default=value,
+                                metavar=("MIN", "MAX"))
+        else:
+            parser.add_argument("--" + name.replace("_", "-"), type=type(value), default=value)
+
+    args: argparse.Namespace = parser.parse_args()
+    settings: GameSettings = GameSettings(**{name: getattr(args, name) for name in vars(defaults)})
+    if args.check_movement_kernel:
+        comparison: dict = compare_movement_kernel(seed=args.seed)
+        print(json.dumps(comparison, indent=4))
+        return 0 if min(comparison["location_p_value"], comparison["laps_p_value"]) >= MOVEMENT_KERNEL_MIN_P_VALUE \
+            else 1
+
+    if args.benchmark_search:
+        print(json.dumps(benchmark_search(seed=args.seed), indent=4))
+        return 0
+
+    if args.movement_only:
+        start_time: float = time.perf_counter()
+        landings: dict = simulate_landings(args.games, args.turns, args.seed, settings)
+        write_file_atomically(args.output, json.dumps({"version": 1, "settings": vars(settings), "summary": landings},
+                                                      separators=(",", ":")).encode("utf-8"))
+        print(str(args.games * args.turns) + " moves simulated in " +
+              str(round(time.perf_counter() - start_time, 2)) + " seconds.")
+        print(json.dumps(landings["landing_frequencies_by_type"]))
+        return 0
+
+    results: SimulationResults = SimulationResults(settings)
+    start_time: float = time.perf_counter()
+    last_progress_time: float = 0.0
+
+    def on_result(result):
+        # type: (dict) -> None
+        nonlocal last_progress_time
+        results.add(result)
+        if len(results) == args.games or time.time() - last_progress_time >= PROGRESS_REFRESH_INTERVAL * 10:
+            last_progress_time = time.time()
+            print(str(len(results)) + " of " + str(args.games) + " games simulated.")
+
+    run_simulation(args.games, args.seed, settings, args.turns, on_result, args.sample_interval, args.workers)
+    results.save(args.output)
+    elapsed_time: float = time.perf_counter() - start_time
+    print(str(args.games * args.turns) + " turns simulated in " + str(round(elapsed_time, 2)) + " seconds.")
+    print(json.dumps(results.get_summary()["win_rates"]))
+    return 0
+
+
+# Creating the replay of recorded games.
+
+
+def read_replay_trace(file_name):
+    # type: (str) -> tuple
+    # Returning the header of a replay trace, the decisions of the players by turn and the turns the game was resumed
+    # from. A session resumed from an earlier turn than the previous one reached (a crash lost its last turns)
+    # replaces what was recorded after that turn.
+    records: list = read_journal_records(file_name)
+    if len(records) == 0 or "seed" not in records[0]:
+        raise ValueError(str(file_name) + " is not a replay trace!")
+    if records[0]["version"] > REPLAY_VERSION:
+        raise ValueError("Replay trace " + str(file_name) + " was written by a newer version of the game!")
+
+    decisions: dict = {}  # turn -> decisions of the player (or the AI player if made by the LLM) in that turn
+    resume_turns: set = set()
+    for record in records[1:]:
+        if "resume" in record:
+            decisions = {turn: turn_decisions for turn, turn_decisions in decisions.items()
+                         if turn <= record["resume"]}
+            resume_turns = {turn for turn in resume_turns if turn <= record["resume"]}
+            resume_turns.add(record["resume"])
+        else:
+            decisions[record["turn"]] = record["decisions"]
+
+    return records[0], decisions, resume_turns
+
+
+def replay_game(header, decisions, resume_turns, turns=None):
+    # type: (dict, dict, set, int or None) -> SavedGameData
+    # Playing a recorded game again from its seed up to the given turn (the last recorded one by default), with the
+    # recorded decisions of the players. Names are not generated.
+    settings: GameSettings = GameSettings(**header["settings"])
+    game_data, _, _ = create_new_game(header["player_name"], settings, header["seed"])
+    last_turn: int = max(list(decisions) + list(resume_turns)) if turns is None else turns
+    player_policy: DecisionPolicy = ReplayPolicy(decisions)
+    ai_policy: DecisionPolicy = ReplayPolicy(decisions, RandomPolicy(settings.ai_probability))
+    while game_data.turn < last_turn:
+        if game_data.turn in resume_turns:
+            game_data.resume_random()
+        play_turn(game_data, player_policy, ai_policy)
+
+    return game_data
+
+
+def describe_game_state(game_data):
+    # type: (SavedGameData) -> dict
+    # Returning the state of a game as it is saved, without the names generated by the LLM, to compare two games.
+    _, tile_indices, upgrade_refs = encode_static_table(game_data.board)
+    state: dict = json.loads(encode_game_state(game_data, tile_indices, upgrade_refs))
+    state["places"].sort()
+    del state["names"]
+    return state
+
+
+def replay():
+    # type: () -> int
+    """
+    This function plays a recorded game again from its replay trace without the LLM, as fast as the game can be
+    played, so that sessions can be reproduced, benchmarked and checked against their saved games.
+    :return: an integer
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Replays a recorded game.")
+    parser.add_argument("saved_game", help="saved game whose replay trace (the file ending with " +
+                        REPLAY_FILE_SUFFIX + ") is replayed")
+    parser.add_argument("--turn", type=int, default=None, help="turn to stop at (the last recorded turn by default)")
+    parser.add_argument("--check", action="store_true",
+                        help="check that the replayed game is the same as the saved game, stopping at its turn")
+    parser.add_argument("--output", default=None, help="file the replayed game is saved to")
+    args: argparse.Namespace = parser.parse_args()
+
+    header, decisions, resume_turns = read_replay_trace(args.saved_game + REPLAY_FILE_SUFFIX)
+    # The trace ends with the last decision of the player, the saved game knows the turn the game has reached.
+    saved_game_data: SavedGameData or None = None  # initial value
+    if args.check or (args.turn is None and os.path.exists(args.saved_game)):
+        saved_game_data = recover_game_data(args.saved_game, False)
+
+    turns: int or None = args.turn if args.turn is not None or saved_game_data is None else saved_game_data.turn
+    start_time: float = time.perf_counter()
+    game_data: SavedGameData = replay_game(header, decisions, resume_turns, turns)
+    elapsed_time: float = time.perf_counter() - start_time
+    print(str(game_data.turn) + " turns replayed in " + str(round(elapsed_time, 3)) + " seconds (" +
+          str(round(game_data.turn / max(elapsed_time, 1e-9))) + " turns per second).")
+    if args.output is not None:
+        save_game_data(game_data, args.output)
+
+    if args.check:
+        replayed_state: dict = describe_game_state(game_data)
+        saved_state: dict = describe_game_state(saved_game_data)
+        differences: list = [key for key in saved_state if replayed_state.get(key) != saved_state[key]]
+        if len(differences) > 0:
+            print("The replayed game differs from the saved game in: " + ", ".join(differences))
+            return 1
+
+        print("The replayed game is the same as the saved game.")
+
+    return 0
+
+
+def print_catalog_page(catalog, page, sort_option):
+    # type: (SaveCatalog, int, str) -> None
+    sort_key: str = CATALOG_SORT_KEYS[sort_option]
+    print("Below is a list of existing saved game files (page " + str(page + 1) + " of " +
+          str(catalog.get_page_count()) + ", sorted by " + sort_option.lower() + "):\n")
+    for i, entry in enumerate(catalog.get_page(page, sort_key, reverse=sort_key != "player_name"),
+                              page * CATALOG_PAGE_SIZE + 1):
+        print(str(i) + ". " + str(entry["player_name"]) + " (turn " + str(entry["turn"]) + ", level " +
+              str(entry["level"]) + ", gold 1e" + str(entry["gold_magnitude"]) + ", last played " +
+              time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_played"])) + ", " +
+              str(entry["file_size"]) + " bytes)")
+
+    print("\nEnter \"NEXT PAGE\" or \"PREVIOUS PAGE\" to see more saved game files.")
+    print("Enter \"SORT BY \" followed by one of " + ", ".join(CATALOG_SORT_KEYS) + " to sort them.")
+
+
+@lru_cache(maxsize=None)
+def enable_ansi_escape_sequences():
+    # type: () -> None
+    # Windows consoles only interpret ANSI escape sequences once a program has asked for it, which running any
+    # command does. This is done once instead of starting a shell every time the screen is cleared.
+    if sys.platform.startswith('win'):
+        os.system("")
+
+
+def clear():
+    # type: () -> None
+    if sys.stdout.isatty():
+        enable_ansi_escape_sequences()
+        sys.stdout.write(ANSI_CLEAR_SCREEN)
+        sys.stdout.flush()
+
+
+def format_place_line(place):
+    # type: (Place) -> str
+    return entity_texts.get(place, "line", place.get_text_key(), lambda: "".join([
+        str(place.name), " (", str(place.description), ") | Level ", str(place.level), " | Gold Cost ",
+        place.gold_cost.to_compact_string(), " | Gold Per Turn ", place.gold_per_turn.to_compact_string(),
+        " | EXP Per Turn ", place.exp_per_turn.to_compact_string()]))
+
+
+def format_upgrade_line(upgrade):
+    # type: (Upgrade) -> str
+    return entity_texts.get(upgrade, "line", upgrade.get_text_key(), lambda: "".join([
+        str(upgrade.name), " (", str(upgrade.description), ") | Gold Cost ", upgrade.gold_cost.to_compact_string(),
+        " | Gold Gain Multiplier ", upgrade.gold_gain_multiplier.to_compact_string(), " | EXP Gain Multiplier ",
+        upgrade.exp_gain_multiplier.to_compact_string()]))
+
+
+def render_player_summary(title, player, board):
+    # type: (str, Player, Board) -> list
+    # Returning a few lines about the player which take as long to build whatever the player owns.
+    tiles: list = board.get_tiles()
+    return [
+        title,
+        "".join(["  Level ", str(player.level), " | EXP ", player.exp.to_compact_string(), " / ",
+                 player.required_exp.to_compact_string()]),
+        "".join(["  Gold ", player.gold.to_compact_string(), " | Gold Per Turn ",
+                 player.get_gold_per_turn().to_compact_string(), " | EXP Per Turn ",
+                 player.get_exp_per_turn().to_compact_string()]),
+        "".join(["  At ", str(tiles[player.location].name), " (tile ", str(player.location + 1), " of ",
+                 str(len(tiles)), ") | ", str(len(player.get_owned_places())), " places | ",
+                 str(len(player.get_upgrade_list())), " upgrades"])
+    ]
+
+
+def render_game_screen(game_data, events):
+    # type: (SavedGameData, deque) -> list
+    return ["TURN " + str(game_data.turn), ""] + \
+        render_player_summary("Your stats:", game_data.player_data, game_data.board) + [""] + \
+        render_player_summary("CPU's stats:", game_data.ai_player, game_data.board) + [""] + \
+        ["Latest events:"] + ["  " + event for event in events]
+
+
+def show_details(renderer, game_data, view):
+    # type: (TerminalRenderer, SavedGameData, str) -> None
+    # Listing the places or upgrades of a player (see DETAIL_VIEWS) a page at a time until the player goes back. Only
+    # the page shown is formatted.
+    player: Player = game_data.player_data if view.startswith("MY ") else game_data.ai_player
+    is_places: bool = view.endswith("PLACES")
+    items: list = player.get_owned_list() if is_places else player.get_upgrade_list()
+    page: int = 0
+    while True:
+        page_size: int = max(1, shutil.get_terminal_size().lines - 5)
+        page_count: int = max(1, -(-len(items) // page_size))
+        page = min(max(page, 0), page_count - 1)
+        renderer.render([DETAIL_VIEWS[view] + " (page " + str(page + 1) + " of " + str(page_count) + "):", ""] +
+                        [format_place_line(item) if is_places else format_upgrade_line(item)
+                         for item in items[page * page_size:(page + 1) * page_size]])
+        command: str = renderer.input("Enter \"NEXT PAGE\" or \"PREVIOUS PAGE\" to turn the page, anything else to "
+                                      "go back: ")
+        if command == "NEXT PAGE":
+            page += 1
+        elif command == "PREVIOUS PAGE":
+            page -= 1
+        else:
+            return
+
+
+# Creating necessary classes for the game.
+
+
+class TextCache:
+    """
+    This class contains attributes of the texts of game entities (places, upgrades, players, ...) kept after
+    formatting them. A text is kept with the values of the fields it shows (its key) and formatted again once they
+    have changed, e.g. after a place is levelled up or bought, so that showing unchanged entities costs a lookup.
+    """
+
+    def __init__(self, capacity):
+        # type: (int) -> None
+        self.capacity: int = capacity
+        self.hits: int = 0  # initial value
+        self.misses: int = 0  # initial value
+        self.__texts: OrderedDict = OrderedDict()  # (id(entity), kind of text) -> (key, text), least recent first
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.__texts)
+
+    def get(self, entity, kind, key, build):
+        # type: (object, str, tuple, callable) -> str
+        # The text only depends on the key, so an entity which reuses the id of a deleted one with the same key gets
+        # the right text as well.
+        cache_key: tuple = (id(entity), kind)
+        with self.__lock:
+            entry: tuple or None = self.__texts.get(cache_key)
+            if entry is not None and entry[0] == key:
+                self.__texts.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+
+        text: str = build()
+        with self.__lock:
+            self.misses += 1
+            self.__texts[cache_key] = (key, text)
+            self.__texts.move_to_end(cache_key)
+            while len(self.__texts) > self.capacity:
+                self.__texts.popitem(last=False)
+
+        return text
+
+    def clear(self):
+        # type: () -> None
+        with self.__lock:
+            self.__texts.clear()
+
+
+entity_texts: TextCache = TextCache(ENTITY_TEXT_CACHE_SIZE)  # texts of the entities of the games being played
+
+
+class BigNumber:
+    """
+    This class contains attributes of a compact big number used for gold, EXP, costs and multipliers in the game.
+    The value is mantissa * 2 ** exponent with a float mantissa in [0.5, 1) (0.0 for zero) and an unbounded integer
+    exponent, so that every operation rounds exactly like mpf at its default 53-bit precision while costing a few
+    float operations whatever the size of the number.
+    """
+
+    __slots__ = ("mantissa", "exponent")
+
+    def __init__(self, value=0):
+        # type: (BigNumber or int or float or str or mpf) -> None
+        if isinstance(value, BigNumber):
+            number: BigNumber = value
+        elif isinstance(value, int):
+            number = BigNumber.from_int(value)
+        elif isinstance(value, float):
+            if math.isinf(value) or math.isnan(value):
+                raise ValueError("Cannot convert " + str(value) + " to BigNumber")
+            number = BigNumber.from_parts(value, 0)
+        elif isinstance(value, str):
+            number = BigNumber.from_string(value)
+        elif hasattr(value, "_mpf_"):
+            number = BigNumber.from_mpf(value)
+        else:
+            raise TypeError("Cannot convert " + type(value).__name__ + " to BigNumber")
+
+        self.mantissa: float = number.mantissa
+        self.exponent: int = number.exponent
+
+    @staticmethod
+    def from_parts(mantissa, exponent):
+        # type: (float, int) -> BigNumber
+        # Creating mantissa * 2 ** exponent with the mantissa normalised into [0.5, 1).
+        res: BigNumber = object.__new__(BigNumber)
+        if mantissa == 0.0:
+            res.mantissa = 0.0
+            res.exponent = 0
+        else:
+            res.mantissa, shift = math.frexp(mantissa)
+            res.exponent = exponent + shift
+        return res
+
+    @staticmethod
+    def from_normalised_parts(mantissa, exponent):
+        # type: (float, int) -> BigNumber
+        # Creating mantissa * 2 ** exponent from the parts of a BigNumber, which are normalised already.
+        res: BigNumber = object.__new__(BigNumber)
+        res.mantissa = mantissa
+        res.exponent = exponent
+        return res
+
+    @staticmethod
+    def from_int(n, exponent=0):
+        # type: (int, int) -> BigNumber
+        # Rounding n * 2 ** exponent to the nearest 53-bit mantissa (ties to even).
+        if -2 ** 53 <= n <= 2 ** 53:
+            return BigNumber.from_parts(float(n), exponent)
+
+        magnitude: int = abs(n)
+        shift: int = magnitude.bit_length() - 53
+        top: int = magnitude >> shift
+        remainder: int = magnitude - (top << shift)
+        half: int = 1 << (shift - 1)
+        if remainder > half or (remainder == half and top & 1):
+            top += 1
+
+        return BigNumber.from_parts(float(top) if n > 0 else -float(top), exponent + shift)
+
+    @staticmethod
+    def from_string(string):
+        # type: (str) -> BigNumber
+        try:
+            sign, digits, exponent = Decimal(string.strip()).as_tuple()
+        except ArithmeticError:
+            raise ValueError("Cannot convert " + repr(string) + " to BigNumber")
+
+        if not isinstance(exponent, int):
+            raise ValueError("Cannot convert " + repr(string) + " to BigNumber")
+
+        coefficient: BigNumber = BigNumber.from_int((-1) ** sign * int("".join(map(str, digits)) or "0"))
+        if exponent >= 0:
+            return coefficient * BigNumber.power_of_ten(exponent)
+        return coefficient / BigNumber.power_of_ten(-exponent)
+
+    @staticmethod
+    def from_mpf(value):
+        # type: (mpf) -> BigNumber
+        # Converting an mpf (e.g. from a saved game of an older version) without any rounding at 53-bit precision.
+        sign, man, exp, bc = value._mpf_
+        if man == 0:
+            if exp != 0:
+                raise ValueError("Cannot convert " + str(value) + " to BigNumber")
+            return BigNumber.from_parts(0.0, 0)
+        return BigNumber.from_int(-man if sign else man, exp)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def power_of_ten(n):
+        # type: (int) -> BigNumber
+        # Computing 10 ** n = 5 ** n * 2 ** n, exactly for moderate n and with 128-bit truncated powers beyond that,
+        # which is far more precision than needed to round to 53 bits.
+        if n < 0:
+            return BigNumber.from_parts(1.0, 0) / BigNumber.power_of_ten(-n)
+        if n <= 1000:
+            return BigNumber.from_int(5 ** n, n)
+
+        res_man, res_exp, base_man, base_exp, power = 1, n, 5, 0, n
+        while power > 0:
+            if power & 1:
+                res_man *= base_man
+                res_exp += base_exp
+                shift: int = max(0, res_man.bit_length() - 128)
+                res_man >>= shift
+                res_exp += shift
+
+            power >>= 1
+            if power > 0:
+                base_man *= base_man
+                base_exp *= 2
+                shift = max(0, base_man.bit_length() - 128)
+                base_man >>= shift
+                base_exp += shift
+
+        return BigNumber.from_int(res_man, res_exp)
+
+    @staticmethod
+    def from_json(value):
+        # type: (list) -> BigNumber
+        return BigNumber.from_int(value[0], value[1])
+
+    def to_json(self):
+        # type: () -> list
+        # Returning [integer mantissa, exponent], which JSON stores without any rounding.
+        return [int(math.ldexp(self.mantissa, 53)), self.exponent - 53]
+
+    def to_mpf(self):
+        # type: () -> mpf
+        from mpmath import mpf
+        return mpf((int(math.ldexp(self.mantissa, 53)), self.exponent - 53))
+
+    def log10(self):
+        # type: () -> float
+        # Returning log10 of the absolute value (-inf for zero).
+        if self.mantissa == 0.0:
+            return -math.inf
+        return math.log10(abs(self.mantissa)) + self.exponent * math.log10(2)
+
+    @staticmethod
+    @lru_cache(maxsize=NUMBER_TEXT_CACHE_SIZE)
+    def format_parts(mantissa, exponent, significant_digits=15, fixed_point_limit=15):
+        # type: (float, int, int, int) -> str
+        # Formatting mantissa * 2 ** exponent with the given significant digits: fixed point between 1e-5 and
+        # 10 ** fixed_point_limit, scientific otherwise. The same values are formatted over and over while playing,
+        # so the texts are cached.
+        if mantissa == 0.0:
+            return "0.0"
+
+        with localcontext() as context:
+            context.prec = 40
+            context.Emax = MAX_EMAX
+            context.Emin = MIN_EMIN
+            value: Decimal = Decimal(int(math.ldexp(abs(mantissa), 53))) * Decimal(2) ** (exponent - 53)
+            mantissa_str, exponent_str = format(value, "." + str(significant_digits - 1) + "e").split("e")
+
+        digits: str = mantissa_str.replace(".", "").rstrip("0") or "0"
+        exponent10: int = int(exponent_str)
+        sign: str = "-" if mantissa < 0 else ""
+        if -5 < exponent10 < fixed_point_limit:
+            if exponent10 >= 0:
+                return sign + digits[:exponent10 + 1].ljust(exponent10 + 1, "0") + "." + \
+                    (digits[exponent10 + 1:] or "0")
+            return sign + "0." + "0" * (-exponent10 - 1) + digits
+        return sign + digits[0] + "." + (digits[1:] or "0") + "e" + ("+" if exponent10 > 0 else "") + str(exponent10)
+
+    def __str__(self):
+        # type: () -> str
+        # Formatting with 15 significant digits like mpf: fixed point between 1e-5 and 1e15, scientific otherwise.
+        return BigNumber.format_parts(self.mantissa, self.exponent)
+
+    def to_compact_string(self):
+        # type: () -> str
+        # Formatting with COMPACT_SIGNIFICANT_DIGITS significant digits, e.g. 1.235e+5120, for lines on the screen.
+        return BigNumber.format_parts(self.mantissa, self.exponent, COMPACT_SIGNIFICANT_DIGITS,
+                                      COMPACT_SIGNIFICANT_DIGITS)
+
+    def __repr__(self):
+        # type: () -> str
+        return "BigNumber('" + str(self) + "')"
+
+    def __float__(self):
+        # type: () -> float
+        try:
+            return math.ldexp(self.mantissa, self.exponent)
+        except OverflowError:
+            return math.inf if self.mantissa > 0 else -math.inf
+
+    def __int__(self):
+        # type: () -> int
+        magnitude: int = int(math.ldexp(abs(self.mantissa), 53))
+        shift: int = self.exponent - 53
+        magnitude = magnitude << shift if shift >= 0 else magnitude >> -shift
+        return -magnitude if self.mantissa < 0 else magnitude
+
+    def __bool__(self):
+        # type: () -> bool
+        return self.mantissa != 0.0
+
+    def __hash__(self):
+        # type: () -> int
+        if -1074 < self.exponent <= 1024:
+            return hash(math.ldexp(self.mantissa, self.exponent))
+        return hash((self.mantissa, self.exponent))
+
+    def __neg__(self):
+        # type: () -> BigNumber
+        return BigNumber.from_parts(-self.mantissa, self.exponent)
+
+    def __pos__(self):
+        # type: () -> BigNumber
+        return self
+
+    def __abs__(self):
+        # type: () -> BigNumber
+        return BigNumber.from_parts(abs(self.mantissa), self.exponent)
+
+    def __add__(self, other):
+        # type: (BigNumber or int or float or str) -> BigNumber
+        other = other if isinstance(other, BigNumber) else BigNumber(other)
+        if other.mantissa == 0.0:
+            return self
+        if self.mantissa == 0.0:
+            return other
+
+        larger, smaller = (self, other) if self.exponent >= other.exponent else (other, self)
+        difference: int = smaller.exponent - larger.exponent
+        if difference < -60:
+            # The smaller number is below half a unit in the last place of the larger one.
+            return larger
+        return BigNumber.from_parts(larger.mantissa + math.ldexp(smaller.mantissa, difference), larger.exponent)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        # type: (BigNumber or int or float or str) -> BigNumber
+        other = other if isinstance(other, BigNumber) else BigNumber(other)
+        return self + BigNumber.from_parts(-other.mantissa, other.exponent)
+
+    def __rsub__(self, other):
+        # type: (BigNumber or int or float or str) -> BigNumber
+        return BigNumber(other) - self
+
+    def __mul__(self, other):
+        # type: (BigNumber or int or float or str) -> BigNumber
+        other = other if isinstance(other, BigNumber) else BigNumber(other)
+        return BigNumber.from_parts(self.mantissa * other.mantissa, self.exponent + other.exponent)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        # type: (BigNumber or int or float or str) -> BigNumber
+        other = other if isinstance(other, BigNumber) else BigNumber(other)
+        if other.mantissa == 0.0:
+            raise ZeroDivisionError("BigNumber division by zero")
+        return BigNumber.from_parts(self.mantissa / other.mantissa, self.exponent - other.exponent)
+
+    def __rtruediv__(self, other):
+        # type: (BigNumber or int or float or str) -> BigNumber
+        return BigNumber(other) / self
+
+    def __pow__(self, n):
+        # type: (int) -> BigNumber
+        if not isinstance(n, int):
+            return NotImplemented
+        if self == 10:
+            return BigNumber.power_of_ten(n)
+
+        res: BigNumber = BigNumber.from_parts(1.0, 0)
+        base: BigNumber = self if n >= 0 else BigNumber.from_parts(1.0, 0) / self
+        power: int = abs(n)
+        while power > 0:
+            if power & 1:
+                res *= base
+            power >>= 1
+            if power > 0:
+                base *= base
+        return res
+
+    def compare(self, other):
+        # type: (BigNumber or int or float or str) -> int
+        # Returning -1, 0 or 1 when this number is less than, equal to or greater than the other one.
+        other = other if isinstance(other, BigNumber) else BigNumber(other)
+        sign: int = (self.mantissa > 0) - (self.mantissa < 0)
+        other_sign: int = (other.mantissa > 0) - (other.mantissa < 0)
+        if sign != other_sign or sign == 0:
+            return (sign > other_sign) - (sign < other_sign)
+        if self.exponent != other.exponent:
+            return sign if self.exponent > other.exponent else -sign
+        return (self.mantissa > other.mantissa) - (self.mantissa < other.mantissa)
+
+    def __eq__(self, other):
+        # type: (object) -> bool
+        try:
+            return self.compare(other) == 0
+        except (TypeError, ValueError):
+            return NotImplemented
+
+    def __lt__(self, other):
+        # type: (BigNumber or int or float or str) -> bool
+        return self.compare(other) < 0
+
+    def __le__(self, other):
+        # type: (BigNumber or int or float or str) -> bool
+        return self.compare(other) <= 0
+
+    def __gt__(self, other):
+        # type: (BigNumber or int or float or str) -> bool
+        return self.compare(other) > 0
+
+    def __ge__(self, other):
+        # type: (BigNumber or int or float or str) -> bool
+        return self.compare(other) >= 0
+
+
+class LLMStats:
+    """
+    This class contains attributes of the latency, token and error counters of the requests sent to an LLM.
+    """
+
+    def __init__(self, window=LLM_STATS_WINDOW):
+        # type: (int) -> None
+        self.requests: int = 0
+        self.errors: int = 0
+        self.prompt_tokens: int = 0
+        self.completion_tokens: int = 0
+        self.__latencies: deque = deque(maxlen=window)
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __str__(self):
+        # type: () -> str
+        res: str = ""  # initial value
+        res += "Requests: " + str(self.requests) + "\n"
+        res += "Errors: " + str(self.errors) + "\n"
+        res += "Prompt Tokens: " + str(self.prompt_tokens) + "\n"
+        res += "Completion Tokens: " + str(self.completion_tokens) + "\n"
+        res += "Latency p50 / p95 / p99: " + " / ".join("%.3fs" % self.percentile(p) for p in (50, 95, 99)) + "\n"
+        return res
+
+    def record(self, latency, prompt_tokens=0, completion_tokens=0, error=False):
+        # type: (float, int, int, bool) -> None
+        with self.__lock:
+            self.requests += 1
+            self.errors += 1 if error else 0
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.__latencies.append(latency)
+
+    def percentile(self, p):
+        # type: (float) -> float
+        with self.__lock:
+            latencies: list = sorted(self.__latencies)
+
+        if len(latencies) == 0:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))]
+
+
+class DecisionStats(LLMStats):
+    """
+    This class contains attributes of the latencies of the decisions of a policy asking the LLM, from being asked
+    for a decision to making it, and of how the decisions were made.
+    """
+
+    def __init__(self, window=LLM_STATS_WINDOW):
+        # type: (int) -> None
+        LLMStats.__init__(self, window)
+        self.cache_hits: int = 0  # decisions the LLM had made already (e.g. prefetched)
+        self.waits: int = 0  # decisions the LLM made while being waited for
+        self.fallbacks: int = 0  # decisions made at random as the LLM missed the deadline or failed
+
+    def __str__(self):
+        # type: () -> str
+        res: str = ""  # initial value
+        res += "Decisions: " + str(self.requests) + "\n"
+        res += "Cache Hits: " + str(self.cache_hits) + "\n"
+        res += "Waited For: " + str(self.waits) + "\n"
+        res += "Fallbacks: " + str(self.fallbacks) + "\n"
+        res += "Latency p50 / p95 / p99: " + " / ".join("%.3fs" % self.percentile(p) for p in (50, 95, 99)) + "\n"
+        return res
+
+
+class OllamaBackend:
+    """
+    This class contains attributes of an Ollama server generating responses for a model over a pool of reusable
+    keep-alive HTTP connections.
+    """
+
+    def __init__(self, model, base_url=None, timeout=LLM_CALL_TIMEOUT, keep_alive=OLLAMA_KEEP_ALIVE):
+        # type: (str, str or None, float, str) -> None
+        self.model: str = model
+        self.base_url: str = get_ollama_base_url() if base_url is None else base_url
+        self.timeout: float = timeout
+        self.keep_alive: str = keep_alive
+        self.__connections: queue.LifoQueue = queue.LifoQueue()
+
+    def __new_connection(self):
+        # type: () -> http.client.HTTPConnection
+        url: urllib.parse.SplitResult = urllib.parse.urlsplit(self.base_url)
+        connection_class: type = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        return connection_class(url.netloc, timeout=self.timeout)
+
+    def __post(self, path, payload):
+        # type: (str, dict) -> dict
+        try:
+            connection: http.client.HTTPConnection = self.__connections.get_nowait()
+        except queue.Empty:
+            connection = self.__new_connection()
+
+        try:
+            connection.request("POST", urllib.parse.urlsplit(self.base_url).path + path,
+                               body=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"})
+            response: http.client.HTTPResponse = connection.getresponse()
+            body: bytes = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+
+        # Only returning the connection to the pool once the whole response has been read.
+        self.__connections.put(connection)
+        if response.status != 200:
+            raise ConnectionError("Ollama returned HTTP " + str(response.status) + ": " + body.decode("utf-8", "replace"))
+        return json.loads(body.decode("utf-8"))
+
+    def generate(self, prompt):
+        # type: (str) -> tuple
+        # Returning the response text with the numbers of prompt tokens and generated tokens.
+        data: dict = self.__post("/api/generate", {"model": self.model, "prompt": prompt, "stream": False,
+                                                   "keep_alive": self.keep_alive})
+        return str(data.get("response", "")), int(data.get("prompt_eval_count", 0)), int(data.get("eval_count", 0))
+
+    def load(self):
+        # type: () -> None
+        # A generate request without a prompt only loads the model and resets its keep-alive timer.
+        self.__post("/api/generate", {"model": self.model, "keep_alive": self.keep_alive})
+
+    def close(self):
+        # type: () -> None
+        while not self.__connections.empty():
+            self.__connections.get_nowait().close()
+
+
+class LLMClient:
+    """
+    This class contains attributes of the client every LLM request in the game goes through. It limits the number
+    of requests in flight and records their latencies, token counts and errors. Any backend with generate(prompt)
+    returning (text, prompt_tokens, completion_tokens) can be used, e.g. a fake one for tests.
+    """
+
+    def __init__(self, backend, max_in_flight=LLM_MAX_IN_FLIGHT):
+        # type: (object, int) -> None
+        self.backend: object = backend
+        self.model: str = getattr(backend, "model", "")
+        self.stats: LLMStats = LLMStats()
+        self.__in_flight: threading.BoundedSemaphore = threading.BoundedSemaphore(max(1, max_in_flight))
+
+    def invoke(self, prompt):
+        # type: (str) -> str
+        with self.__in_flight:
+            start_time: float = time.perf_counter()
+            try:
+                text, prompt_tokens, completion_tokens = self.backend.generate(prompt)
+            except Exception:
+                self.stats.record(time.perf_counter() - start_time, error=True)
+                raise
+
+            self.stats.record(time.perf_counter() - start_time, prompt_tokens, completion_tokens)
+            return text
+
+    def load(self):
+        # type: () -> None
+        if hasattr(self.backend, "load"):
+            with self.__in_flight:
+                self.backend.load()
+
+    def close(self):
+        # type: () -> None
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+
+class NamePool:
+    """
+    This class contains attributes of a persistent pool of LLM generated names keyed by model and prompt.
+    Names are kept in least recently used order, evicted once a pool exceeds its capacity and dropped once
+    they are older than the maximum age.
+    """
+
+    def __init__(self, file_name, capacity=NAME_POOL_CAPACITY, max_age=NAME_POOL_MAX_AGE):
+        # type: (str, int, float) -> None
+        self.file_name: str = file_name
+        self.capacity: int = capacity
+        self.max_age: float = max_age
+        self.__pools: dict = {}  # (model, prompt) -> OrderedDict of name -> creation time, least recently used first
+        self.__lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def load(file_name, capacity=NAME_POOL_CAPACITY, max_age=NAME_POOL_MAX_AGE):
+        # type: (str, int, float) -> NamePool
+        name_pool: NamePool = NamePool(file_name, capacity, max_age)
+        try:
+            with open(file_name, "r", encoding="utf-8") as f:
+                data: dict = json.load(f)
+
+            for pool in data.get("pools", []):
+                for name, created in pool["names"]:
+                    name_pool.add(pool["model"], pool["prompt"], name, created)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # start with an empty name pool
+
+        return name_pool
+
+    def save(self):
+        # type: () -> None
+        with self.__lock:
+            data: dict = {"version": 1, "pools": [{"model": model, "prompt": prompt, "names": list(names.items())}
+                                                  for (model, prompt), names in self.__pools.items()]}
+
+        try:
+            write_file_atomically(self.file_name, json.dumps(data).encode("utf-8"))
+        except OSError:
+            pass  # the name pool is only a cache
+
+    def __len__(self):
+        # type: () -> int
+        return sum(len(names) for names in self.__pools.values())
+
+    def add(self, model, prompt, name, created=None):
+        # type: (str, str, str, float or None) -> None
+        created = time.time() if created is None else created
+        with self.__lock:
+            names: OrderedDict = self.__pools.setdefault((model, prompt), OrderedDict())
+            names[name] = created
+            names.move_to_end(name)
+            while len(names) > self.capacity:
+                names.popitem(last=False)
+
+    def draw(self, model, prompt, count, excluded_names=frozenset()):
+        # type: (str, str, int, set or frozenset) -> list
+        # Returning up to count distinct fresh names not in excluded_names (lower case), least recently used first,
+        # and marking them as used.
+        res: list = []  # initial value
+        now: float = time.time()
+        with self.__lock:
+            names: OrderedDict = self.__pools.get((model, prompt), OrderedDict())
+            for name, created in list(names.items()):
+                if len(res) == count:
+                    break
+
+                if now - created > self.max_age:
+                    del names[name]
+                elif name.lower() not in excluded_names:
+                    res.append(name)
+
+            for name in res:
+                names.move_to_end(name)
+
+        return res
+
+
+class SaveCatalog:
+    """
+    This class contains attributes of the index of the saved games: name of the player, turn, level, magnitude of
+    the gold, last time played and size of the file of every saved game, kept so that the saved games can be
+    looked up, sorted and paged through without reading them.
+    """
+
+    def __init__(self, file_name):
+        # type: (str) -> None
+        self.file_name: str = file_name
+        self.__entries: dict = {}  # player name -> summary of the saved game
+        self.__sorted: dict = {}  # (entry key, reversed) -> player names sorted by that key
+        self.__lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def load(file_name):
+        # type: (str) -> SaveCatalog
+        # Loading the catalog kept next to the saved games, rebuilding it if it is missing or out of date.
+        catalog: SaveCatalog = SaveCatalog(file_name)
+        try:
+            with open(file_name, "r", encoding="utf-8") as f:
+                data: dict = json.load(f)
+
+            for entry in data.get("entries", []):
+                catalog.__entries[entry["player_name"]] = entry
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # rebuilt below
+
+        if catalog.refresh(os.path.dirname(file_name)):
+            catalog.save()
+
+        return catalog
+
+    def save(self):
+        # type: () -> None
+        with self.__lock:
+            data: dict = {"version": 1, "entries": list(self.__entries.values())}
+
+        try:
+            write_file_atomically(self.file_name, json.dumps(data).encode("utf-8"))
+        except OSError:
+            pass  # the catalog is rebuilt from the saved games when it is missing
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.__entries)
+
+    def lookup(self, player_name):
+        # type: (str) -> dict or None
+        with self.__lock:
+            return self.__entries.get(player_name)
+
+    def update(self, summary):
+        # type: (dict) -> None
+        with self.__lock:
+            self.__entries[summary["player_name"]] = summary
+            self.__sorted = {}
+
+    def remove(self, player_name):
+        # type: (str) -> None
+        with self.__lock:
+            if self.__entries.pop(player_name, None) is not None:
+                self.__sorted = {}
+
+    def get_page(self, page, sort_key="last_played", reverse=True, page_size=CATALOG_PAGE_SIZE):
+        # type: (int, str, bool, int) -> list
+        # Returning the entries on the given page (starting from 0) of the saved games sorted by the given key.
+        with self.__lock:
+            if (sort_key, reverse) not in self.__sorted:
+                self.__sorted[(sort_key, reverse)] = sorted(self.__entries, reverse=reverse,
+                                                            key=lambda name: (self.__entries[name][sort_key], name))
+
+            names: list = self.__sorted[(sort_key, reverse)][page * page_size:(page + 1) * page_size]
+            return [self.__entries[name] for name in names]
+
+    def get_page_count(self, page_size=CATALOG_PAGE_SIZE):
+        # type: (int) -> int
+        return max(1, -(-len(self.__entries) // page_size))
+
+    def refresh(self, directory):
+        # type: (str) -> bool
+        # Bringing the catalog up to date with the saved games in the directory, reading only the saved games which
+        # are new or have changed since they were catalogued. Returning whether anything has changed.
+        changed: list = []  # initial value
+        with self.__lock:
+            file_names: set = set(list_saved_games(directory)) if os.path.isdir(directory) else set()
+            for player_name in [name for name in self.__entries if name not in file_names]:
+                del self.__entries[player_name]
+                changed.append(player_name)
+
+            for player_name in file_names:
+                entry: dict or None = self.__entries.get(player_name)
+                file_name: str = os.path.join(directory, player_name)
+                if entry is None or entry["file_size"] != os.path.getsize(file_name) or \
+                        entry["last_played"] < os.path.getmtime(file_name):
+                    changed.append(player_name)
+
+        if len(changed) > 0:
+            self.rebuild(directory, [name for name in changed if name in file_names])
+
+        return len(changed) > 0
+
+    def rebuild(self, directory, player_names=None, max_workers=CATALOG_REBUILD_WORKERS):
+        # type: (str, list or None, int) -> list
+        # Reading the given saved games (all of them by default) in worker processes. Returning the names of the
+        # saved games which cannot be read.
+        full_rebuild: bool = player_names is None
+        player_names = list_saved_games(directory) if full_rebuild else player_names
+        file_names: list = [os.path.join(directory, name) for name in player_names]
+        if len(file_names) < CATALOG_REBUILD_CHUNK_SIZE or max_workers <= 1:
+            results: list = read_save_summaries(file_names)
+        else:
+            # Sending the saved games to the workers in chunks, as reading one takes less time than sending it.
+            chunks: list = [file_names[i:i + CATALOG_REBUILD_CHUNK_SIZE]
+                            for i in range(0, len(file_names), CATALOG_REBUILD_CHUNK_SIZE)]
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                results = [summary for chunk in executor.map(read_save_summaries, chunks) for summary in chunk]
+
+        failed: list = []  # initial value
+        with self.__lock:
+            if full_rebuild:
+                self.__entries = {}
+
+            for player_name, file_name, summary in zip(player_names, file_names, results):
+                if summary is None:
+                    self.__entries.pop(player_name, None)
+                    failed.append(file_name)
+                else:
+                    # Saved games are catalogued under their file names, which are the names of their players.
+                    summary["player_name"] = player_name
+                    self.__entries[player_name] = summary
+
+            self.__sorted = {}
+
+        return failed
+
+
+class ModelKeepAlive:
+    """
+    This class contains attributes of a background worker loading the chosen model into Ollama as soon as it is
+    chosen and keeping it loaded for the rest of the session.
+    """
+
+    def __init__(self, llm, interval=KEEP_ALIVE_INTERVAL):
+        # type: (LLMClient, float) -> None
+        self.llm: LLMClient = llm
+        self.interval: float = interval
+        self.__stopped: threading.Event = threading.Event()
+        self.__thread: threading.Thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        # type: () -> None
+        self.__thread.start()
+
+    def stop(self):
+        # type: () -> None
+        self.__stopped.set()
+
+    def __run(self):
+        # type: () -> None
+        while not self.__stopped.is_set():
+            try:
+                self.llm.load()
+            except LLM_REQUEST_ERRORS:
+                pass  # try again at the next interval
+
+            self.__stopped.wait(self.interval)
+
+
+class BoardPrefetcher:
+    """
+    This class contains attributes of a background worker generating the names of placeholder tiles on a lazily
+    generated board ahead of the players.
+    """
+
+    def __init__(self, llm, model, name_pool, board, lookahead=LAZY_BOARD_LOOKAHEAD):
+        # type: (LLMClient, str, NamePool, Board, int) -> None
+        self.llm: LLMClient = llm
+        self.model: str = model
+        self.name_pool: NamePool = name_pool
+        self.board: Board = board
+        self.lookahead: int = lookahead
+        self.__used_names: set or None = None  # collected when the first names are generated
+        self.__pending: OrderedDict = OrderedDict()  # id(object) -> (object, prompt, location), most urgent first
+        self.__generated: list = []  # (location, object) pairs given names since the last call of drain_generated()
+        self.__condition: threading.Condition = threading.Condition()
+        self.__generation_lock: threading.Lock = threading.Lock()  # names are generated by one thread at a time
+        self.__stopped: bool = False
+        self.error_count: int = 0  # batches of names the background worker failed to generate
+        self.last_error: BaseException or None = None
+        self.__thread: threading.Thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        # type: () -> None
+        self.__thread.start()
+
+    def stop(self):
+        # type: () -> None
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+
+        if self.__thread.is_alive():
+            self.__thread.join()
+
+    def prefetch(self, locations):
+        # type: (list) -> None
+        # Queueing every tile within dice range plus the lookahead window of the given locations.
+        tiles: list = self.board.get_tiles()
+        with self.__condition:
+            for distance in range(1, 7 + self.lookahead):
+                for location in locations:
+                    target_location: int = (location + distance) % len(tiles)
+                    for obj, prompt in get_placeholder_targets(tiles[target_location]):
+                        self.__pending.setdefault(id(obj), (obj, prompt, target_location))
+
+            self.__condition.notify_all()
+
+    def drain_generated(self):
+        # type: () -> list
+        with self.__condition:
+            res: list = self.__generated
+            self.__generated = []
+
+        return res
+
+    def ensure_generated(self, location):
+        # type: (int) -> None
+        # Blocking until every name on the tile at the given location has been generated. The names are generated
+        # in the calling thread if the background worker is not running or fails while it is waited for.
+        targets: list = [(obj, prompt, location)
+                         for obj, prompt in get_placeholder_targets(self.board.get_tiles()[location])]
+        if len(targets) == 0:
+            return
+
+        with self.__condition:
+            error_count: int = self.error_count
+            if self.__thread.is_alive() and not self.__stopped:
+                for target in reversed(targets):
+                    self.__pending[id(target[0])] = target
+                    self.__pending.move_to_end(id(target[0]), last=False)
+
+                self.__condition.notify_all()
+                while any(target[0].name is None for target in targets) and self.__thread.is_alive() and \
+                        not self.__stopped and self.error_count == error_count:
+                    self.__condition.wait(LAZY_BOARD_WAIT_INTERVAL)
+
+        with self.__generation_lock:
+            missing_targets: list = [target for target in targets if target[0].name is None]
+            if len(missing_targets) > 0:
+                self.__generate(missing_targets)
+
+    def __generate(self, targets):
+        # type: (list) -> None
+        def on_name_generated(index, name):
+            # type: (int, str) -> None
+            with self.__condition:
+                targets[index][0].name = name
+                self.__generated.append((targets[index][2], targets[index][0]))
+                self.__condition.notify_all()
+
+        if self.__used_names is None:
+            # Reading every name on a lazily loaded board is left to the first generation so that resuming a game
+            # does not wait for it.
+            self.__used_names = set(name.lower() for name in self.board.get_names())
+
+        generate_names_with_pool(self.llm, self.model, self.name_pool, [target[1] for target in targets],
+                                 on_name_generated, self.__used_names)
+
+    def __run(self):
+        # type: () -> None
+        while True:
+            with self.__condition:
+                while len(self.__pending) == 0 and not self.__stopped:
+                    self.__condition.wait()
+
+                if self.__stopped:
+                    return
+
+                targets: list = []  # initial value
+                while len(self.__pending) > 0 and len(targets) < NAME_BATCH_SIZE * LLM_MAX_CONCURRENCY:
+                    target: tuple = self.__pending.popitem(last=False)[1]
+                    if target[0].name is None:
+                        targets.append(target)
+
+            if len(targets) == 0:
+                continue
+
+            try:
+                with self.__generation_lock:
+                    self.__generate([target for target in targets if target[0].name is None])
+            except Exception as error:
+                # Recording the error and carrying on, the tiles are queued again once the players get close to
+                # them and ensure_generated() generates them itself if they are needed before that.
+                with self.__condition:
+                    self.error_count += 1
+                    self.last_error = error
+                    self.__condition.notify_all()
+
+
+class AutosaveJournal:
+    """
+    This class contains attributes of the autosave of a game. Every turn appends a small entry with what the turn
+    changed to the journal of the game, and every SNAPSHOT_INTERVAL turns the whole game is saved and the journal is
+    started again. Files are written by a background thread so that the player never waits for the disk.
+    """
+
+    def __init__(self, file_name, catalog=None, snapshot_interval=SNAPSHOT_INTERVAL):
+        # type: (str, SaveCatalog or None, int) -> None
+        self.file_name: str = file_name
+        self.catalog: SaveCatalog or None = catalog
+        self.journal_file_name: str = file_name + JOURNAL_FILE_SUFFIX
+        self.snapshot_interval: int = snapshot_interval
+        self.__upgrade_refs: dict = {}  # id(upgrade) -> [shop index, upgrade index]
+        self.__snapshot_turn: int = 0
+        self.__last_players: list = []  # last journaled stats of every player
+        self.__last_upgrade_counts: list = []  # last journaled number of upgrades of every player
+        self.__last_places: dict = {}  # tile index -> last journaled state of the place
+        self.__queue: queue.Queue = queue.Queue()
+        self.__error: Exception or None = None
+        self.__thread: threading.Thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    @staticmethod
+    def __player_stats(i, player):
+        # type: (int, Player) -> list
+        return [i, player.level, player.location, player.gold.to_json(), player.exp.to_json(),
+                player.required_exp.to_json()]
+
+    @staticmethod
+    def __place_state(i, place, players):
+        # type: (int, Place, list) -> list
+        owner: int or None = None
+        for j, player in enumerate(players):
+            if place.owner is player:
+                owner = j
+
+        return [i, place.level, owner, place.gold_cost.to_json(), place.gold_per_turn.to_json(),
+                place.exp_per_turn.to_json()]
+
+    def snapshot(self, game_data):
+        # type: (SavedGameData) -> None
+        # Encoding the whole game here keeps it consistent with the turn being played, writing it is left to the
+        # background thread.
+        data, _, self.__upgrade_refs = encode_game_data(game_data)
+        players: list = [game_data.player_data, game_data.ai_player]
+        self.__snapshot_turn = game_data.turn
+        self.__last_players = [self.__player_stats(i, player) for i, player in enumerate(players)]
+        self.__last_upgrade_counts = [len(player.get_upgrade_list()) for player in players]
+        self.__last_places = {}
+        header: dict = {"version": JOURNAL_VERSION, "player_id": game_data.player_data.player_id,
+                        "turn": game_data.turn}
+        self.__queue.put(("snapshot", data, encode_journal_record(header), summarise_game_data(game_data)))
+
+    def record_turn(self, game_data, generated=()):
+        # type: (SavedGameData, list or tuple) -> None
+        # Journaling the stats of the players, their new upgrades, the places under the players (the only ones a
+        # turn can change) and the (location, object) pairs given names since the previous turn.
+        if game_data.turn - self.__snapshot_turn >= self.snapshot_interval:
+            self.snapshot(game_data)
+            return
+
+        players: list = [game_data.player_data, game_data.ai_player]
+        tiles: list = game_data.board.get_tiles()
+        entry: dict = {"turn": game_data.turn}
+        stats: list = [self.__player_stats(i, player) for i, player in enumerate(players)]
+        changed_stats: list = [stats[i] for i in range(len(players)) if stats[i] != self.__last_players[i]]
+        if len(changed_stats) > 0:
+            entry["players"] = changed_stats
+            self.__last_players = stats
+
+        upgrades: list = []  # initial value
+        for i, player in enumerate(players):
+            start: int = min(self.__last_upgrade_counts[i], len(player.get_upgrade_list()))
+            if len(player.get_upgrade_list()) != self.__last_upgrade_counts[i]:
+                upgrades.append([i, start, [self.__upgrade_refs[id(upgrade)]
+                                            for upgrade in player.get_upgrade_list()[start:]]])
+                self.__last_upgrade_counts[i] = len(player.get_upgrade_list())
+
+        if len(upgrades) > 0:
+            entry["upgrades"] = upgrades
+
+        places: list = []  # initial value
+        for location in sorted(set(player.location for player in players)):
+            if isinstance(tiles[location], Place):
+                state: list = self.__place_state(location, tiles[location], players)
+                if state != self.__last_places.get(location):
+                    places.append(state)
+                    self.__last_places[location] = state
+
+        if len(places) > 0:
+            entry["places"] = places
+
+        names: list = [[location, obj.name] for location, obj in generated if isinstance(obj, Place)]
+        if len(names) > 0:
+            entry["names"] = names
+
+        upgrade_names: list = [self.__upgrade_refs[id(obj)] + [obj.name] for location, obj in generated
+                               if isinstance(obj, Upgrade)]
+        if len(upgrade_names) > 0:
+            entry["upgrade_names"] = upgrade_names
+
+        self.__queue.put(("entry", encode_journal_record(entry)))
+
+    def close(self, game_data=None):
+        # type: (SavedGameData or None) -> None
+        # Saving the whole game if given, then waiting for everything to be written.
+        if game_data is not None:
+            self.snapshot(game_data)
+
+        self.__queue.put(None)
+        self.__thread.join()
+        if self.__error is not None:
+            raise self.__error
+
+    def __run(self):
+        # type: () -> None
+        journal = None
+        while True:
+            item: tuple or None = self.__queue.get()
+            if item is None:
+                break
+
+            if self.__error is not None:
+                continue  # keep draining the queue so that close() returns
+
+            try:
+                if item[0] == "snapshot":
+                    write_file_atomically(self.file_name, item[1])
+                    if self.catalog is not None:
+                        self.catalog.update(dict(item[3], file_size=len(item[1]), last_played=time.time()))
+                        self.catalog.save()
+
+                    if journal is not None:
+                        journal.close()
+                    journal = open(self.journal_file_name, "wb")
+                    journal.write(item[2])
+                else:
+                    journal.write(item[1])
+
+                journal.flush()
+                os.fsync(journal.fileno())
+            except OSError as e:
+                self.__error = e
+
+        if journal is not None:
+            journal.close()
+
+
+class TerminalRenderer:
+    """
+    This class contains attributes of the screen of the game. A frame of lines is drawn at the top of the terminal
+    and afterwards only its lines which have changed are redrawn, using ANSI escape sequences. Messages and prompts
+    are written below the frame and erased when the next frame is drawn. When the output is not a terminal, frames
+    are written out in full.
+    """
+
+    def __init__(self, stream=None, interactive=None):
+        # type: (object, bool or None) -> None
+        self.stream = sys.stdout if stream is None else stream
+        self.interactive: bool = self.stream.isatty() if interactive is None else interactive
+        self.__frame: list = []  # lines of the frame on the screen
+        self.__rows_below: int = 0  # rows written below the frame since it was drawn
+        self.__valid: bool = False  # whether the frame is still where it was drawn (nothing has scrolled it)
+
+    def invalidate(self):
+        # type: () -> None
+        # Drawing the next frame on a cleared screen, e.g. after something else has written to the terminal.
+        self.__valid = False
+
+    def render(self, lines):
+        # type: (list) -> None
+        if not self.interactive:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            return
+
+        width: int = shutil.get_terminal_size().columns
+        lines = [line[:width - 1] for line in lines]  # a wrapped line would move the rows below it
+        output: list = []  # initial value
+        if not self.__valid:
+            enable_ansi_escape_sequences()
+            output.append(ANSI_CLEAR_SCREEN + "\n".join(lines))
+        else:
+            for row, line in enumerate(lines):
+                if row >= len(self.__frame) or self.__frame[row] != line:
+                    output.append("\033[" + str(row + 1) + ";1H" + line + ANSI_CLEAR_LINE)
+
+        # Moving below the frame and erasing what is left of a longer frame and of the previous prompts.
+        output.append("\033[" + str(len(lines) + 1) + ";1H" + ANSI_CLEAR_BELOW)
+        self.stream.write("".join(output))
+        self.stream.flush()
+        self.__frame = lines
+        self.__rows_below = 0
+        self.__valid = True
+
+    def __count_rows(self, text):
+        # type: (str) -> None
+        if not self.interactive:
+            return
+
+        terminal_size: os.terminal_size = shutil.get_terminal_size()
+        self.__rows_below += sum(max(1, -(-len(line) // terminal_size.columns)) for line in text.split("\n"))
+        if len(self.__frame) + self.__rows_below >= terminal_size.lines:
+            self.__valid = False  # the terminal has scrolled
+
+    def print(self, text=""):
+        # type: (str) -> None
+        self.stream.write(text + "\n")
+        self.stream.flush()
+        self.__count_rows(text)
+
+    def input(self, prompt=""):
+        # type: (str) -> str
+        self.stream.flush()
+        res: str = input(prompt)
+        self.__count_rows(prompt + res)
+        return res
+
+
+class ReplayRecorder:
+    """
+    This class contains attributes of the replay trace of a game: its seed and settings, the turns it was resumed
+    from and every decision of the player, which are all that is needed to play it again (see replay_game()).
+    Records are framed like the records of the journal.
+    """
+
+    def __init__(self, file_name):
+        # type: (str) -> None
+        self.file_name: str = file_name
+        self.enabled: bool = False  # games created before they had seeds have no trace
+
+    def start(self, game_data, settings=None):
+        # type: (SavedGameData, GameSettings or None) -> None
+        # Starting the trace of a new game created with the settings, or appending to the trace of a loaded game.
+        if settings is not None:
+            header: dict = {"version": REPLAY_VERSION, "seed": game_data.seed, "player_name": game_data.player_name,
+                            "settings": vars(settings)}
+            write_file_atomically(self.file_name, encode_journal_record(header))
+
+        self.enabled = os.path.exists(self.file_name)
+        self.__append({"resume": game_data.turn})
+
+    def record_turn(self, turn, decisions):
+        # type: (int, list) -> None
+        if len(decisions) > 0:
+            self.__append({"turn": turn, "decisions": decisions})
+
+    def record_resume(self, turn):
+        # type: (int) -> None
+        # Recording that the game goes on from the given turn with resume_random(), replacing what was recorded
+        # after it (e.g. after turns have been undone).
+        self.__append({"resume": turn})
+
+    def __append(self, record):
+        # type: (dict) -> None
+        if self.enabled:
+            with open(self.file_name, "ab") as f:
+                f.write(encode_journal_record(record))
+
+
+class LegacySaveUnpickler(pickle.Unpickler):
+    """
+    This class contains attributes of an unpickler for saved games of older versions which only allows the classes of
+    the game and mpmath numbers.
+    """
+
+    def find_class(self, module, name):
+        # type: (str, str) -> type
+        if name in LEGACY_SAVE_CLASSES:
+            return globals()[name]
+        if module.startswith("mpmath.") and name in ["mpf", "_make_mpf"]:
+            return pickle.Unpickler.find_class(self, module, name)
+        raise pickle.UnpicklingError("Saved game data cannot contain " + str(module) + "." + str(name) + "!")
+
+
+class Dice:
+    """
+    This class contains attributes of the dice in the game.
+    """
+
+    def __init__(self, rng=random):
+        # type: (random.Random) -> None
+        self.value: int = rng.randint(1, 6)
+
+    def __str__(self):
+        # type: () -> str
+        return "Value: " + str(self.value) + "\n"
+
+    def clone(self):
+        # type: () -> Dice
+        return copy.deepcopy(self)
+
+
+class Board:
+    """
+    This class contains attributes of the board in this game.
+    """
+
+    def __init__(self, tiles):
+        # type: (list) -> None
+        self.__tiles: list = tiles
+
+    def __str__(self):
+        # type: () -> str
+        return "Current board representation:\n\n" + "".join(str(tile) + "\n" for tile in self.__tiles)
+
+    def get_tiles(self):
+        # type: () -> list
+        return self.__tiles
+
+    def get_shops(self):
+        # type: () -> list
+        # Returning every upgrade shop on the board once, in the order they first appear.
+        shops: list = []  # initial value
+        for tile in self.__tiles:
+            if isinstance(tile, UpgradeShop) and all(tile is not shop for shop in shops):
+                shops.append(tile)
+
+        return shops
+
+    def get_tile_type(self, i):
+        # type: (int) -> int
+        return self.__tiles[i].TILE_TYPE
+
+    def get_loaded_tiles(self):
+        # type: () -> list
+        # Returning (index, tile) pairs of every tile which may have changed since the board was created.
+        return list(enumerate(self.__tiles))
+
+    def get_names(self):
+        # type: () -> list
+        # Returning the names of the places and upgrades on the board which have been generated.
+        names: list = [tile.name for tile in self.__tiles if isinstance(tile, Place)]
+        for shop in self.get_shops():
+            names += [upgrade.name for upgrade in shop.get_upgrades_sold()]
+
+        return [name for name in names if name is not None]
+
+    def get_name_overrides(self):
+        # type: () -> dict
+        # Returning tile index -> name of the places named differently from the static table of the board.
+        return {}
+
+    def rename_places(self, names):
+        # type: (dict) -> None
+        for i, name in names.items():
+            self.__tiles[i].name = name
+
+    def clone(self):
+        # type: () -> Board
+        return copy.deepcopy(self)
+
+
+class LazyTileList:
+    """
+    This class contains attributes of the tiles of a memory-mapped static table, decoded one at a time when they
+    are accessed. Tiles which have changed since loading (owned, upgraded or waiting for a name) stay decoded, the
+    others are evicted once more than cache_size of them are decoded.
+    """
+
+    def __init__(self, data, offset, length, cache_size=LAZY_BOARD_CACHE_SIZE):
+        # type: (mmap.mmap or bytes, int, int, int) -> None
+        self.data: mmap.mmap or bytes = data
+        self.offset: int = offset
+        self.length: int = length
+        self.cache_size: int = cache_size
+        self.__tile_count, upgrades_length = struct.unpack_from("<II", data, offset)
+        self.__records_start: int = offset + 8 + 4 * (self.__tile_count + 1)
+        upgrades_start: int = self.__records_start + struct.unpack_from("<I", data, offset + 8 +
+                                                                          4 * self.__tile_count)[0]
+        self.shops: list = decode_upgrade_shops(data[upgrades_start:upgrades_start + upgrades_length])
+        self.__cache: OrderedDict = OrderedDict()  # tile index -> [tile, name in the static table], least recent first
+        self.__pinned: dict = {}  # tile index -> [tile, name in the static table] of tiles which cannot be evicted
+        self.__name_overrides: dict = {}  # tile index -> name of evicted places named after loading
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        return self.__tile_count
+
+    def __iter__(self):
+        for i in range(self.__tile_count):
+            yield self[i]
+
+    def __deepcopy__(self, memo):
+        # type: (dict) -> list
+        # A memory map cannot be copied, so the copy is a list of every tile decoded. Copying through the memo keeps
+        # the places the players own the same objects in the copy of the board and in the copies of the players.
+        return copy.deepcopy(list(self), memo)
+
+    def __read_record(self, i):
+        # type: (int) -> bytes
+        start, end = struct.unpack_from("<II", self.data, self.offset + 8 + 4 * i)
+        return self.data[self.__records_start + start:self.__records_start + end]
+
+    def __getitem__(self, i):
+        # type: (int) -> Tile
+        if i < 0:
+            i += self.__tile_count
+        if not 0 <= i < self.__tile_count:
+            raise IndexError("tile index out of range")
+
+        with self.__lock:
+            entry: list or None = self.__pinned.get(i)
+            if entry is not None:
+                return entry[0]
+
+            entry = self.__cache.get(i)
+            if entry is not None:
+                self.__cache.move_to_end(i)
+                return entry[0]
+
+            record: list = json.loads(self.__read_record(i))
+            tile: Tile = decode_tile_record(record, self.shops)
+            if isinstance(tile, UpgradeShop):
+                return tile  # shops are decoded once with the table
+
+            name: str or None = tile.name
+            if i in self.__name_overrides:
+                tile.name = self.__name_overrides.pop(i)
+
+            self.__cache[i] = [tile, name]
+            if len(self.__cache) > self.cache_size:
+                self.__evict()
+
+            return tile
+
+    def __evict(self):
+        # type: () -> None
+        # Evicting the least recently used tile which has not changed. Owned or upgraded places are pinned for
+        # good, places still waiting for a name are skipped as the name generator holds on to them.
+        for i in list(self.__cache):
+            tile, name = self.__cache[i]
+            if isinstance(tile, Place) and (tile.owner is not None or tile.level != 1):
+                self.__pinned[i] = self.__cache.pop(i)
+            elif isinstance(tile, Place) and tile.name is None:
+                continue
+            else:
+                del self.__cache[i]
+                if tile.name != name:
+                    self.__name_overrides[i] = tile.name
+                return
+
+    def get_loaded_tiles(self):
+        # type: () -> list
+        with self.__lock:
+            return [(i, entry[0]) for i, entry in list(self.__pinned.items()) + list(self.__cache.items())]
 
+    def get_names(self):
+        # type: () -> list
+        # Parsing every record at once without creating the tiles.
+        with self.__lock:
+            records: list = json.loads(b"[" + b",".join(self.__read_record(i) for i in range(self.__tile_count)) +
+                                       b"]")
+            names: dict = {i: record[1] for i, record in enumerate(records) if record[0] == Place.TILE_TYPE}
+            names.update(self.__name_overrides)
+            for i, entry in list(self.__pinned.items()) + list(self.__cache.items()):
+                if isinstance(entry[0], Place):
+                    names[i] = entry[0].name
+
+        names_list: list = list(names.values())
+        for shop in self.shops:
+            names_list += [upgrade.name for upgrade in shop.get_upgrades_sold()]
+
+        return [name for name in names_list if name is not None]
+
+    def rename_places(self, names):
+        # type: (dict) -> None
+        # Renaming the decoded places and remembering the names of the others for when they are decoded.
+        with self.__lock:
+            for i, name in names.items():
+                entry: list or None = self.__pinned.get(i) or self.__cache.get(i)
+                if entry is not None:
+                    entry[0].name = name
+                else:
+                    self.__name_overrides[i] = name
 
-def mpf_product_of_list(a_list: list) -> mpf:
-    return mpf(reduce(lambda x, y: mpf(x) * mpf(y) if is_number(x) and
-                                                      is_number(y) else mpf(x) if is_number(x) and not is_number(
-        y) else mpf(y) if is_number(y) and not is_number(x) else 1, a_list, 1))
+    def get_name_overrides(self):
+        # type: () -> dict
+        with self.__lock:
+            res: dict = dict(self.__name_overrides)
+            for i, (tile, name) in list(self.__pinned.items()) + list(self.__cache.items()):
+                if isinstance(tile, Place) and tile.name != name:
+                    res[i] = tile.name
 
+        return res
 
-def generate_random_name() -> str:
-    res: str = ""  # initial value
-    name_length: int = random.randint(3, 25)
-    for i in range(name_length):
-        res += LETTERS[random.randint(0, len(LETTERS) - 1)]
 
-    return res.capitalize()
+class LazyBoard(Board):
+    """
+    This class contains attributes of a board loaded from a saved game whose tiles are decoded only when needed.
+    """
 
+    def __init__(self, tiles):
+        # type: (LazyTileList) -> None
+        Board.__init__(self, tiles)
+        self.__tiles: LazyTileList = tiles
 
-def load_game_data(file_name):
-    # type: (str) -> SavedGameData
-    return pickle.load(open(file_name, "rb"))
+    def get_shops(self):
+        # type: () -> list
+        return self.__tiles.shops
 
+    def get_loaded_tiles(self):
+        # type: () -> list
+        return self.__tiles.get_loaded_tiles()
 
-def save_game_data(game_data, file_name):
-    # type: (SavedGameData, str) -> None
-    pickle.dump(game_data, open(file_name, "wb"))
+    def get_names(self):
+        # type: () -> list
+        return self.__tiles.get_names()
 
+    def get_name_overrides(self):
+        # type: () -> dict
+        return self.__tiles.get_name_overrides()
 
-def clear():
-    # type: () -> None
-    if sys.platform.startswith('win'):
-        os.system('cls')  # For Windows System
-    else:
-        os.system('clear')  # For Linux System
+    def rename_places(self, names):
+        # type: (dict) -> None
+        self.__tiles.rename_places(names)
 
+    def get_static_table(self):
+        # type: () -> bytes
+        return bytes(self.__tiles.data[self.__tiles.offset:self.__tiles.offset + self.__tiles.length])
 
-# Creating necessary classes for the game.
+    def __deepcopy__(self, memo):
+        # type: (dict) -> Board
+        # Copying into a board with every tile decoded (see LazyTileList.__deepcopy__), e.g. when the loaded game is
+        # cloned.
+        return Board(copy.deepcopy(self.__tiles, memo))
 
 
-class Dice:
+class ArrayTileList:
     """
-    This class contains attributes of the dice in the game.
+    This class contains attributes of the tiles of a board stored as arrays instead of one object per tile. Every
+    tile has a type code and a slot, which is the index of its fields in the arrays of the places for places and the
+    index of its shop for upgrade shops. Places are handed out as views over the arrays (created the first time a
+    place is accessed), the other tiles are shared objects.
     """
 
     def __init__(self):
         # type: () -> None
-        self.value: int = random.randint(1, 6)
-
-    def __str__(self):
-        # type: () -> str
-        return "Value: " + str(self.value) + "\n"
-
-    def clone(self):
-        # type: () -> Dice
-        return copy.deepcopy(self)
-
-
-class Board:
+        self.tile_types: bytearray = bytearray()  # tile index -> TILE_TYPE
+        self.slots: array.array = array.array("i")  # tile index -> place id, shop id or -1
+        self.place_tiles: array.array = array.array("i")  # place id -> tile index
+        self.levels: array.array = array.array("i")  # place id -> level
+        self.owner_ids: array.array = array.array("b")  # place id -> index into owners, -1 for no owner
+        self.names: list = []  # place id -> name, None until it is generated
+        self.description_ids: array.array = array.array("h")  # place id -> index into descriptions
+        # Big numbers of the places as mantissa * 2 ** exponent, exponents beyond 64 bits are not supported.
+        self.gold_cost_mantissas: array.array = array.array("d")
+        self.gold_cost_exponents: array.array = array.array("q")
+        self.gold_per_turn_mantissas: array.array = array.array("d")
+        self.gold_per_turn_exponents: array.array = array.array("q")
+        self.exp_per_turn_mantissas: array.array = array.array("d")
+        self.exp_per_turn_exponents: array.array = array.array("q")
+        self.descriptions: list = []  # interned descriptions of the places
+        self.owners: list = []  # players owning places on the board
+        self.shops: list = []  # upgrade shops on the board
+        self.__description_ids: dict = {}  # description -> index into descriptions
+        self.__shop_ids: dict = {}  # id(shop) -> index into shops
+        self.__shared_tiles: dict = {StartTile.TILE_TYPE: StartTile(), EmptySpace.TILE_TYPE: EmptySpace(),
+                                     RandomRewardTile.TILE_TYPE: RandomRewardTile()}
+        self.__views: list = []  # place id -> PlaceView or None
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __getstate__(self):
+        # type: () -> dict
+        # The lock cannot be copied and the index of the shops is keyed by their identities, both are rebuilt.
+        state: dict = dict(self.__dict__)
+        del state["_ArrayTileList__lock"]
+        del state["_ArrayTileList__shop_ids"]
+        return state
+
+    def __setstate__(self, state):
+        # type: (dict) -> None
+        self.__dict__.update(state)
+        self.__shop_ids = {id(shop): i for i, shop in enumerate(self.shops)}
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.tile_types)
+
+    def __iter__(self):
+        for i in range(len(self.tile_types)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        # type: (int) -> Tile
+        tile_type: int = self.tile_types[i]
+        if tile_type == Place.TILE_TYPE:
+            view: PlaceView or None = self.__views[self.slots[i]]
+            return self.get_place(self.slots[i]) if view is None else view
+        elif tile_type == UpgradeShop.TILE_TYPE:
+            return self.shops[self.slots[i]]
+        return self.__shared_tiles[tile_type]
+
+    def get_place(self, place_id):
+        # type: (int) -> PlaceView
+        view: PlaceView or None = self.__views[place_id]
+        if view is None:
+            # Keeping a single view per place, so that places still compare by identity.
+            with self.__lock:
+                view = self.__views[place_id]
+                if view is None:
+                    view = PlaceView(self, place_id)
+                    self.__views[place_id] = view
+        return view
+
+    def get_owner_id(self, owner):
+        # type: (Player or None) -> int
+        if owner is None:
+            return -1
+        for owner_id, known_owner in enumerate(self.owners):
+            if known_owner is owner:
+                return owner_id
+        self.owners.append(owner)
+        return len(self.owners) - 1
+
+    def get_description_id(self, description):
+        # type: (str) -> int
+        description_id: int or None = self.__description_ids.get(description)
+        if description_id is None:
+            description_id = len(self.descriptions)
+            self.descriptions.append(description)
+            self.__description_ids[description] = description_id
+        return description_id
+
+    def append_place(self, name, description, gold_cost, gold_per_turn, exp_per_turn):
+        # type: (str or None, str, BigNumber, BigNumber, BigNumber) -> PlaceView
+        place_id: int = len(self.place_tiles)
+        self.tile_types.append(Place.TILE_TYPE)
+        self.slots.append(place_id)
+        self.place_tiles.append(len(self.tile_types) - 1)
+        self.levels.append(1)
+        self.owner_ids.append(-1)
+        self.names.append(name)
+        self.description_ids.append(self.get_description_id(description))
+        self.gold_cost_mantissas.append(gold_cost.mantissa)
+        self.gold_cost_exponents.append(gold_cost.exponent)
+        self.gold_per_turn_mantissas.append(gold_per_turn.mantissa)
+        self.gold_per_turn_exponents.append(gold_per_turn.exponent)
+        self.exp_per_turn_mantissas.append(exp_per_turn.mantissa)
+        self.exp_per_turn_exponents.append(exp_per_turn.exponent)
+        self.__views.append(None)
+        return self.get_place(place_id)
+
+    def append_tile(self, tile_type, shop=None):
+        # type: (int, UpgradeShop or None) -> Tile
+        # Appending a tile other than a place.
+        slot: int = -1
+        if tile_type == UpgradeShop.TILE_TYPE:
+            slot = self.__shop_ids.get(id(shop), len(self.shops))
+            if slot == len(self.shops):
+                self.__shop_ids[id(shop)] = slot
+                self.shops.append(shop)
+        elif tile_type not in self.__shared_tiles:
+            raise ValueError("Unknown tile type " + str(tile_type))
+
+        self.tile_types.append(tile_type)
+        self.slots.append(slot)
+        return self[len(self.tile_types) - 1]
+
+    def append_record(self, record, shops):
+        # type: (list, list) -> None
+        # Appending a tile record of a static table (see decode_tile_record).
+        if record[0] == Place.TILE_TYPE:
+            self.append_place(record[1], record[2], BigNumber.from_json(record[3]), BigNumber.from_json(record[4]),
+                              BigNumber.from_json(record[5]))
+        elif record[0] == UpgradeShop.TILE_TYPE:
+            self.append_tile(record[0], shops[record[1]])
+        else:
+            self.append_tile(record[0])
+
+    def encode_record(self, i):
+        # type: (int) -> list
+        # Returning the static table record of a place without creating its view.
+        place_id: int = self.slots[i]
+        return [Place.TILE_TYPE, self.names[place_id], self.descriptions[self.description_ids[place_id]],
+                BigNumber.from_normalised_parts(self.gold_cost_mantissas[place_id],
+                                                self.gold_cost_exponents[place_id]).to_json(),
+                BigNumber.from_normalised_parts(self.gold_per_turn_mantissas[place_id],
+                                                self.gold_per_turn_exponents[place_id]).to_json(),
+                BigNumber.from_normalised_parts(self.exp_per_turn_mantissas[place_id],
+                                                self.exp_per_turn_exponents[place_id]).to_json()]
+
+
+class ArrayBoard(Board):
     """
-    This class contains attributes of the board in this game.
+    This class contains attributes of a board whose tiles are stored in arrays (see ArrayTileList).
     """
 
-    def __init__(self, tiles):
-        # type: (list) -> None
-        self.__tiles: list = tiles
+    def __init__(self, tiles=None):
+        # type: (ArrayTileList or None) -> None
+        tiles = ArrayTileList() if tiles is None else tiles
+        Board.__init__(self, tiles)
+        self.__tiles: ArrayTileList = tiles
 
-    def __str__(self):
-        # type: () -> str
-        res: str = "Current board representation:\n\n"
-        for tile in self.__tiles:
-            res += str(tile) + "\n"
+    def get_tile_type(self, i):
+        # type: (int) -> int
+        return self.__tiles.tile_types[i]
 
-        return res
+    def get_shops(self):
+        # type: () -> list
+        return self.__tiles.shops
 
-    def get_tiles(self):
+    def get_loaded_tiles(self):
         # type: () -> list
-        return self.__tiles
+        # Only the levels and owners of places change while playing, names are kept in the static table.
+        tiles: ArrayTileList = self.__tiles
+        return [(tiles.place_tiles[place_id], tiles.get_place(place_id)) for place_id in range(len(tiles.levels))
+                if tiles.levels[place_id] != 1 or tiles.owner_ids[place_id] >= 0]
 
-    def clone(self):
-        # type: () -> Board
-        return copy.deepcopy(self)
+    def get_names(self):
+        # type: () -> list
+        names: list = [name for name in self.__tiles.names if name is not None]
+        for shop in self.__tiles.shops:
+            names += [upgrade.name for upgrade in shop.get_upgrades_sold() if upgrade.name is not None]
+
+        return names
+
+    def rename_places(self, names):
+        # type: (dict) -> None
+        for i, name in names.items():
+            self.__tiles.names[self.__tiles.slots[i]] = name
 
 
 class Tile:
@@ -164,6 +3135,8 @@ class StartTile(Tile):
     This class contains attributes of the start tile where the player can gain awards by passing or landing on it.
     """
 
+    TILE_TYPE: int = 0
+
     def __init__(self):
         # type: () -> None
         Tile.__init__(self, "START TILE", "A tile where the player can gain awards by passing or landing on it.")
@@ -174,6 +3147,8 @@ class EmptySpace(Tile):
     This class contains attributes of an empty space where nothing happens if the player lands on it.
     """
 
+    TILE_TYPE: int = 1
+
     def __init__(self):
         # type: () -> None
         Tile.__init__(self, "EMPTY SPACE", "A tile where nothing happens if the player lands on it.")
@@ -184,16 +3159,22 @@ class Place(Tile):
     This class contains attributes of a place the player can purchase and upgrade when landing on it.
     """
 
+    TILE_TYPE: int = 2
+
     def __init__(self, name, description, gold_cost, gold_per_turn, exp_per_turn):
-        # type: (str, str, mpf, mpf, mpf) -> None
+        # type: (str, str, BigNumber, BigNumber, BigNumber) -> None
         Tile.__init__(self, name, description)
         self.level: int = 1
-        self.gold_cost: mpf = gold_cost
-        self.gold_per_turn: mpf = gold_per_turn
-        self.exp_per_turn: mpf = exp_per_turn
+        self.gold_cost: BigNumber = gold_cost
+        self.gold_per_turn: BigNumber = gold_per_turn
+        self.exp_per_turn: BigNumber = exp_per_turn
         self.owner: Player or None = None  # initial value
 
     def __str__(self):
+        # type: () -> str
+        return entity_texts.get(self, "str", self.get_text_key(), self.__format)
+
+    def __format(self):
         # type: () -> str
         res: str = Tile.__str__(self)  # initial value
         res += "Level: " + str(self.level) + "\n"
@@ -207,12 +3188,153 @@ class Place(Tile):
             res += str(self.owner.name) + "\n"
         return res
 
+    def get_text_key(self):
+        # type: () -> tuple
+        # Returning the values of every field shown in the texts of the place (see TextCache).
+        gold_cost: BigNumber = self.gold_cost
+        gold_per_turn: BigNumber = self.gold_per_turn
+        exp_per_turn: BigNumber = self.exp_per_turn
+        owner: Player or None = self.owner
+        return (self.name, self.description, self.level, gold_cost.mantissa, gold_cost.exponent,
+                gold_per_turn.mantissa, gold_per_turn.exponent, exp_per_turn.mantissa, exp_per_turn.exponent,
+                None if owner is None else owner.name)
+
     def level_up(self):
         # type: () -> None
-        self.level += 1
-        self.gold_cost *= mpf("10") ** triangular(self.level)
-        self.gold_per_turn *= mpf("10") ** (triangular(self.level) - 1)
-        self.exp_per_turn *= mpf("10") ** (triangular(self.level) - 1)
+        # Reading every field once, as the fields of a PlaceView are rebuilt from arrays whenever they are read.
+        old_gold_per_turn: BigNumber = self.gold_per_turn
+        old_exp_per_turn: BigNumber = self.exp_per_turn
+        level: int = self.level + 1
+        self.level = level
+        self.gold_cost = self.gold_cost * BigNumber.power_of_ten(triangular(level))
+        self.gold_per_turn = old_gold_per_turn * BigNumber.power_of_ten(triangular(level) - 1)
+        self.exp_per_turn = old_exp_per_turn * BigNumber.power_of_ten(triangular(level) - 1)
+        owner: Player or None = self.owner
+        if owner is not None:
+            owner.update_place_income(self, old_gold_per_turn, old_exp_per_turn)
+
+    def get_state(self):
+        # type: () -> tuple
+        # Returning the fields of the place a turn can change. Big numbers are never changed in place, so the state
+        # shares them with the place and costs a few references.
+        owner: Player or None = self.owner
+        return (self.level, self.gold_cost, self.gold_per_turn, self.exp_per_turn, owner,
+                None if owner is None else owner.get_owned_places().get_order(self))
+
+    def set_state(self, state):
+        # type: (tuple) -> None
+        # Restoring a state returned by get_state(), moving the place back to its owner. The income of the players
+        # is restored with their own states (see Player.set_state()).
+        level, gold_cost, gold_per_turn, exp_per_turn, owner, order = state
+        current_owner: Player or None = self.owner
+        if current_owner is not owner:
+            if current_owner is not None:
+                current_owner.get_owned_places().remove(self)
+            if owner is not None:
+                owner.get_owned_places().insert(self, order)
+            self.owner = owner
+
+        self.level = level
+        self.gold_cost = gold_cost
+        self.gold_per_turn = gold_per_turn
+        self.exp_per_turn = exp_per_turn
+
+
+class PlaceView(Place):
+    """
+    This class contains attributes of a place stored in the arrays of an ArrayTileList. It has no fields of its
+    own, reading and writing its attributes reads and writes the arrays.
+    """
+
+    def __init__(self, tiles, place_id):
+        # type: (ArrayTileList, int) -> None
+        self.tiles: ArrayTileList = tiles
+        self.place_id: int = place_id
+
+    @property
+    def name(self):
+        # type: () -> str or None
+        return self.tiles.names[self.place_id]
+
+    @name.setter
+    def name(self, value):
+        # type: (str or None) -> None
+        self.tiles.names[self.place_id] = value
+
+    @property
+    def description(self):
+        # type: () -> str
+        return self.tiles.descriptions[self.tiles.description_ids[self.place_id]]
+
+    @description.setter
+    def description(self, value):
+        # type: (str) -> None
+        self.tiles.description_ids[self.place_id] = self.tiles.get_description_id(value)
+
+    @property
+    def level(self):
+        # type: () -> int
+        return self.tiles.levels[self.place_id]
+
+    @level.setter
+    def level(self, value):
+        # type: (int) -> None
+        self.tiles.levels[self.place_id] = value
+
+    @property
+    def owner(self):
+        # type: () -> Player or None
+        owner_id: int = self.tiles.owner_ids[self.place_id]
+        return None if owner_id < 0 else self.tiles.owners[owner_id]
+
+    @owner.setter
+    def owner(self, value):
+        # type: (Player or None) -> None
+        self.tiles.owner_ids[self.place_id] = self.tiles.get_owner_id(value)
+
+    @property
+    def gold_cost(self):
+        # type: () -> BigNumber
+        return BigNumber.from_normalised_parts(self.tiles.gold_cost_mantissas[self.place_id],
+                                               self.tiles.gold_cost_exponents[self.place_id])
+
+    @gold_cost.setter
+    def gold_cost(self, value):
+        # type: (BigNumber) -> None
+        self.tiles.gold_cost_mantissas[self.place_id] = value.mantissa
+        self.tiles.gold_cost_exponents[self.place_id] = value.exponent
+
+    @property
+    def gold_per_turn(self):
+        # type: () -> BigNumber
+        return BigNumber.from_normalised_parts(self.tiles.gold_per_turn_mantissas[self.place_id],
+                                               self.tiles.gold_per_turn_exponents[self.place_id])
+
+    @gold_per_turn.setter
+    def gold_per_turn(self, value):
+        # type: (BigNumber) -> None
+        self.tiles.gold_per_turn_mantissas[self.place_id] = value.mantissa
+        self.tiles.gold_per_turn_exponents[self.place_id] = value.exponent
+
+    @property
+    def exp_per_turn(self):
+        # type: () -> BigNumber
+        return BigNumber.from_normalised_parts(self.tiles.exp_per_turn_mantissas[self.place_id],
+                                               self.tiles.exp_per_turn_exponents[self.place_id])
+
+    @exp_per_turn.setter
+    def exp_per_turn(self, value):
+        # type: (BigNumber) -> None
+        self.tiles.exp_per_turn_mantissas[self.place_id] = value.mantissa
+        self.tiles.exp_per_turn_exponents[self.place_id] = value.exponent
+
+    def clone(self):
+        # type: () -> Place
+        # A copy of the view would share the arrays, so the clone is a standalone place.
+        res: Place = Place(self.name, self.description, self.gold_cost, self.gold_per_turn, self.exp_per_turn)
+        res.level = self.level
+        res.owner = self.owner
+        return copy.deepcopy(res)
 
 
 class RandomRewardTile(Tile):
@@ -220,6 +3342,8 @@ class RandomRewardTile(Tile):
     This class contains attributes of a tile where the player can gain random rewards.
     """
 
+    TILE_TYPE: int = 3
+
     def __init__(self):
         # type: () -> None
         Tile.__init__(self, "RANDOM REWARD TILE", "A tile granting random rewards to the player landing on it.")
@@ -230,6 +3354,8 @@ class UpgradeShop(Tile):
     This class contains attributes of an upgrade shop where the player can buy upgrades.
     """
 
+    TILE_TYPE: int = 4
+
     def __init__(self, upgrades_sold):
         # type: (list) -> None
         Tile.__init__(self, "UPGRADE SHOP", "A tile where the player can buy upgrades.")
@@ -241,12 +3367,9 @@ class UpgradeShop(Tile):
 
     def __str__(self):
         # type: () -> str
-        res: str = str(self.name) + "\n"
-        res += "Below is a list of upgrades sold:\n"
-        for upgrade in self.__upgrades_sold:
-            res += str(upgrade) + "\n"
-
-        return res
+        # The texts of the upgrades are cached (see TextCache), so listing them again costs a lookup per upgrade.
+        return str(self.name) + "\nBelow is a list of upgrades sold:\n" + \
+            "".join([str(upgrade) + "\n" for upgrade in self.__upgrades_sold])
 
 
 class RandomReward:
@@ -254,10 +3377,10 @@ class RandomReward:
     This class contains attributes of an obtainable random reward at random reward tiles.
     """
 
-    def __init__(self):
-        # type: () -> None
-        self.reward_gold: mpf = mpf("1e" + str(random.randint(1000, 100000)))
-        self.reward_exp: mpf = mpf("1e" + str(random.randint(1000, 100000)))
+    def __init__(self, rng=random):
+        # type: (random.Random) -> None
+        self.reward_gold: BigNumber = BigNumber.power_of_ten(rng.randint(1000, 100000))
+        self.reward_exp: BigNumber = BigNumber.power_of_ten(rng.randint(1000, 100000))
 
     def __str__(self):
         # type: () -> str
@@ -278,14 +3401,18 @@ class Upgrade:
     """
 
     def __init__(self, name, description, gold_cost, gold_gain_multiplier, exp_gain_multiplier):
-        # type: (str, str, mpf, mpf, mpf) -> None
+        # type: (str, str, BigNumber, BigNumber, BigNumber) -> None
         self.name: str = name
         self.description: str = description
-        self.gold_cost: mpf = gold_cost
-        self.gold_gain_multiplier: mpf = gold_gain_multiplier
-        self.exp_gain_multiplier: mpf = exp_gain_multiplier
+        self.gold_cost: BigNumber = gold_cost
+        self.gold_gain_multiplier: BigNumber = gold_gain_multiplier
+        self.exp_gain_multiplier: BigNumber = exp_gain_multiplier
 
     def __str__(self):
+        # type: () -> str
+        return entity_texts.get(self, "str", self.get_text_key(), self.__format)
+
+    def __format(self):
         # type: () -> str
         res: str = ""  # initial value
         res += "Name: " + str(self.name) + "\n"
@@ -295,89 +3422,244 @@ class Upgrade:
         res += "EXP Gain Multiplier: " + str(self.exp_gain_multiplier) + "\n"
         return res
 
+    def get_text_key(self):
+        # type: () -> tuple
+        # Returning the values of every field shown in the texts of the upgrade (see TextCache).
+        return (self.name, self.description, self.gold_cost.mantissa, self.gold_cost.exponent,
+                self.gold_gain_multiplier.mantissa, self.gold_gain_multiplier.exponent,
+                self.exp_gain_multiplier.mantissa, self.exp_gain_multiplier.exponent)
+
     def clone(self):
         # type: () -> Upgrade
         return copy.deepcopy(self)
 
 
+class OwnedPlaces:
+    """
+    This class contains attributes of the places owned by a player in the order they were obtained, indexed so that
+    checking whether a place is owned, adding it and removing it take constant time. A place is only held once.
+    """
+
+    def __init__(self, places=()):
+        # type: (list or tuple) -> None
+        self.__places: dict = {}  # id(place) -> place, in the order the places were obtained
+        self.__orders: dict = {}  # id(place) -> number of the place in the order the places were obtained
+        self.__next_order: int = 0  # initial value
+        for place in places:
+            self.add(place)
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.__places)
+
+    def __iter__(self):
+        return iter(list(self.__places.values()))
+
+    def __contains__(self, place):
+        # type: (Place) -> bool
+        return self.__places.get(id(place)) is place
+
+    def __reduce__(self):
+        # The index is keyed by the identities of the places, which copies and unpickled objects do not keep.
+        return OwnedPlaces, (list(self.__places.values()),)
+
+    def add(self, place):
+        # type: (Place) -> bool
+        if place in self:
+            return False
+
+        self.__places[id(place)] = place
+        self.__orders[id(place)] = self.__next_order
+        self.__next_order += 1
+        return True
+
+    def remove(self, place):
+        # type: (Place) -> None
+        if place not in self:
+            raise ValueError("The place is not owned!")
+
+        del self.__places[id(place)]
+        del self.__orders[id(place)]
+
+    def get_order(self, place):
+        # type: (Place) -> int
+        # Returning the number of the place in the order the places were obtained, to put it back with insert().
+        return self.__orders[id(place)]
+
+    def insert(self, place, order):
+        # type: (Place, int) -> None
+        # Putting back a removed place where it was in the order the places were obtained. Only a place which was
+        # not the last one obtained takes time proportional to the number of places.
+        if place in self:
+            raise ValueError("The place is owned already!")
+
+        self.__places[id(place)] = place
+        self.__orders[id(place)] = order
+        if order < self.__next_order - 1:
+            keys: list = sorted(self.__places, key=self.__orders.__getitem__)
+            self.__places = {key: self.__places[key] for key in keys}
+        self.__next_order = max(self.__next_order, order + 1)
+
+
 class Player:
     """
     This class contains attributes of the player in this game.
     """
 
+    # Required EXP of every level reached so far (index = level), each one multiplied from the previous one exactly
+    # like leveling up one level at a time does.
+    REQUIRED_EXP_TABLE: list = [BigNumber(0), BigNumber("1e6")]
+
     def __init__(self, name):
         # type: (str) -> None
         self.player_id: str = str(uuid.uuid1())
         self.name: str = name
         self.level: int = 1
         self.location: int = 0  # initial value
-        self.gold: mpf = mpf("1e6")
-        self.exp: mpf = mpf("0")
-        self.required_exp: mpf = mpf("1e6")
-        self.__owned_list: list = []  # initial value
+        self.gold: BigNumber = BigNumber("1e6")
+        self.exp: BigNumber = BigNumber("0")
+        self.required_exp: BigNumber = BigNumber("1e6")
+        self.__owned_places: OwnedPlaces = OwnedPlaces()  # initial value
         self.__upgrade_list: list = []  # initial value
+        # Running totals of the income of the owned places and products of the multipliers of the upgrades.
+        self.__place_gold_per_turn: BigNumber = BigNumber(0)
+        self.__place_exp_per_turn: BigNumber = BigNumber(0)
+        self.__gold_gain_multiplier: BigNumber = BigNumber(1)
+        self.__exp_gain_multiplier: BigNumber = BigNumber(1)
 
     def __str__(self):
         # type: () -> str
-        res: str = ""  # initial value
-        res += "Player ID: " + str(self.player_id) + "\n"
-        res += "Name: " + str(self.name) + "\n"
-        res += "Level: " + str(self.level) + "\n"
-        res += "Location: " + str(self.location) + "\n"
-        res += "Gold: " + str(self.gold) + "\n"
-        res += "EXP: " + str(self.exp) + "\n"
-        res += "Required EXP: " + str(self.required_exp) + "\n"
-        res += "Below is a list of places owned by the player:\n"
-        for place in self.__owned_list:
-            res += str(place) + "\n"
-
-        res += "Below is a list of upgrades owned by the player:\n"
-        for upgrade in self.__upgrade_list:
-            res += str(upgrade) + "\n"
-
-        return res
+        # Joining the parts once, adding them one by one would copy the string for every place and upgrade. The texts
+        # of the stats, places and upgrades are cached (see TextCache).
+        res: list = [entity_texts.get(self, "stats", (self.player_id, self.name, self.level, self.location,
+                                                      self.gold.mantissa, self.gold.exponent, self.exp.mantissa,
+                                                      self.exp.exponent, self.required_exp.mantissa,
+                                                      self.required_exp.exponent), self.__format_stats),
+                     "Below is a list of places owned by the player:\n"]
+        res += [str(place) + "\n" for place in self.__owned_places]
+        res.append("Below is a list of upgrades owned by the player:\n")
+        res += [str(upgrade) + "\n" for upgrade in self.__upgrade_list]
+        return "".join(res)
+
+    def __format_stats(self):
+        # type: () -> str
+        return "".join(["Player ID: " + str(self.player_id) + "\n", "Name: " + str(self.name) + "\n",
+                        "Level: " + str(self.level) + "\n", "Location: " + str(self.location) + "\n",
+                        "Gold: " + str(self.gold) + "\n", "EXP: " + str(self.exp) + "\n",
+                        "Required EXP: " + str(self.required_exp) + "\n"])
+
+    def __setstate__(self, state):
+        # type: (dict) -> None
+        # Saved games of older versions kept the owned places in a list, which could hold a place more than once.
+        owned_list: list or None = state.pop("_Player__owned_list", None)
+        self.__dict__.update(state)
+        if owned_list is not None:
+            self.__owned_places = OwnedPlaces(owned_list)
+
+    @staticmethod
+    def extend_required_exp_table(level, exp):
+        # type: (int, BigNumber) -> list
+        # Extending the table of required EXP up to the given level and beyond the given EXP.
+        table: list = Player.REQUIRED_EXP_TABLE
+        while len(table) <= level or table[-1] <= exp:
+            table.append(table[-1] * BigNumber.power_of_ten(triangular(len(table))))
+        return table
 
     def level_up(self):
         # type: () -> None
-        while self.exp >= self.required_exp:
-            self.level += 1
-            self.required_exp *= mpf("10") ** triangular(self.level)
+        if self.exp < self.required_exp:
+            return
+
+        table: list = Player.extend_required_exp_table(self.level, self.exp)
+        if table[self.level] == self.required_exp:
+            # Binary searching for the first level whose required EXP is above the player's EXP instead of leveling up
+            # one level at a time.
+            self.level = bisect.bisect_right(table, self.exp, lo=self.level)
+            self.required_exp = table[self.level]
+        else:
+            while self.exp >= self.required_exp:
+                self.level += 1
+                self.required_exp *= BigNumber.power_of_ten(triangular(self.level))
 
     def roll_dice(self, game):
-        # type: (SavedGameData) -> None
-        self.location += Dice().value
+        # type: (SavedGameData) -> int
+        dice_value: int = Dice(game.rng).value
+        self.location += dice_value
         if self.location >= len(game.board.get_tiles()):
             self.gold += game.start_bonus
             self.location -= len(game.board.get_tiles())
 
+        return dice_value
+
     def get_gold_per_turn(self):
-        # type: () -> mpf
-        return mpf_sum_of_list([place.gold_per_turn for place in self.__owned_list]) * \
-            mpf_product_of_list([upgrade.gold_gain_multiplier for upgrade in self.__upgrade_list])
+        # type: () -> BigNumber
+        return self.__place_gold_per_turn * self.__gold_gain_multiplier
 
     def get_exp_per_turn(self):
-        # type: () -> mpf
-        return mpf_sum_of_list([place.exp_per_turn for place in self.__owned_list]) * \
-            mpf_product_of_list([upgrade.exp_gain_multiplier for upgrade in self.__upgrade_list])
+        # type: () -> BigNumber
+        return self.__place_exp_per_turn * self.__exp_gain_multiplier
+
+    def recompute_income(self):
+        # type: () -> None
+        # Rebuilding the running totals from the owned places and upgrades, e.g. after loading a saved game.
+        self.recompute_place_income()
+        self.__gold_gain_multiplier = big_number_product_of_list([upgrade.gold_gain_multiplier
+                                                                  for upgrade in self.__upgrade_list])
+        self.__exp_gain_multiplier = big_number_product_of_list([upgrade.exp_gain_multiplier
+                                                                 for upgrade in self.__upgrade_list])
+
+    def recompute_place_income(self):
+        # type: () -> None
+        self.__place_gold_per_turn = big_number_sum_of_list([place.gold_per_turn for place in self.__owned_places])
+        self.__place_exp_per_turn = big_number_sum_of_list([place.exp_per_turn for place in self.__owned_places])
+
+    def update_place_income(self, place, old_gold_per_turn, old_exp_per_turn):
+        # type: (Place, BigNumber, BigNumber) -> None
+        # Called by an owned place whose income has changed. Adding the (non-negative) difference cancels nothing,
+        # but the totals are rounded in another order than when rebuilding them and may differ from them by a few
+        # units in the last place.
+        self.__place_gold_per_turn += place.gold_per_turn - old_gold_per_turn
+        self.__place_exp_per_turn += place.exp_per_turn - old_exp_per_turn
+
+    def __add_owned_place(self, place):
+        # type: (Place) -> None
+        if not self.__owned_places.add(place):
+            return
+
+        self.__place_gold_per_turn += place.gold_per_turn
+        self.__place_exp_per_turn += place.exp_per_turn
+
+    def __remove_owned_place(self, place):
+        # type: (Place) -> None
+        # Subtracting a place which may dominate the totals would cancel catastrophically, so they are rebuilt.
+        self.__owned_places.remove(place)
+        self.recompute_place_income()
 
     def get_owned_list(self):
         # type: () -> list
-        return self.__owned_list
+        # Returning a copy of the owned places, use get_owned_places() to check or change them.
+        return list(self.__owned_places)
+
+    def get_owned_places(self):
+        # type: () -> OwnedPlaces
+        return self.__owned_places
 
     def buy_place(self, place):
         # type: (Place) -> bool
-        if self.gold >= place.gold_cost:
-            self.gold -= place.gold_cost
-            self.__owned_list.append(place)
+        gold_cost: BigNumber = place.gold_cost
+        if self.gold >= gold_cost:
+            self.gold -= gold_cost
+            self.__add_owned_place(place)
             place.owner = self
             return True
         return False
 
     def upgrade_place(self, place):
         # type: (Place) -> bool
-        if place in self.__owned_list:
-            if self.gold >= place.gold_cost:
-                self.gold -= place.gold_cost
+        if place in self.__owned_places:
+            gold_cost: BigNumber = place.gold_cost
+            if self.gold >= gold_cost:
+                self.gold -= gold_cost
                 place.level_up()
                 return True
             return False
@@ -385,13 +3667,14 @@ class Player:
 
     def acquire_place(self, place, owner):
         # type: (Place, Player) -> bool
-        if place in owner.get_owned_list() and place not in self.get_owned_list():
-            if self.gold >= place.gold_cost:
-                self.gold -= place.gold_cost
-                owner.gold += place.gold_cost
+        if place in owner.get_owned_places() and place not in self.__owned_places:
+            gold_cost: BigNumber = place.gold_cost
+            if self.gold >= gold_cost:
+                self.gold -= gold_cost
+                owner.gold += gold_cost
                 place.level_up()
-                self.__owned_list.append(place)
-                owner.__owned_list.append(place)
+                self.__add_owned_place(place)
+                owner.__remove_owned_place(place)
                 place.owner = self
                 return True
             return False
@@ -406,6 +3689,8 @@ class Player:
         if self.gold >= upgrade.gold_cost:
             self.gold -= upgrade.gold_cost
             self.__upgrade_list.append(upgrade)
+            self.__gold_gain_multiplier *= upgrade.gold_gain_multiplier
+            self.__exp_gain_multiplier *= upgrade.exp_gain_multiplier
             return True
         return False
 
@@ -421,6 +3706,25 @@ class Player:
         self.exp += self.get_exp_per_turn()
         self.level_up()
 
+    def get_state(self):
+        # type: () -> tuple
+        # Returning the stats of the player a turn can change, sharing the big numbers (which are never changed in
+        # place) with the player. Upgrades are only ever added, so their number is enough to restore them.
+        return (self.level, self.location, self.gold, self.exp, self.required_exp, len(self.__upgrade_list),
+                self.__place_gold_per_turn, self.__place_exp_per_turn, self.__gold_gain_multiplier,
+                self.__exp_gain_multiplier)
+
+    def set_state(self, state, upgrades=()):
+        # type: (tuple, list or tuple) -> None
+        # Restoring a state returned by get_state(), where the given upgrades are the last ones the player had (to
+        # restore a later state, which had more upgrades). The owned places are restored with the places (see
+        # Place.set_state()).
+        self.level, self.location, self.gold, self.exp, self.required_exp, upgrade_count, \
+            self.__place_gold_per_turn, self.__place_exp_per_turn, self.__gold_gain_multiplier, \
+            self.__exp_gain_multiplier = state
+        del self.__upgrade_list[upgrade_count - len(upgrades):]
+        self.__upgrade_list += upgrades
+
     def clone(self):
         # type: () -> Player
         return copy.deepcopy(self)
@@ -441,14 +3745,23 @@ class SavedGameData:
     This class contains attributes of saved game data.
     """
 
-    def __init__(self, player_name, start_bonus, player_data, ai_player, board):
-        # type: (str, mpf, Player, AIPlayer, Board) -> None
+    def __init__(self, player_name, start_bonus, player_data, ai_player, board, seed=None):
+        # type: (str, BigNumber, Player, AIPlayer, Board, int or None) -> None
         self.player_name: str = player_name
         self.turn: int = 0
-        self.start_bonus: mpf = start_bonus
+        self.start_bonus: BigNumber = start_bonus
         self.player_data: Player = player_data
         self.ai_player: AIPlayer = ai_player
         self.board: Board = board
+        self.seed: int = random.getrandbits(GAME_SEED_BITS) if seed is None else seed
+        self.rng: random.Random = random.Random()  # dice, random rewards and decisions of the AI player
+        self.resume_random()
+
+    def resume_random(self):
+        # type: () -> None
+        # Seeding the random numbers of the game from its seed and current turn, so that the turns played from here
+        # are the same whenever the game is resumed from this turn.
+        self.rng.seed(str(self.seed) + ":" + str(self.turn))
 
     def __str__(self):
         # type: () -> str
@@ -464,6 +3777,886 @@ class SavedGameData:
         return copy.deepcopy(self)
 
 
+class TurnEvent:
+    """
+    This class contains attributes of something which has happened on the tile a player has landed on.
+    """
+
+    BUY_PLACE: str = "BUY_PLACE"
+    UPGRADE_PLACE: str = "UPGRADE_PLACE"
+    ACQUIRE_PLACE: str = "ACQUIRE_PLACE"
+    RANDOM_REWARD: str = "RANDOM_REWARD"
+    BUY_UPGRADE: str = "BUY_UPGRADE"
+
+    def __init__(self, kind, subject, succeeded):
+        # type: (str, object, bool) -> None
+        self.kind: str = kind
+        self.subject: object = subject  # the place, random reward or upgrade involved
+        self.succeeded: bool = succeeded  # False when the player had insufficient gold
+
+    def __str__(self):
+        # type: () -> str
+        return str(self.kind) + " " + ("succeeded" if self.succeeded else "failed")
+
+
+class TurnResult:
+    """
+    This class contains attributes of the outcome of a turn played by the turn engine.
+    """
+
+    def __init__(self, turn, player, dice_value, tile, events):
+        # type: (int, Player, int, Tile, list) -> None
+        self.turn: int = turn
+        self.player: Player = player
+        self.dice_value: int = dice_value
+        self.tile: Tile = tile
+        self.events: list = events
+
+
+class TurnChanges:
+    """
+    This class contains attributes of what a turn has changed in a game: the states of both players before and
+    after the turn, the upgrades they bought and the states of the places which have changed (by location) before
+    and after the turn. States share their big numbers with the game (see Player.get_state()), so the memory taken
+    by a turn depends on what it has changed and not on the size of the board.
+    """
+
+    __slots__ = ("turn", "players_before", "players_after", "upgrades", "places")
+
+    def __init__(self, turn, players_before, places):
+        # type: (int, list, list) -> None
+        self.turn: int = turn  # turn of the game before the turn
+        self.players_before: list = players_before
+        self.players_after: list = []  # initial value
+        self.upgrades: list = []  # upgrades bought in the turn by every player
+        self.places: list = places  # [location, state before, state after] of every place changed in the turn
+
+
+class GameHistory:
+    """
+    This class contains attributes of the turns of a game which can be undone and redone, the most recent
+    max_turns of them. Every turn is started with begin_turn() and finished with end_turn(), which keeps what it
+    has changed (see TurnChanges).
+    """
+
+    def __init__(self, max_turns=HISTORY_MAX_TURNS):
+        # type: (int) -> None
+        self.max_turns: int = max_turns
+        self.__undo_changes: deque = deque(maxlen=max_turns)  # changes of the turns played, oldest first
+        self.__redo_changes: list = []  # changes of the turns undone, most recently undone last
+        self.__pending: TurnChanges or None = None  # changes of the turn being played
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.__undo_changes)
+
+    def get_turn_range(self, game_data):
+        # type: (SavedGameData) -> tuple
+        # Returning the earliest and the latest turns the game can go to.
+        return game_data.turn - len(self.__undo_changes), game_data.turn + len(self.__redo_changes)
+
+    def begin_turn(self, game_data):
+        # type: (SavedGameData) -> None
+        # Keeping the states of the players and of the places the player whose turn is next can land on, which are
+        # the only places the turn can change.
+        players: list = [game_data.player_data, game_data.ai_player]
+        player: Player = players[0] if (game_data.turn + 1) % 2 == 1 else players[1]
+        tile_count: int = len(game_data.board.get_tiles())
+        places: list = []  # initial value
+        for dice_value in range(1, 7):
+            location: int = (player.location + dice_value) % tile_count
+            if game_data.board.get_tile_type(location) == Place.TILE_TYPE:
+                places.append([location, game_data.board.get_tiles()[location].get_state(), None])
+
+        self.__pending = TurnChanges(game_data.turn, [player.get_state() for player in players], places)
+
+    def cancel_turn(self, game_data):
+        # type: (SavedGameData) -> None
+        # Taking back a turn which has been started but has not moved a player yet.
+        if self.__pending is not None:
+            game_data.player_data.set_state(self.__pending.players_before[0])
+            game_data.ai_player.set_state(self.__pending.players_before[1])
+            game_data.turn = self.__pending.turn
+            self.__pending = None
+
+    def end_turn(self, game_data):
+        # type: (SavedGameData) -> None
+        # Keeping the states after the turn, dropping the places which have not changed. The turns undone before
+        # cannot be redone anymore.
+        changes: TurnChanges = self.__pending
+        self.__pending = None
+        players: list = [game_data.player_data, game_data.ai_player]
+        tiles: list = game_data.board.get_tiles()
+        changes.players_after = [player.get_state() for player in players]
+        changes.upgrades = [tuple(player.get_upgrade_list()[state[5]:])
+                            for player, state in zip(players, changes.players_before)]
+        for place in changes.places:
+            place[2] = tiles[place[0]].get_state()
+        changes.places = [place for place in changes.places if place[1] != place[2]]
+        self.__undo_changes.append(changes)
+        self.__redo_changes.clear()
+
+    def undo(self, game_data):
+        # type: (SavedGameData) -> bool
+        if len(self.__undo_changes) == 0:
+            return False
+
+        changes: TurnChanges = self.__undo_changes.pop()
+        tiles: list = game_data.board.get_tiles()
+        for location, state, _ in changes.places:
+            tiles[location].set_state(state)
+        game_data.player_data.set_state(changes.players_before[0])
+        game_data.ai_player.set_state(changes.players_before[1])
+        game_data.turn = changes.turn
+        self.__redo_changes.append(changes)
+        return True
+
+    def redo(self, game_data):
+        # type: (SavedGameData) -> bool
+        if len(self.__redo_changes) == 0:
+            return False
+
+        changes: TurnChanges = self.__redo_changes.pop()
+        tiles: list = game_data.board.get_tiles()
+        for location, _, state in changes.places:
+            tiles[location].set_state(state)
+        game_data.player_data.set_state(changes.players_after[0], changes.upgrades[0])
+        game_data.ai_player.set_state(changes.players_after[1], changes.upgrades[1])
+        game_data.turn = changes.turn + 1
+        self.__undo_changes.append(changes)
+        return True
+
+    def rewind(self, game_data, turn):
+        # type: (SavedGameData, int) -> int
+        # Undoing or redoing turns until the game is at the given turn or as close to it as the history goes,
+        # returning the turn reached.
+        while game_data.turn > turn and self.undo(game_data):
+            pass
+        while game_data.turn < turn and self.redo(game_data):
+            pass
+        return game_data.turn
+
+
+class DecisionPolicy:
+    """
+    This class contains attributes of the decisions a player makes on the tiles of the board. This base policy
+    declines everything.
+    """
+
+    def decide_buy_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return False
+
+    def decide_upgrade_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return False
+
+    def decide_acquire_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return False
+
+    def choose_upgrade(self, game_data, player, upgrade_shop):
+        # type: (SavedGameData, Player, UpgradeShop) -> Upgrade or None
+        return None
+
+
+class RandomPolicy(DecisionPolicy):
+    """
+    This class contains attributes of the decisions of the AI player, saying yes to each of them with a fixed
+    probability and buying a random upgrade.
+    """
+
+    def __init__(self, probability=0.75):
+        # type: (float) -> None
+        self.probability: float = probability
+
+    def decide_buy_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return game_data.rng.random() <= self.probability
+
+    def decide_upgrade_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return game_data.rng.random() <= self.probability
+
+    def decide_acquire_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return game_data.rng.random() <= self.probability
+
+    def choose_upgrade(self, game_data, player, upgrade_shop):
+        # type: (SavedGameData, Player, UpgradeShop) -> Upgrade or None
+        if game_data.rng.random() <= self.probability:
+            upgrades_sold: list = upgrade_shop.get_upgrades_sold()
+            return upgrades_sold[game_data.rng.randint(1, len(upgrades_sold)) - 1]
+        return None
+
+
+class LLMPolicy(DecisionPolicy):
+    """
+    This class contains attributes of the decisions of the AI player made by the LLM. The LLM is asked about a
+    compact signature of the situation (how the gold of the player compares to the cost of a place or an upgrade and
+    to what it earns, in powers of ten), so that its answers are cached and reused in similar situations, and the
+    decisions the AI player may have to make on its next turn are asked for in the background while the player is
+    still deciding. When the LLM misses the deadline or fails, the fallback policy decides.
+    """
+
+    def __init__(self, llm, fallback, deadline=LLM_DECISION_DEADLINE, max_workers=LLM_DECISION_WORKERS,
+                 cache_size=LLM_DECISION_CACHE_SIZE):
+        # type: (LLMClient, DecisionPolicy, float, int, int) -> None
+        self.llm: LLMClient = llm
+        self.fallback: DecisionPolicy = fallback
+        self.deadline: float = deadline
+        self.cache_size: int = cache_size
+        self.stats: DecisionStats = DecisionStats()
+        self.__decisions: OrderedDict = OrderedDict()  # signature -> decision of the LLM, least recent first
+        self.__pending: dict = {}  # signature -> future of the decision asked for
+        self.__lock: threading.Lock = threading.Lock()
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+
+    @staticmethod
+    def __ratio(a, b):
+        # type: (BigNumber, BigNumber) -> int
+        # Returning log10(a / b) rounded and limited to LLM_DECISION_BUCKET_LIMIT.
+        if not b:
+            return LLM_DECISION_BUCKET_LIMIT
+        if not a:
+            return -LLM_DECISION_BUCKET_LIMIT
+        return max(-LLM_DECISION_BUCKET_LIMIT, min(LLM_DECISION_BUCKET_LIMIT, round(a.log10() - b.log10())))
+
+    @staticmethod
+    def get_signature(kind, subject, gold, gold_per_turn):
+        # type: (str, Place or UpgradeShop, BigNumber, BigNumber) -> tuple
+        # Returning the signature of deciding whether to "buy", "upgrade" or "acquire" a place or which upgrade to
+        # buy in an upgrade shop ("upgrade shop") with the given gold and gold per turn.
+        if kind == "upgrade shop":
+            return (kind,) + tuple((LLMPolicy.__ratio(gold, upgrade.gold_cost),
+                                    round(upgrade.gold_gain_multiplier.log10()),
+                                    round(upgrade.exp_gain_multiplier.log10()))
+                                   for upgrade in subject.get_upgrades_sold())
+        return kind, LLMPolicy.__ratio(gold, subject.gold_cost), min(subject.level, 10), \
+            LLMPolicy.__ratio(subject.gold_per_turn, gold_per_turn)
+
+    @staticmethod
+    def get_prompt(signature):
+        # type: (tuple) -> str
+        res: str = "You are the CPU player of a board game where players buy and upgrade places which earn them " \
+                   "gold and EXP every turn, and buy upgrades which multiply what they earn. "
+        if signature[0] == "upgrade shop":
+            res += "You are at an upgrade shop selling these upgrades:\n"
+            for upgrade_index, (affordability, gold_multiplier, exp_multiplier) in enumerate(signature[1:], 1):
+                res += str(upgrade_index) + ". Your gold is about 10^" + str(affordability) + " times its cost. It " \
+                       "multiplies your gold gain by about 10^" + str(gold_multiplier) + " and your EXP gain by " \
+                       "about 10^" + str(exp_multiplier) + ".\n"
+            return res + "Answer with the number of the upgrade you buy or NONE only."
+
+        kind, affordability, level, income = signature
+        return res + "Your gold is about 10^" + str(affordability) + " times the cost to " + kind + " a place of " \
+            "level " + str(level) + ", which earns about 10^" + str(income) + " times the gold you earn every " \
+            "turn. Do you " + kind + " it? Answer with YES or NO only."
+
+    @staticmethod
+    def parse_decision(signature, response):
+        # type: (tuple, str) -> bool or int or None
+        # Returning the decision in the response of the LLM: yes or no, or the index of the upgrade to buy (None for
+        # no upgrade).
+        words: list = re.findall(r"[A-Za-z]+|\d+", response.upper())
+        if signature[0] == "upgrade shop":
+            for word in words:
+                if word == "NONE":
+                    return None
+                if word.isdigit() and 1 <= int(word) < len(signature):
+                    return int(word) - 1
+        else:
+            for word in words:
+                if word in ("YES", "NO"):
+                    return word == "YES"
+
+        raise ValueError("The LLM did not decide: " + repr(response))
+
+    def __ask(self, signature):
+        # type: (tuple) -> bool or int or None
+        try:
+            decision: bool or int or None = LLMPolicy.parse_decision(signature, self.llm.invoke(
+                LLMPolicy.get_prompt(signature)))
+            with self.__lock:
+                self.__decisions[signature] = decision
+                self.__decisions.move_to_end(signature)
+                while len(self.__decisions) > self.cache_size:
+                    self.__decisions.popitem(last=False)
+            return decision
+        finally:
+            with self.__lock:
+                self.__pending.pop(signature, None)
+
+    def __request(self, signature):
+        # type: (tuple) -> Future or None
+        # Asking the LLM for a decision unless it has been made or asked for already (None if it has been made).
+        with self.__lock:
+            if signature in self.__decisions:
+                return None
+            if signature not in self.__pending:
+                self.__pending[signature] = self.__executor.submit(self.__ask, signature)
+            return self.__pending[signature]
+
+    def prefetch(self, game_data, player):
+        # type: (SavedGameData, Player) -> int
+        # Asking for the decisions the player may have to make on every tile the dice can take it to on its next
+        # turn, with the gold it will have by then. Returning the number of decisions asked for.
+        tiles: list = game_data.board.get_tiles()
+        gold_per_turn: BigNumber = player.get_gold_per_turn()
+        gold: BigNumber = player.gold + gold_per_turn
+        requested: int = 0  # initial value
+        for dice_value in range(1, 7):
+            location: int = player.location + dice_value
+            tile_type: int = game_data.board.get_tile_type(location % len(tiles))
+            if tile_type != Place.TILE_TYPE and tile_type != UpgradeShop.TILE_TYPE:
+                continue
+
+            tile: Tile = tiles[location % len(tiles)]
+            if tile_type == UpgradeShop.TILE_TYPE:
+                kind: str = "upgrade shop"
+            else:
+                kind = "buy" if tile.owner is None else "upgrade" if tile.owner is player else "acquire"
+
+            if self.__request(LLMPolicy.get_signature(kind, tile, gold + (game_data.start_bonus if location >=
+                                                                          len(tiles) else 0), gold_per_turn)):
+                requested += 1
+
+        return requested
+
+    def __decide(self, kind, subject, player, fallback_decision):
+        # type: (str, Place or UpgradeShop, Player, bool or int or None) -> bool or int or None
+        start_time: float = time.perf_counter()
+        signature: tuple = LLMPolicy.get_signature(kind, subject, player.gold, player.get_gold_per_turn())
+        future: Future or None = self.__request(signature)
+        try:
+            if future is None:
+                with self.__lock:
+                    decision: bool or int or None = self.__decisions[signature]
+                self.stats.cache_hits += 1
+            else:
+                decision = future.result(timeout=self.deadline)
+                self.stats.waits += 1
+        except (FutureTimeoutError, CancelledError, ValueError) + LLM_REQUEST_ERRORS:
+            # The deadline was missed (the answer is still cached once it arrives) or the LLM failed.
+            decision = fallback_decision
+            self.stats.fallbacks += 1
+
+        self.stats.record(time.perf_counter() - start_time)
+        return decision
+
+    def decide_buy_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        # The fallback always decides first, so that the game draws the same random numbers whatever the LLM does.
+        return self.__decide("buy", place, player, self.fallback.decide_buy_place(game_data, player, place))
+
+    def decide_upgrade_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return self.__decide("upgrade", place, player, self.fallback.decide_upgrade_place(game_data, player, place))
+
+    def decide_acquire_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return self.__decide("acquire", place, player, self.fallback.decide_acquire_place(game_data, player, place))
+
+    def choose_upgrade(self, game_data, player, upgrade_shop):
+        # type: (SavedGameData, Player, UpgradeShop) -> Upgrade or None
+        upgrades_sold: list = upgrade_shop.get_upgrades_sold()
+        fallback_upgrade: Upgrade or None = self.fallback.choose_upgrade(game_data, player, upgrade_shop)
+        upgrade_index: int or None = self.__decide("upgrade shop", upgrade_shop, player, None if fallback_upgrade is
+                                                   None else [upgrade is fallback_upgrade
+                                                              for upgrade in upgrades_sold].index(True))
+        return None if upgrade_index is None else upgrades_sold[upgrade_index]
+
+    def close(self):
+        # type: () -> None
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SearchPolicy(DecisionPolicy):
+    """
+    This class contains attributes of the decisions of the AI player found by searching the next turns of the game:
+    expectimax over the six values of the dice of every turn, where the player whose turn it is makes the decision
+    best for them on the place or upgrade shop they land on. Random rewards are not searched. Moves are made on the
+    game itself and unmade by restoring the states of the players and of the place they change (see
+    Player.get_state() and Place.get_state()), so nothing is copied (copy_state=True deep copies the game for every
+    move instead, to compare with). The search goes one turn deeper at a time until the time budget runs out, and
+    the deepest finished search decides. The fallback policy is asked first (so that the game draws the same random
+    numbers as with the fallback alone) and decides when no search has finished.
+    """
+
+    INCOME_TURNS: BigNumber = BigNumber(SEARCH_INCOME_TURNS)
+    ONE: BigNumber = BigNumber(1)
+
+    def __init__(self, fallback, time_budget=SEARCH_TIME_BUDGET, max_depth=SEARCH_MAX_DEPTH, copy_state=False):
+        # type: (DecisionPolicy, float, int, bool) -> None
+        self.fallback: DecisionPolicy = fallback
+        self.time_budget: float = time_budget
+        self.max_depth: int = max_depth
+        self.copy_state: bool = copy_state
+        self.nodes: int = 0  # nodes searched so far
+        self.search_time: float = 0.0  # seconds searched so far
+        self.depths: list = []  # deepest finished search of every decision
+        self.__deadline: float = 0.0  # initial value
+
+    @staticmethod
+    def get_score(player):
+        # type: (Player) -> float
+        # Returning the log10 of the EXP and gold of the player with SEARCH_INCOME_TURNS turns of income, plus the
+        # log10 of the income weighted by SEARCH_INCOME_WEIGHT, as the income keeps growing what the player has.
+        gold_per_turn: BigNumber = player.get_gold_per_turn()
+        exp_per_turn: BigNumber = player.get_exp_per_turn()
+        return (player.exp + exp_per_turn * SearchPolicy.INCOME_TURNS + SearchPolicy.ONE).log10() + \
+            (player.gold + gold_per_turn * SearchPolicy.INCOME_TURNS + SearchPolicy.ONE).log10() + \
+            SEARCH_INCOME_WEIGHT * ((exp_per_turn + SearchPolicy.ONE).log10() +
+                                    (gold_per_turn + SearchPolicy.ONE).log10())
+
+    @staticmethod
+    def evaluate(game_data, player):
+        # type: (SavedGameData, Player) -> float
+        # Returning how much better the game is for the player than for their opponent (see get_score()).
+        opponent: Player = game_data.ai_player if player is game_data.player_data else game_data.player_data
+        return SearchPolicy.get_score(player) - SearchPolicy.get_score(opponent)
+
+    @staticmethod
+    def get_actions(player, tile):
+        # type: (Player, Tile) -> list
+        # Returning what the player can do on the tile: None for nothing, "buy", "upgrade" or "acquire" for a place
+        # and the upgrades the player can afford for an upgrade shop.
+        actions: list = [None]
+        if isinstance(tile, UpgradeShop):
+            actions += [upgrade for upgrade in tile.get_upgrades_sold() if player.gold >= upgrade.gold_cost]
+        elif isinstance(tile, Place) and player.gold >= tile.gold_cost:
+            actions.append("buy" if tile.owner is None else "upgrade" if tile.owner is player else "acquire")
+        return actions
+
+    @staticmethod
+    def apply_action(player, tile, action):
+        # type: (Player, Tile, str or Upgrade or None) -> None
+        if action == "buy":
+            player.buy_place(tile)
+        elif action == "upgrade":
+            player.upgrade_place(tile)
+        elif action == "acquire":
+            player.acquire_place(tile, tile.owner)
+        elif action is not None:
+            player.buy_upgrade(action)
+
+    @staticmethod
+    def __copy_game(game_data, objects):
+        # type: (SavedGameData, list) -> list
+        # Returning a deep copy of the game followed by the copies of the objects in it.
+        memo: dict = {}
+        game: SavedGameData = copy.deepcopy(game_data, memo)
+        return [game] + [memo.get(id(obj), obj) for obj in objects]
+
+    def __value_of_action(self, game_data, player, location, action, depth):
+        # type: (SavedGameData, Player, int, str or Upgrade or None, int) -> float
+        # Returning the value for the player of doing the action on the tile at the location, then searching the
+        # next depth - 1 turns, starting with the turn of the opponent.
+        if self.copy_state:
+            game_data, player, action = SearchPolicy.__copy_game(game_data, [player, action])
+
+        tile: Tile = game_data.board.get_tiles()[location]
+        opponent: Player = game_data.ai_player if player is game_data.player_data else game_data.player_data
+        if action is None:
+            return -self.__value_of_turn(game_data, opponent, depth - 1)
+        if self.copy_state:
+            SearchPolicy.apply_action(player, tile, action)
+            return -self.__value_of_turn(game_data, opponent, depth - 1)
+
+        player_state: tuple = player.get_state()
+        opponent_state: tuple = opponent.get_state()
+        place_state: tuple or None = tile.get_state() if isinstance(tile, Place) else None
+        try:
+            SearchPolicy.apply_action(player, tile, action)
+            return -self.__value_of_turn(game_data, opponent, depth - 1)
+        finally:
+            if place_state is not None:
+                tile.set_state(place_state)
+            player.set_state(player_state)
+            opponent.set_state(opponent_state)
+
+    def __value_of_turn(self, game_data, player, depth):
+        # type: (SavedGameData, Player, int) -> float
+        # Returning the expected value for the player of the turn of the player and the next depth - 1 turns.
+        self.nodes += 1
+        if depth <= 0:
+            return SearchPolicy.evaluate(game_data, player)
+        if time.perf_counter() > self.__deadline:
+            raise TimeoutError("The time budget of the search has run out!")
+
+        tile_count: int = len(game_data.board.get_tiles())
+        opponent: Player = game_data.ai_player if player is game_data.player_data else game_data.player_data
+        total: float = 0.0  # initial value
+        for dice_value in range(1, 7):
+            if self.copy_state:
+                turn_game_data, turn_player, turn_opponent = SearchPolicy.__copy_game(game_data, [player, opponent])
+            else:
+                turn_game_data, turn_player, turn_opponent = game_data, player, opponent
+
+            state: tuple = turn_player.get_state()
+            try:
+                # Playing the turn like start_turn() and Player.roll_dice() do with the value of the dice.
+                turn_player.gain_turn_reward()
+                turn_player.location += dice_value
+                if turn_player.location >= tile_count:
+                    turn_player.gold += turn_game_data.start_bonus
+                    turn_player.location -= tile_count
+
+                tile_type: int = turn_game_data.board.get_tile_type(turn_player.location)
+                if tile_type == Place.TILE_TYPE or tile_type == UpgradeShop.TILE_TYPE:
+                    tile: Tile = turn_game_data.board.get_tiles()[turn_player.location]
+                    total += max(self.__value_of_action(turn_game_data, turn_player, turn_player.location, action,
+                                                        depth) for action in SearchPolicy.get_actions(turn_player, tile))
+                else:
+                    total -= self.__value_of_turn(turn_game_data, turn_opponent, depth - 1)
+            finally:
+                if not self.copy_state:
+                    turn_player.set_state(state)
+
+        return total / 6
+
+    def search(self, game_data, player, tile):
+        # type: (SavedGameData, Player, Tile) -> str or Upgrade or None or bool
+        # Returning the best action of the player on the tile they have landed on (see get_actions()), or False if
+        # no search has finished within the time budget.
+        actions: list = SearchPolicy.get_actions(player, tile)
+        if len(actions) == 1:
+            return None
+
+        start_time: float = time.perf_counter()
+        self.__deadline = start_time + self.time_budget
+        best_action: str or Upgrade or None or bool = False  # initial value
+        depth: int = 0  # initial value
+        try:
+            while depth < self.max_depth:
+                values: list = [self.__value_of_action(game_data, player, player.location, action, depth + 1)
+                                for action in actions]
+                best_action = actions[values.index(max(values))]
+                depth += 1
+        except TimeoutError:
+            pass
+
+        self.depths.append(depth)
+        self.search_time += time.perf_counter() - start_time
+        return best_action
+
+    def decide_buy_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        decision: bool = self.fallback.decide_buy_place(game_data, player, place)
+        action: str or None or bool = self.search(game_data, player, place)
+        return decision if action is False else action is not None
+
+    def decide_upgrade_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        decision: bool = self.fallback.decide_upgrade_place(game_data, player, place)
+        action: str or None or bool = self.search(game_data, player, place)
+        return decision if action is False else action is not None
+
+    def decide_acquire_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        decision: bool = self.fallback.decide_acquire_place(game_data, player, place)
+        action: str or None or bool = self.search(game_data, player, place)
+        return decision if action is False else action is not None
+
+    def choose_upgrade(self, game_data, player, upgrade_shop):
+        # type: (SavedGameData, Player, UpgradeShop) -> Upgrade or None
+        upgrade: Upgrade or None = self.fallback.choose_upgrade(game_data, player, upgrade_shop)
+        action: Upgrade or None or bool = self.search(game_data, player, upgrade_shop)
+        return upgrade if action is False else action
+
+
+class InteractivePolicy(DecisionPolicy):
+    """
+    This class contains attributes of the decisions of the player, asked for on the command line (through the
+    renderer of the game, if any).
+    """
+
+    def __init__(self, renderer=None):
+        # type: (TerminalRenderer or None) -> None
+        self.renderer: TerminalRenderer or None = renderer
+
+    def __print(self, text):
+        # type: (str) -> None
+        if self.renderer is None:
+            print(text)
+        else:
+            self.renderer.print(text)
+
+    def __input(self, prompt):
+        # type: (str) -> str
+        return input(prompt) if self.renderer is None else self.renderer.input(prompt)
+
+    def __ask(self, question):
+        # type: (str) -> bool
+        self.__print("Enter 'Y' for yes.\nEnter anything else for no.")
+        return self.__input(question) == "Y"
+
+    def decide_buy_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return self.__ask("Do you want to buy " + str(place.name) + " for " + str(place.gold_cost) + " gold? ")
+
+    def decide_upgrade_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return self.__ask("Do you want to upgrade " + str(place.name) + "? ")
+
+    def decide_acquire_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return self.__ask("Do you want to acquire " + str(place.name) + "? ")
+
+    def choose_upgrade(self, game_data, player, upgrade_shop):
+        # type: (SavedGameData, Player, UpgradeShop) -> Upgrade or None
+        if not self.__ask("Do you want to buy an upgrade? "):
+            return None
+
+        # Asking the player to choose which upgrade to buy.
+        upgrades_sold: list = upgrade_shop.get_upgrades_sold()
+        self.__print("\n".join(["Below is a list of upgrades sold in the upgrade shop."] +
+                               ["#" + str(upgrade_index) + " " + format_upgrade_line(upgrade)
+                                for upgrade_index, upgrade in enumerate(upgrades_sold, 1)]))
+        buy_upgrade_index: int = int(self.__input("Please enter the index of the upgrade you want to buy (1 - " +
+                                                  str(len(upgrades_sold)) + "): "))
+        while buy_upgrade_index < 1 or buy_upgrade_index > len(upgrades_sold):
+            buy_upgrade_index = int(self.__input("Sorry, invalid input! Please enter the index of the upgrade you "
+                                                 "want to buy (1 - " + str(len(upgrades_sold)) + "): "))
+
+        return upgrades_sold[buy_upgrade_index - 1]
+
+
+class RecordingPolicy(DecisionPolicy):
+    """
+    This class contains attributes of the decisions of another policy, which are recorded so that the game can be
+    replayed. Upgrades are recorded by their index in the upgrade shop.
+    """
+
+    def __init__(self, policy):
+        # type: (DecisionPolicy) -> None
+        self.policy: DecisionPolicy = policy
+        self.decisions: list = []  # decisions made since they were last taken
+
+    def decide_buy_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        decision: bool = bool(self.policy.decide_buy_place(game_data, player, place))
+        self.decisions.append(decision)
+        return decision
+
+    def decide_upgrade_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        decision: bool = bool(self.policy.decide_upgrade_place(game_data, player, place))
+        self.decisions.append(decision)
+        return decision
+
+    def decide_acquire_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        decision: bool = bool(self.policy.decide_acquire_place(game_data, player, place))
+        self.decisions.append(decision)
+        return decision
+
+    def choose_upgrade(self, game_data, player, upgrade_shop):
+        # type: (SavedGameData, Player, UpgradeShop) -> Upgrade or None
+        upgrade: Upgrade or None = self.policy.choose_upgrade(game_data, player, upgrade_shop)
+        upgrades_sold: list = upgrade_shop.get_upgrades_sold()
+        self.decisions.append(None if upgrade is None else
+                              [upgrade_sold is upgrade for upgrade_sold in upgrades_sold].index(True))
+        return upgrade
+
+    def take_decisions(self):
+        # type: () -> list
+        decisions: list = self.decisions
+        self.decisions = []
+        return decisions
+
+
+class ReplayPolicy(DecisionPolicy):
+    """
+    This class contains attributes of the decisions recorded by a RecordingPolicy, made again in the same order.
+    With a fallback policy, the fallback decides in the turns without recorded decisions, and is asked first in the
+    others as well, so that it draws the same random numbers as when the game was played (see LLMPolicy).
+    """
+
+    def __init__(self, decisions, fallback=None):
+        # type: (dict, DecisionPolicy or None) -> None
+        self.decisions: dict = decisions  # turn -> decisions of the player in that turn
+        self.fallback: DecisionPolicy or None = fallback
+        self.__turn: int = -1  # initial value
+        self.__next_decision: int = 0  # index of the next decision of the turn
+
+    def __take(self, game_data, is_upgrade, fallback_decision=None):
+        # type: (SavedGameData, bool, bool or int or None) -> bool or int or None
+        if self.fallback is not None and game_data.turn not in self.decisions:
+            return fallback_decision
+
+        if game_data.turn != self.__turn:
+            self.__turn = game_data.turn
+            self.__next_decision = 0
+
+        turn_decisions: list = self.decisions.get(game_data.turn, [])
+        if self.__next_decision >= len(turn_decisions) or \
+                isinstance(turn_decisions[self.__next_decision], bool) == is_upgrade:
+            raise ValueError("The replay differs from the recorded game in turn " + str(game_data.turn) + "!")
+
+        self.__next_decision += 1
+        return turn_decisions[self.__next_decision - 1]
+
+    def decide_buy_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return self.__take(game_data, False, self.fallback is not None and
+                           self.fallback.decide_buy_place(game_data, player, place))
+
+    def decide_upgrade_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return self.__take(game_data, False, self.fallback is not None and
+                           self.fallback.decide_upgrade_place(game_data, player, place))
+
+    def decide_acquire_place(self, game_data, player, place):
+        # type: (SavedGameData, Player, Place) -> bool
+        return self.__take(game_data, False, self.fallback is not None and
+                           self.fallback.decide_acquire_place(game_data, player, place))
+
+    def choose_upgrade(self, game_data, player, upgrade_shop):
+        # type: (SavedGameData, Player, UpgradeShop) -> Upgrade or None
+        upgrades_sold: list = upgrade_shop.get_upgrades_sold()
+        fallback_upgrade: Upgrade or None = None if self.fallback is None else \
+            self.fallback.choose_upgrade(game_data, player, upgrade_shop)
+        upgrade_index: int or None = self.__take(game_data, True, None if fallback_upgrade is None else
+                                                 [upgrade is fallback_upgrade for upgrade in upgrades_sold].index(True))
+        return None if upgrade_index is None else upgrades_sold[upgrade_index]
+
+
+class GameSettings:
+    """
+    This class contains attributes of the numbers a new game is created with and the AI player decides by.
+    """
+
+    def __init__(self, start_bonus_range=(100000, 500000), tile_count_range=(500, 800),
+                 place_cost_exponent_range=(5, 2000), upgrade_count_range=(10, 20),
+                 upgrade_cost_exponent_range=(10, 5120), upgrade_multiplier_range=(1, 2560), ai_probability=0.75):
+        # type: (tuple, tuple, tuple, tuple, tuple, tuple, float) -> None
+        self.start_bonus_range: list = list(start_bonus_range)
+        self.tile_count_range: list = list(tile_count_range)
+        self.place_cost_exponent_range: list = list(place_cost_exponent_range)  # places cost 10 ** exponent gold
+        self.upgrade_count_range: list = list(upgrade_count_range)
+        self.upgrade_cost_exponent_range: list = list(upgrade_cost_exponent_range)  # upgrades cost 10 ** exponent
+        self.upgrade_multiplier_range: list = list(upgrade_multiplier_range)
+        self.ai_probability: float = ai_probability  # probability of the AI player saying yes to each decision
+
+    def __str__(self):
+        # type: () -> str
+        return json.dumps(vars(self))
+
+
+class MovementKernel:
+    """
+    This class contains attributes of the players of many games moved at once with NumPy arrays: the tile types of
+    every board, the board and location of every player, how often every player has passed the start tile (and
+    earned the start bonus) and how often every tile has been landed on.
+    """
+
+    def __init__(self, tile_types, board_lengths, player_boards, rng):
+        # type: (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.random.Generator) -> None
+        import numpy as np
+        self.tile_types = tile_types  # board -> tile type of every tile, shorter boards are padded
+        self.board_lengths = np.asarray(board_lengths, dtype=np.int64)  # board -> number of tiles
+        self.player_boards = np.asarray(player_boards, dtype=np.int64)  # player -> board
+        self.rng = rng
+        self.locations = np.zeros(len(self.player_boards), dtype=np.int64)  # player -> location
+        self.laps = np.zeros(len(self.player_boards), dtype=np.int64)  # player -> times the start tile was passed
+        self.landings = np.zeros(tile_types.shape, dtype=np.int64)  # board -> landings on every tile
+        self.landings_by_type = np.zeros(TILE_TYPE_COUNT, dtype=np.int64)
+        self.__player_board_lengths = self.board_lengths[self.player_boards]
+
+    def step(self):
+        # type: () -> tuple
+        # Rolling the dice for every player at once. Returning the values rolled, whether every player has passed
+        # the start tile and the types of the tiles landed on.
+        import numpy as np
+        dice_values = self.rng.integers(1, 7, size=len(self.locations))
+        self.locations += dice_values
+        passed_start = self.locations >= self.__player_board_lengths
+        self.locations -= self.__player_board_lengths * passed_start
+        self.laps += passed_start
+        landed_types = self.tile_types[self.player_boards, self.locations]
+        # Players of the same board can land on the same tile, so the landings are added with np.add.at.
+        np.add.at(self.landings, (self.player_boards, self.locations), 1)
+        self.landings_by_type += np.bincount(landed_types, minlength=TILE_TYPE_COUNT)
+        return dice_values, passed_start, landed_types
+
+    def run(self, steps):
+        # type: (int) -> None
+        for _ in range(steps):
+            self.step()
+
+
+class SimulationResults:
+    """
+    This class contains attributes of the results of simulated games, kept one column per statistic so that they
+    can be loaded straight into a data frame, and aggregated into a summary.
+    """
+
+    def __init__(self, settings):
+        # type: (GameSettings) -> None
+        self.settings: GameSettings = settings
+        self.columns: OrderedDict = OrderedDict()  # name of statistic -> value of every game, in order of arrival
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.columns.get("seed", []))
+
+    def add(self, result):
+        # type: (dict) -> None
+        for key, value in result.items():
+            self.columns.setdefault(key, []).append(value)
+
+    def get_summary(self):
+        # type: () -> dict
+        games: int = len(self)
+        summary: dict = {"games": games, "win_rates": {
+            winner: self.columns["winner"].count(winner) / games for winner in ["PLAYER", "AI PLAYER", "DRAW"]
+        } if games > 0 else {}}
+        for key in ["level_trajectories", "gold_trajectories"]:
+            # Mean of every sample of every player over the games lasting long enough to have it.
+            summary["mean_" + key] = [[sum(values) / len(values) for values in
+                                       zip(*[trajectories[i] for trajectories in self.columns.get(key, [])])]
+                                      for i in range(2)]
+
+        time_to_level: list = [{}, {}]  # level -> [fraction of games reaching it, median turn, 90th percentile turn]
+        for i in range(2):
+            level: int = 2
+            while True:
+                turns: list = sorted(level_turns[i][level] for level_turns in self.columns.get("level_turns", [])
+                                     if len(level_turns[i]) > level)
+                if len(turns) == 0:
+                    break
+
+                time_to_level[i][level] = [len(turns) / games, turns[len(turns) // 2],
+                                           turns[min(len(turns) - 1, int(len(turns) * 0.9))]]
+                level += 1
+
+        summary["time_to_level"] = time_to_level
+        landings_by_type: dict = {}  # initial value
+        for landings in self.columns.get("landings_by_type", []):
+            for tile_type, count in landings.items():
+                landings_by_type[tile_type] = landings_by_type.get(tile_type, 0) + count
+
+        total_landings: int = sum(landings_by_type.values())
+        summary["landing_frequencies_by_type"] = {tile_type: count / total_landings
+                                                  for tile_type, count in landings_by_type.items()}
+        landings_by_position: list = [0] * max([len(landings) for landings in
+                                                self.columns.get("landings_by_position", [])] + [0])
+        for landings in self.columns.get("landings_by_position", []):
+            for position, count in enumerate(landings):
+                landings_by_position[position] += count
+
+        summary["landing_frequencies_by_position"] = [count / total_landings for count in landings_by_position] \
+            if total_landings > 0 else []
+        return summary
+
+    def save(self, file_name):
+        # type: (str) -> None
+        data: dict = {"version": 1, "settings": vars(self.settings), "summary": self.get_summary(),
+                      "columns": self.columns}
+        write_file_atomically(file_name, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
 # Creating main function used to run the game.
 
 
@@ -472,9 +4665,16 @@ def main() -> int:
     This main function is used to run the game.
     :return: an integer
     """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Plays the board game against the AI "
+                                                                          "player.")
+    parser.add_argument("--difficulty", choices=["normal", "hard"], default=AI_DIFFICULTY,
+                        help="\"normal\" AI player deciding at random or \"hard\" AI player searching the next turns")
+    parser.add_argument("--llm-decisions", action=argparse.BooleanOptionalAction, default=LLM_AI_DECISIONS,
+                        help="let the LLM make the decisions of the AI player (see LLMPolicy)")
+    args: argparse.Namespace = parser.parse_args()
 
     # Saved game data
-    saved_game_data: SavedGameData = SavedGameData("", mpf(random.randint(100000, 500000)),
+    saved_game_data: SavedGameData = SavedGameData("", BigNumber(random.randint(100000, 500000)),
                                                    Player(""), AIPlayer(), Board([]))  # initial value
 
     # The player's name
@@ -485,6 +4685,7 @@ def main() -> int:
     for i, model in enumerate(MODELS, 1):
         print(f"{i}. {model}")
 
+    startup_timings["first_prompt"] = time.perf_counter() - STARTUP_TIME
     choice: str = input("Please enter the number of the LLM model you want to use: ")
     while choice not in [str(i) for i in range(1, len(MODELS) + 1)]:
         print("Options:")
@@ -494,14 +4695,18 @@ def main() -> int:
         choice = input("Sorry, invalid input! Please enter the number of the LLM model you want to use: ")
 
     chosen_model: str = MODELS[int(choice) - 1]
-    output: subprocess.CompletedProcess[str] = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-    output_str: str = output.stdout
-    if chosen_model not in output_str:
+    if not is_model_installed(chosen_model):
         print("Cannot run " + str(chosen_model) + "! Please manually pull " + str(chosen_model) + " first!")
         return 1
 
+    # Loading the model in the background while the player goes through the menus.
+    llm: LLMClient = create_llm_client(chosen_model)
+    model_keep_alive: ModelKeepAlive = ModelKeepAlive(llm)
+    model_keep_alive.start()
+
     clear()
-    llm = OllamaLLM(model=chosen_model)
+    name_pool: NamePool = NamePool.load(os.path.join(CACHE_DIRECTORY, NAME_POOL_FILE_NAME))
+    catalog: SaveCatalog = SaveCatalog.load(os.path.join(SAVED_GAMES_DIRECTORY, CATALOG_FILE_NAME))
     print("Enter \"NEW GAME\" to create new saved game data.")
     print("Enter \"LOAD GAME\" to load existing saved game data.")
     action: str = input("What do you want to do? ")
@@ -517,227 +4722,214 @@ def main() -> int:
             clear()
 
             player_name = input("Please enter player name: ")
-            saved_game_files: list = [f for f in os.listdir("../saved")]
-            while player_name in saved_game_files:
-                print("Below is a list of existing saved game files:\n")
-                for i in range(len(saved_game_files)):
-                    print(str(i + 1) + ". " + str(saved_game_files[i]))
-
+            while catalog.lookup(player_name) is not None or \
+                    os.path.exists(os.path.join(SAVED_GAMES_DIRECTORY, player_name)):
                 player_name = input("Sorry, player name " + str(player_name) + " already exists! "
                                                                                "Enter another player name: ")
 
-            # Initialising the upgrade shop.
-            upgrades: list = []  # initial value.
-            num_upgrades: int = random.randint(10, 20)
-            for j in range(num_upgrades):
-                upgrade_name: str = llm.invoke("Please enter a good name of an upgrade (safe one word response only please)!")
-                upgrade_description: str = "An upgrade"
-                upgrade: Upgrade = Upgrade(upgrade_name, upgrade_description, mpf("10") ** random.randint(10, 5120),
-                                           mpf(random.randint(1, 2560)), mpf(random.randint(1, 2560)))
-                upgrades.append(upgrade)
-
-            upgrade_shop: UpgradeShop = UpgradeShop(upgrades)
-
-            # Initialising the board.
-            board_tiles: list = []  # Initial value
-            num_tiles: int = random.randint(500, 800)
+            # Laying out the board. Names are filled in by the LLM once the board layout is known, or while playing
+            # when the board is generated lazily.
+            settings: GameSettings = GameSettings()
+            saved_game_data, places, upgrades = create_new_game(player_name, settings)
+
+            # Generating the names of the places and the upgrades from the name pool and the LLM.
             place_count: int = 0
-            for i in range(num_tiles):
-                if i == 0:
-                    board_tiles.append(StartTile())
-                else:
-                    num: int = random.randint(1, 4)
-                    if num == 1:
-                        board_tiles.append(EmptySpace())
-                    elif num == 2:
-                        place_name: str = llm.invoke("Please enter a name of a jungle, mountain, pirate cove, lake, forest, "
-                                           "desert, harbor, sea, castle, island, or beach (include the place name only please)!")
-                        place_description: str = "A " + str(random.choice(["jungle", "mountain", "pirate cove",
-                                                                           "lake", "forest", "desert", "harbor", "sea",
-                                                                           "castle", "island", "beach"]))
-                        place_gold_cost: mpf = mpf("10") ** random.randint(5, 2000)
-                        place: Place = Place(place_name, place_description, place_gold_cost,
-                                             place_gold_cost / mpf("1e3"), place_gold_cost / mpf("1e5"))
-                        board_tiles.append(place)
-                        place_count += 1
+            last_progress_time: float = 0.0
+
+            def on_name_generated(index, name):
+                # type: (int, str) -> None
+                nonlocal place_count, last_progress_time
+                if index < len(places):
+                    places[index].name = name
+                    place_count += 1
+                    if place_count == len(places) or time.time() - last_progress_time >= PROGRESS_REFRESH_INTERVAL:
+                        last_progress_time = time.time()
                         clear()
                         print(str(place_count) + " places generated!")
-                    elif num == 3:
-                        board_tiles.append(RandomRewardTile())
-                    elif num == 4:
-                        board_tiles.append(upgrade_shop)
-
-            board: Board = Board(board_tiles)
-            saved_game_data = SavedGameData(player_name, mpf(random.randint(100000, 500000)), Player(player_name),
-                                            AIPlayer(), board)
+                else:
+                    upgrades[index - len(places)].name = name
+
+            if not LAZY_BOARD_GENERATION:
+                generate_names_with_pool(llm, chosen_model, name_pool,
+                                         [PLACE_NAME_PROMPT] * len(places) + [UPGRADE_NAME_PROMPT] * len(upgrades),
+                                         on_name_generated)
+
             game_started = True
         else:
             clear()
 
-            saved_game_files: list = [f for f in os.listdir("../saved")]
-            if len(saved_game_files) == 0:
+            if len(catalog) == 0:
                 action = "NEW GAME"
+                continue
 
-            print("Below is a list of existing saved game files:\n")
-            for i in range(len(saved_game_files)):
-                print(str(i + 1) + ". " + str(saved_game_files[i]))
-
+            page: int = 0
+            sort_option: str = "LAST PLAYED"
+            print_catalog_page(catalog, page, sort_option)
             player_name = input("Please enter player name associated with saved game data you want to load: ")
-            while player_name not in saved_game_files:
-                clear()
-                print("Below is a list of existing saved game files:\n")
-                for i in range(len(saved_game_files)):
-                    print(str(i + 1) + ". " + str(saved_game_files[i]))
+            while catalog.lookup(player_name) is None:
+                valid_input: bool = True
+                if player_name == "NEXT PAGE":
+                    page = min(page + 1, catalog.get_page_count() - 1)
+                elif player_name == "PREVIOUS PAGE":
+                    page = max(page - 1, 0)
+                elif player_name[len("SORT BY "):] in CATALOG_SORT_KEYS and player_name.startswith("SORT BY "):
+                    sort_option = player_name[len("SORT BY "):]
+                    page = 0
+                else:
+                    valid_input = False
 
-                player_name = input("Sorry, invalid input! Please enter player name associated with "
-                                    "saved game data you want to load: ")
+                clear()
+                print_catalog_page(catalog, page, sort_option)
+                player_name = input(("" if valid_input else "Sorry, invalid input! ") + "Please enter player name "
+                                    "associated with saved game data you want to load: ")
 
-            saved_game_data = load_game_data(os.path.join("../saved", player_name))
+            saved_game_data = recover_game_data(os.path.join(SAVED_GAMES_DIRECTORY, player_name))
+            settings = None
             game_started = True
 
-    # Start playing the game
+    # Generating the names of the places close to the players in the background.
+    board_prefetcher: BoardPrefetcher = BoardPrefetcher(llm, chosen_model, name_pool, saved_game_data.board)
+    board_prefetcher.start()
+
+    # Saving the game as it is now and then journaling every turn played.
+    autosave: AutosaveJournal = AutosaveJournal(os.path.join(SAVED_GAMES_DIRECTORY, player_name), catalog)
+    autosave.snapshot(saved_game_data)
+
+    # Recording the decisions of the player, so that the game can be replayed from its seed.
+    saved_game_data.resume_random()
+    replay_recorder: ReplayRecorder = ReplayRecorder(os.path.join(SAVED_GAMES_DIRECTORY, player_name) +
+                                                     REPLAY_FILE_SUFFIX)
+    replay_recorder.start(saved_game_data, settings)
+
+    # Start playing the game. The screen shows the stats of the players and the latest events, and the places and
+    # upgrades of the players are listed on demand (see DETAIL_VIEWS).
+    renderer: TerminalRenderer = TerminalRenderer()
+    events: deque = deque(maxlen=RENDER_EVENT_COUNT)  # latest events, oldest first
+    player_policy: RecordingPolicy = RecordingPolicy(InteractivePolicy(renderer))
+    ai_policy: DecisionPolicy = RandomPolicy(GameSettings().ai_probability)
+    if args.difficulty == "hard":
+        ai_policy = SearchPolicy(ai_policy)
+
+    llm_policy: LLMPolicy or None = None  # initial value
+    if args.llm_decisions:
+        llm_policy = LLMPolicy(llm, ai_policy)
+        ai_policy = llm_policy
+
+    if not isinstance(ai_policy, RandomPolicy):
+        # Decisions which depend on more than the seed of the game (the LLM, the time the search had) are recorded.
+        ai_policy = RecordingPolicy(ai_policy)
+
+    # Turns played in this session can be undone, redone and rewound to. Going on from another turn than the last
+    # one played starts a new branch of the game, which is saved in full and replaces the rest of the replay trace.
+    history: GameHistory = GameHistory()
+    branched: bool = False  # whether the game has gone to another turn since the last turn played
     while True:
-        clear()
-        print("Enter \"Y\" for yes.")
-        print("Enter anything else for no.")
-        continue_playing: str = input("Do you want to continue playing? ")
+        board_prefetcher.prefetch([saved_game_data.player_data.location, saved_game_data.ai_player.location])
+        if llm_policy is not None:
+            llm_policy.prefetch(saved_game_data, saved_game_data.ai_player)
+
+        renderer.render(render_game_screen(saved_game_data, events))
+        renderer.print("Enter \"Y\" for yes.\nEnter anything else for no.")
+        continue_playing: str = renderer.input("Do you want to continue playing? ")
         if continue_playing != "Y":
-            save_game_data(saved_game_data, os.path.join("../saved", player_name))
+            board_prefetcher.stop()
+            model_keep_alive.stop()
+            autosave.close(saved_game_data)
+            if llm_policy is not None:
+                llm_policy.close()
+                renderer.print("CPU's decisions:\n" + str(llm_policy.stats))
+            renderer.print("LLM requests:\n" + str(llm.stats))
             return 0  # successfully saved the game
 
-        clear()
-
-        # Incrementing the value of new_game.turn
-        saved_game_data.turn += 1
-
-        print("Your stats:\n\n" + str(saved_game_data.player_data))
-        print("CPU's stats:\n\n" + str(saved_game_data.ai_player))
-
         # Checking whether it is player's or AI player's turn
-        if saved_game_data.turn % 2 == 1:
-            saved_game_data.player_data.gain_turn_reward()
-            print("It is your turn to roll the dice!")
-            print("Enter 'ROLL' to roll the dice.")
-            print("Enter anything else to save game data and quit the game.")
-            action: str = input("What do you want to do? ")
-            if action == "ROLL":
-                saved_game_data.player_data.roll_dice(saved_game_data)
-                curr_tile: Tile = saved_game_data.board.get_tiles()[saved_game_data.player_data.location]
-                print("You are now at " + str(curr_tile.name) + "!")
-                if isinstance(curr_tile, StartTile) or isinstance(curr_tile, EmptySpace):
-                    pass  # do nothing
-                elif isinstance(curr_tile, Place):
-                    if curr_tile.owner is None:
-                        # Ask the player whether he/she wants to buy the place or not.
-                        print("Enter 'Y' for yes.")
-                        print("Enter anything else for no.")
-                        buy_place: str = input("Do you want to buy " + str(curr_tile.name) + " for "
-                                               + str(curr_tile.gold_cost) + " gold? ")
-                        if buy_place == "Y":
-                            if saved_game_data.player_data.buy_place(curr_tile):
-                                print("Congratulations! You have successfully bought " + str(curr_tile.name) + "!")
-                            else:
-                                print("Sorry! You have insufficient gold!")
-
-                    elif curr_tile in saved_game_data.player_data.get_owned_list():
-                        # Ask the player whether he/she wants to upgrade the place or not.
-                        print("Enter 'Y' for yes.")
-                        print("Enter anything else for no.")
-                        upgrade_place: str = input("Do you want to upgrade " + str(curr_tile.name) + "? ")
-                        if upgrade_place == "Y":
-                            if saved_game_data.player_data.upgrade_place(curr_tile):
-                                print("Congratulations! You have successfully upgraded " + str(curr_tile.name) + "!")
-                            else:
-                                print("Sorry! You have insufficient gold!")
-                    else:
-                        # Ask the player whether he/she wants to acquire the place or not.
-                        print("Enter 'Y' for yes.")
-                        print("Enter anything else for no.")
-                        acquire_place: str = input("Do you want to acquire " + str(curr_tile.name) + "? ")
-                        if acquire_place == "Y":
-                            if saved_game_data.player_data.acquire_place(curr_tile, curr_tile.owner):
-                                print("Congratulations! You have successfully acquired " + str(curr_tile.name) + "!")
-                            else:
-                                print("Sorry! You have insufficient gold!")
-
-                elif isinstance(curr_tile, RandomRewardTile):
-                    # Grant random reward
-                    random_reward: RandomReward = RandomReward()
-                    saved_game_data.player_data.get_random_reward(random_reward)
-                    print("Congratulations! You earned " + str(random_reward.reward_gold) + " gold and "
-                          + str(random_reward.reward_exp) + " EXP!")
-
-                elif isinstance(curr_tile, UpgradeShop):
-                    # Asking whether the player wants to buy an upgrade or not.
-                    print("Enter 'Y' for yes.")
-                    print("Enter anything else for no.")
-                    buy_upgrade: str = input("Do you want to buy an upgrade? ")
-
-                    if buy_upgrade == "Y":
-                        # Asking the player to choose which upgrade to buy.
-                        print("Below is a list of upgrades sold in the upgrade shop.")
-                        upgrade_index: int = 1  # initial value
-                        for upgrade in curr_tile.get_upgrades_sold():
-                            print("UPGRADE #" + str(upgrade_index))
-                            print(str(upgrade) + "\n")
-                            upgrade_index += 1
-
-                        buy_upgrade_index: int = int(input("Please enter the index of the upgrade "
-                                                           "you want to buy (1 - " +
-                                                           str(len(curr_tile.get_upgrades_sold())) + "): "))
-                        while buy_upgrade_index < 1 or buy_upgrade_index > len(curr_tile.get_upgrades_sold()):
-                            buy_upgrade_index = int(input("Sorry, invalid input! Please enter the index of the upgrade "
-                                                          "you want to buy (1 - " +
-                                                          str(len(curr_tile.get_upgrades_sold())) + "): "))
-
-                        upgrade_to_buy: Upgrade = curr_tile.get_upgrades_sold()[buy_upgrade_index - 1]
-                        if saved_game_data.player_data.buy_upgrade(upgrade_to_buy):
-                            print("Congratulations! You have successfully bought " + str(upgrade_to_buy.name) + "!")
-                        else:
-                            print("Sorry! You have insufficient gold!")
-
+        history.begin_turn(saved_game_data)
+        current_player: Player = start_turn(saved_game_data)
+        if current_player is saved_game_data.player_data:
+            while True:
+                renderer.render(render_game_screen(saved_game_data, events))
+                earliest_turn, latest_turn = history.get_turn_range(saved_game_data)
+                renderer.print("It is your turn to roll the dice!\nEnter 'ROLL' to roll the dice.\nEnter " +
+                               ", ".join("'" + view + "'" for view in DETAIL_VIEWS) + " to see what is owned.\n"
+                               "Enter 'UNDO' or 'REDO' to take back or play again your last turn, or 'REWIND' "
+                               "followed by a turn (" + str(earliest_turn) + " - " + str(latest_turn) + ") to "
+                               "go back to it.\nEnter anything else to save game data and quit the game.")
+                action: str = renderer.input("What do you want to do? ")
+                if action not in DETAIL_VIEWS:
+                    break
+
+                show_details(renderer, saved_game_data, action)
+
+            if action in ["UNDO", "REDO"] or (action.startswith("REWIND ") and action[len("REWIND "):].isdigit()):
+                # Going back to the start of a turn of the player, which is the end of an even turn.
+                history.cancel_turn(saved_game_data)
+                if action == "UNDO":
+                    target_turn: int = saved_game_data.turn - 2 + saved_game_data.turn % 2
+                elif action == "REDO":
+                    target_turn = saved_game_data.turn + 2 - saved_game_data.turn % 2
                 else:
-                    pass  # do nothing
-            else:
+                    target_turn = int(action[len("REWIND "):]) - 1
+
+                history.rewind(saved_game_data, target_turn)
+                saved_game_data.resume_random()
+                branched = True
+                events.clear()
+                events.append("The game is back at the start of turn " + str(saved_game_data.turn + 1) + "!")
+                continue
+
+            if action != "ROLL":
                 break
         else:
-            saved_game_data.ai_player.gain_turn_reward()
-            print("It is CPU's turn to roll the dice!")
-            saved_game_data.ai_player.roll_dice(saved_game_data)
-            curr_tile: Tile = saved_game_data.board.get_tiles()[saved_game_data.ai_player.location]
-            print("CPU is now at " + str(curr_tile.name) + "!")
-            if isinstance(curr_tile, StartTile) or isinstance(curr_tile, EmptySpace):
-                pass  # do nothing
-            elif isinstance(curr_tile, Place):
-                if curr_tile.owner is None:
-                    buy_place: bool = random.random() <= 0.75
-                    if buy_place:
-                        saved_game_data.ai_player.buy_place(curr_tile)
-
-                elif curr_tile in saved_game_data.ai_player.get_owned_list():
-                    upgrade_place: bool = random.random() <= 0.75
-                    if upgrade_place:
-                        saved_game_data.ai_player.upgrade_place(curr_tile)
+            renderer.print("It is CPU's turn to roll the dice!")
+
+        if branched:
+            # Saving the game as it was before the turn, which is started again (start_turn() draws no random
+            # numbers), as the turns after it are replaced by the new branch.
+            history.cancel_turn(saved_game_data)
+            autosave.snapshot(saved_game_data)
+            replay_recorder.record_resume(saved_game_data.turn)
+            branched = False
+            history.begin_turn(saved_game_data)
+            start_turn(saved_game_data)
+
+        move_player(saved_game_data, current_player)
+        board_prefetcher.ensure_generated(current_player.location)
+        curr_tile: Tile = saved_game_data.board.get_tiles()[current_player.location]
+        if current_player is saved_game_data.player_data:
+            events.append("You are now at " + str(curr_tile.name) + "!")
+            renderer.print(events[-1])
+            for event in resolve_tile(saved_game_data, current_player, player_policy):
+                if event.kind == TurnEvent.RANDOM_REWARD:
+                    events.append("Congratulations! You earned " + str(event.subject.reward_gold) + " gold and "
+                                  + str(event.subject.reward_exp) + " EXP!")
+                elif not event.succeeded:
+                    events.append("Sorry! You have insufficient gold!")
                 else:
-                    acquire_place: bool = random.random() <= 0.75
-                    if acquire_place:
-                        saved_game_data.ai_player.acquire_place(curr_tile, curr_tile.owner)
-
-            elif isinstance(curr_tile, RandomRewardTile):
-                # Grant random reward
-                random_reward: RandomReward = RandomReward()
-                saved_game_data.ai_player.get_random_reward(random_reward)
-                print("CPU earned " + str(random_reward.reward_gold) + " gold and "
-                      + str(random_reward.reward_exp) + " EXP!")
-
-            elif isinstance(curr_tile, UpgradeShop):
-                buy_upgrade: bool = random.random() <= 0.75
-                if buy_upgrade:
-                    buy_upgrade_index: int = random.randint(1, len(curr_tile.get_upgrades_sold()))
-                    upgrade_to_buy: Upgrade = curr_tile.get_upgrades_sold()[buy_upgrade_index - 1]
-                    saved_game_data.ai_player.buy_upgrade(upgrade_to_buy)
-            else:
-                pass  # do nothing
+                    events.append("Congratulations! You have successfully " + {
+                        TurnEvent.BUY_PLACE: "bought", TurnEvent.UPGRADE_PLACE: "upgraded",
+                        TurnEvent.ACQUIRE_PLACE: "acquired", TurnEvent.BUY_UPGRADE: "bought"
+                    }[event.kind] + " " + str(event.subject.name) + "!")
+
+            replay_recorder.record_turn(saved_game_data.turn, player_policy.take_decisions())
+        else:
+            events.append("CPU is now at " + str(curr_tile.name) + "!")
+            for event in resolve_tile(saved_game_data, current_player, ai_policy):
+                if event.kind == TurnEvent.RANDOM_REWARD:
+                    events.append("CPU earned " + str(event.subject.reward_gold) + " gold and "
+                                  + str(event.subject.reward_exp) + " EXP!")
+
+            if isinstance(ai_policy, RecordingPolicy):
+                replay_recorder.record_turn(saved_game_data.turn, ai_policy.take_decisions())
+
+        history.end_turn(saved_game_data)
+        autosave.record_turn(saved_game_data, board_prefetcher.drain_generated())
+
+    # The turns played before quitting without saving stay in the journal.
+    board_prefetcher.stop()
+    model_keep_alive.stop()
+    autosave.close()
+    if llm_policy is not None:
+        llm_policy.close()
+    renderer.print("LLM requests:\n" + str(llm.stats))
 
 
 if __name__ == "__main__":
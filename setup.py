@@ -20,6 +20,9 @@ setup(
     long_description_content_type="text/markdown",
     include_package_data=True,
     install_requires=[],
+    extras_require={
+        "simulation": ["numpy"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3.9",
@@ -30,6 +33,9 @@ setup(
     entry_points={
         "console_scripts": [
             "ollama_cli_board_game=ollama_cli_board_game.ollama_cli_board_game:main",
+            "ollama_cli_board_game_rebuild_catalog=ollama_cli_board_game.ollama_cli_board_game:rebuild_catalog",
+            "ollama_cli_board_game_simulate=ollama_cli_board_game.ollama_cli_board_game:simulate",
+            "ollama_cli_board_game_replay=ollama_cli_board_game.ollama_cli_board_game:replay",
         ]
     }
 )
\ No newline at end of file
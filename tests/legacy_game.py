@@ -0,0 +1,154 @@
+"""
+This file contains the classes of saved games of the first version of the game, which pickled the whole game with
+mpmath numbers, so that saved games of that version can be written for the tests and the benchmarks. Only the
+attributes and the methods changing them are kept, as they were (acquire_place() included, which left the acquired
+place in the list of its previous owner too).
+"""
+
+
+import random
+import uuid
+
+from mpmath import mpf
+
+
+class Board:
+    def __init__(self, tiles):
+        self.__tiles: list = tiles
+
+    def get_tiles(self):
+        return self.__tiles
+
+
+class Tile:
+    def __init__(self, name, description):
+        self.name: str = name
+        self.description: str = description
+
+
+class StartTile(Tile):
+    def __init__(self):
+        Tile.__init__(self, "START TILE", "A tile where the player can gain awards by passing or landing on it.")
+
+
+class EmptySpace(Tile):
+    def __init__(self):
+        Tile.__init__(self, "EMPTY SPACE", "A tile where nothing happens if the player lands on it.")
+
+
+class Place(Tile):
+    def __init__(self, name, description, gold_cost, gold_per_turn, exp_per_turn):
+        Tile.__init__(self, name, description)
+        self.level: int = 1
+        self.gold_cost: mpf = gold_cost
+        self.gold_per_turn: mpf = gold_per_turn
+        self.exp_per_turn: mpf = exp_per_turn
+        self.owner: Player or None = None
+
+    def level_up(self):
+        self.level += 1
+        self.gold_cost *= mpf("10") ** int(self.level * (self.level - 1) / 2)
+        self.gold_per_turn *= mpf("10") ** (int(self.level * (self.level - 1) / 2) - 1)
+        self.exp_per_turn *= mpf("10") ** (int(self.level * (self.level - 1) / 2) - 1)
+
+
+class RandomRewardTile(Tile):
+    def __init__(self):
+        Tile.__init__(self, "RANDOM REWARD TILE", "A tile granting random rewards to the player landing on it.")
+
+
+class UpgradeShop(Tile):
+    def __init__(self, upgrades_sold):
+        Tile.__init__(self, "UPGRADE SHOP", "A tile where the player can buy upgrades.")
+        self.__upgrades_sold: list = upgrades_sold
+
+    def get_upgrades_sold(self):
+        return self.__upgrades_sold
+
+
+class Upgrade:
+    def __init__(self, name, description, gold_cost, gold_gain_multiplier, exp_gain_multiplier):
+        self.name: str = name
+        self.description: str = description
+        self.gold_cost: mpf = gold_cost
+        self.gold_gain_multiplier: mpf = gold_gain_multiplier
+        self.exp_gain_multiplier: mpf = exp_gain_multiplier
+
+
+class Player:
+    def __init__(self, name):
+        self.player_id: str = str(uuid.uuid1())
+        self.name: str = name
+        self.level: int = 1
+        self.location: int = 0
+        self.gold: mpf = mpf("1e6")
+        self.exp: mpf = mpf("0")
+        self.required_exp: mpf = mpf("1e6")
+        self.__owned_list: list = []
+        self.__upgrade_list: list = []
+
+    def get_owned_list(self):
+        return self.__owned_list
+
+    def get_upgrade_list(self):
+        return self.__upgrade_list
+
+    def buy_place(self, place):
+        self.gold -= place.gold_cost
+        self.__owned_list.append(place)
+        place.owner = self
+
+    def acquire_place(self, place, owner):
+        self.gold -= place.gold_cost
+        owner.gold += place.gold_cost
+        place.level_up()
+        self.__owned_list.append(place)
+        owner.__owned_list.append(place)
+        place.owner = self
+
+    def buy_upgrade(self, upgrade):
+        self.gold -= upgrade.gold_cost
+        self.__upgrade_list.append(upgrade)
+
+
+class AIPlayer(Player):
+    def __init__(self):
+        Player.__init__(self, "AI PLAYER")
+
+
+class SavedGameData:
+    def __init__(self, player_name, start_bonus, player_data, ai_player, board):
+        self.player_name: str = player_name
+        self.turn: int = 0
+        self.start_bonus: mpf = start_bonus
+        self.player_data: Player = player_data
+        self.ai_player: AIPlayer = ai_player
+        self.board: Board = board
+
+
+def create_legacy_game(player_name, seed, tile_count=None):
+    # Laying out a board like the first version of the game did, with made up names instead of the LLM's.
+    rng: random.Random = random.Random(seed)
+    upgrades: list = [Upgrade("Upgrade" + str(j), "An upgrade", mpf("10") ** rng.randint(10, 5120),
+                              mpf(rng.randint(1, 2560)), mpf(rng.randint(1, 2560))) for j in range(rng.randint(10, 20))]
+    upgrade_shop: UpgradeShop = UpgradeShop(upgrades)
+    tiles: list = [StartTile()]
+    for i in range(1, rng.randint(500, 800) if tile_count is None else tile_count):
+        num: int = rng.randint(1, 4)
+        if num == 1:
+            tiles.append(EmptySpace())
+        elif num == 2:
+            gold_cost: mpf = mpf("10") ** rng.randint(5, 2000)
+            tiles.append(Place("Place" + str(i), "A " + rng.choice(["jungle", "lake", "castle"]), gold_cost,
+                               gold_cost / mpf("1e3"), gold_cost / mpf("1e5")))
+        elif num == 3:
+            tiles.append(RandomRewardTile())
+        else:
+            tiles.append(upgrade_shop)
+
+    return SavedGameData(player_name, mpf(rng.randint(100000, 500000)), Player(player_name), AIPlayer(),
+                         Board(tiles))
+
+
+def get_places(game_data):
+    return [tile for tile in game_data.board.get_tiles() if isinstance(tile, Place)]
@@ -0,0 +1,130 @@
+"""
+This file contains tests of the autosave journal and of recovering games from their last full save and journal.
+"""
+
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+def create_game(seed=4):
+    game_data, places, upgrades = game.create_new_game("Player", game.GameSettings(), seed)
+    for i, named in enumerate(places + upgrades):
+        named.name = "Name" + str(i)
+
+    game_data.resume_random()
+    return game_data
+
+
+def play_turns(game_data, turns, journal=None):
+    policy: game.RandomPolicy = game.RandomPolicy()
+    for _ in range(turns):
+        game.play_turn(game_data, policy, policy)
+        if journal is not None:
+            journal.record_turn(game_data)
+
+
+def describe(game_data):
+    return (game.describe_game_state(game_data),
+            [(player.get_gold_per_turn(), player.get_exp_per_turn())
+             for player in [game_data.player_data, game_data.ai_player]])
+
+
+def test_journal_is_replayed_over_snapshot(tmp_path):
+    file_name: str = str(tmp_path / "Player")
+    game_data: game.SavedGameData = create_game()
+    journal: game.AutosaveJournal = game.AutosaveJournal(file_name, snapshot_interval=1000)
+    journal.snapshot(game_data)
+    play_turns(game_data, 300, journal)
+    journal.close()
+
+    assert game.load_game_data(file_name).turn == 0
+    recovered_game_data: game.SavedGameData = game.recover_game_data(file_name)
+    assert recovered_game_data.turn == game_data.turn
+    assert describe(recovered_game_data) == describe(game_data)
+
+
+def test_snapshots_restart_journal(tmp_path):
+    file_name: str = str(tmp_path / "Player")
+    game_data: game.SavedGameData = create_game()
+    journal: game.AutosaveJournal = game.AutosaveJournal(file_name, snapshot_interval=50)
+    journal.snapshot(game_data)
+    play_turns(game_data, 120, journal)
+    journal.close()
+
+    records: list = game.read_journal_records(file_name + game.JOURNAL_FILE_SUFFIX)
+    assert records[0]["turn"] == game.load_game_data(file_name).turn > 0
+    assert describe(game.recover_game_data(file_name)) == describe(game_data)
+
+
+def test_background_writer_flushes_on_close(tmp_path):
+    file_name: str = str(tmp_path / "Player")
+    game_data: game.SavedGameData = create_game()
+    journal: game.AutosaveJournal = game.AutosaveJournal(file_name, snapshot_interval=1000)
+    journal.snapshot(game_data)
+    play_turns(game_data, 200, journal)
+    journal.close()
+
+    # Every queued entry is written by the time close() returns.
+    records: list = game.read_journal_records(file_name + game.JOURNAL_FILE_SUFFIX)
+    assert [entry["turn"] for entry in records[1:]] == list(range(1, 201))
+
+    # Closing with the game saves it whole and starts the journal again.
+    journal = game.AutosaveJournal(file_name, snapshot_interval=1000)
+    journal.snapshot(game_data)
+    play_turns(game_data, 10, journal)
+    journal.close(game_data)
+    assert describe(game.load_game_data(file_name)) == describe(game_data)
+    assert [entry["turn"] for entry in game.read_journal_records(file_name + game.JOURNAL_FILE_SUFFIX)] == [210]
+
+
+def test_torn_and_corrupted_records_are_ignored(tmp_path):
+    file_name: str = str(tmp_path / "Player")
+    game_data: game.SavedGameData = create_game()
+    journal: game.AutosaveJournal = game.AutosaveJournal(file_name, snapshot_interval=1000)
+    journal.snapshot(game_data)
+    play_turns(game_data, 50, journal)
+    journal.close()
+
+    record: bytes = game.encode_journal_record({"turn": 1000, "players": [[0, 99, 0, 0, 0, 0]]})
+    corrupted: bytearray = bytearray(record)
+    corrupted[-2] ^= 0xFF
+    for tail in [record[:len(record) // 2], bytes(corrupted), bytes(corrupted) + record]:
+        with open(file_name + game.JOURNAL_FILE_SUFFIX, "rb") as f:
+            journal_data: bytes = f.read()
+        with open(str(tmp_path / "Copy") + game.JOURNAL_FILE_SUFFIX, "wb") as f:
+            f.write(journal_data + tail)
+        with open(file_name, "rb") as f, open(str(tmp_path / "Copy"), "wb") as g:
+            g.write(f.read())
+
+        recovered_game_data: game.SavedGameData = game.recover_game_data(str(tmp_path / "Copy"))
+        assert recovered_game_data.turn == 50
+        assert describe(recovered_game_data) == describe(game_data)
+
+
+def test_stale_journal_is_ignored(tmp_path):
+    # A crash between writing a full save and starting its journal leaves the journal of the previous save behind.
+    file_name: str = str(tmp_path / "Player")
+    game_data: game.SavedGameData = create_game()
+    journal: game.AutosaveJournal = game.AutosaveJournal(file_name, snapshot_interval=1000)
+    journal.snapshot(game_data)
+    play_turns(game_data, 40, journal)
+    journal.close()
+    play_turns(game_data, 40)
+    game.save_game_data(game_data, file_name)
+
+    recovered_game_data: game.SavedGameData = game.recover_game_data(file_name)
+    assert recovered_game_data.turn == 80
+    assert describe(recovered_game_data) == describe(game_data)
+
+
+def test_journal_of_another_game_is_ignored(tmp_path):
+    file_name: str = str(tmp_path / "Player")
+    journal: game.AutosaveJournal = game.AutosaveJournal(file_name, snapshot_interval=1000)
+    other_game_data: game.SavedGameData = create_game(seed=5)
+    journal.snapshot(other_game_data)
+    play_turns(other_game_data, 40, journal)
+    journal.close()
+    game_data: game.SavedGameData = create_game()
+    game.save_game_data(game_data, file_name)
+
+    assert describe(game.recover_game_data(file_name)) == describe(game_data)
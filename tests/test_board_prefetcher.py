@@ -0,0 +1,54 @@
+"""
+This file contains tests of the background worker generating the names of a lazily generated board.
+"""
+
+
+import threading
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+class FlakyLLM:
+    # Raising an error which is not an LLM request error on the first request and answering the others.
+    def __init__(self):
+        self.requests: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self.lock:
+            self.requests += 1
+            if self.requests == 1:
+                raise RuntimeError("The first request fails")
+            return "Name" + str(self.requests)
+
+
+def create_board():
+    place: game.Place = game.Place(None, "A place", game.BigNumber(100), game.BigNumber(10), game.BigNumber(5))
+    return game.Board([game.StartTile(), game.EmptySpace(), place, game.EmptySpace()])
+
+
+def test_ensure_generated_survives_a_failing_worker(tmp_path):
+    board: game.Board = create_board()
+    board_prefetcher: game.BoardPrefetcher = game.BoardPrefetcher(
+        FlakyLLM(), "model", game.NamePool(str(tmp_path / game.NAME_POOL_FILE_NAME)), board)
+    board_prefetcher.start()
+    try:
+        board_prefetcher.prefetch([0])
+        board_prefetcher.ensure_generated(2)
+        assert board.get_tiles()[2].name is not None
+        assert board_prefetcher.error_count == 1
+        assert isinstance(board_prefetcher.last_error, RuntimeError)
+    finally:
+        board_prefetcher.stop()
+
+
+def test_ensure_generated_after_stop(tmp_path):
+    board: game.Board = create_board()
+    llm: FlakyLLM = FlakyLLM()
+    llm.requests = 1  # no failure
+    board_prefetcher: game.BoardPrefetcher = game.BoardPrefetcher(
+        llm, "model", game.NamePool(str(tmp_path / game.NAME_POOL_FILE_NAME)), board)
+    board_prefetcher.start()
+    board_prefetcher.stop()
+    board_prefetcher.ensure_generated(2)
+    assert board.get_tiles()[2].name == "Name2"
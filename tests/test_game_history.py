@@ -0,0 +1,118 @@
+"""
+This file contains tests of undoing, redoing and rewinding the turns of a game.
+"""
+
+
+import pytest
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+SEEDS: list = [0, 1, 2]
+
+
+def snapshot(game_data):
+    # The saved state of the game, the objects the players own in their order and the income of the players.
+    players: list = [game_data.player_data, game_data.ai_player]
+    return (game.describe_game_state(game_data),
+            [([id(place) for place in player.get_owned_list()], [id(upgrade) for upgrade in player.get_upgrade_list()],
+              player.get_gold_per_turn(), player.get_exp_per_turn()) for player in players])
+
+
+def create_game(seed):
+    settings: game.GameSettings = game.GameSettings()
+    settings.tile_count_range = [40, 60]
+    game_data, _, _ = game.create_new_game("Player", settings, seed)
+    game_data.resume_random()
+    return game_data
+
+
+def play_turns(game_data, turns, history=None):
+    # Playing turns like the CLI does and returning the snapshots of the game after every turn.
+    policy: game.RandomPolicy = game.RandomPolicy()
+    snapshots: list = []  # initial value
+    for _ in range(turns):
+        if history is not None:
+            history.begin_turn(game_data)
+        game.play_turn(game_data, policy, policy)
+        if history is not None:
+            history.end_turn(game_data)
+        snapshots.append(snapshot(game_data))
+
+    return snapshots
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("k", [1, 7, 120])
+def test_undo_then_redo(seed, k):
+    game_data: game.SavedGameData = create_game(seed)
+    history: game.GameHistory = game.GameHistory()
+    snapshots: list = [snapshot(game_data)] + play_turns(game_data, 120, history)
+    assert any(len(player.get_upgrade_list()) > 0 and len(player.get_owned_list()) > 0
+               for player in [game_data.player_data, game_data.ai_player])
+
+    for i in range(1, k + 1):
+        assert history.undo(game_data)
+        assert game_data.turn == 120 - i
+        assert snapshot(game_data) == snapshots[120 - i]
+
+    assert history.get_turn_range(game_data) == (0, 120)
+    for i in range(k - 1, -1, -1):
+        assert history.redo(game_data)
+        assert snapshot(game_data) == snapshots[120 - i]
+
+    assert not history.redo(game_data)
+    assert history.get_turn_range(game_data) == (0, 120)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_rewind_then_branch(seed):
+    game_data: game.SavedGameData = create_game(seed)
+    history: game.GameHistory = game.GameHistory()
+    snapshots: list = [snapshot(game_data)] + play_turns(game_data, 60, history)
+    assert history.rewind(game_data, 25) == 25
+    assert snapshot(game_data) == snapshots[25]
+    assert history.rewind(game_data, 40) == 40
+    assert snapshot(game_data) == snapshots[40]
+    assert history.rewind(game_data, 30) == 30
+
+    # Going on from turn 30 starts a new branch, played like a game which has been resumed at turn 30.
+    game_data.resume_random()
+    branch: list = play_turns(game_data, 20, history)
+    assert not history.redo(game_data)
+    assert history.get_turn_range(game_data) == (0, 50)
+
+    expected_game_data: game.SavedGameData = create_game(seed)
+    play_turns(expected_game_data, 30)
+    expected_game_data.resume_random()
+    # Objects are compared by identity within a game, so only the states and the income are compared between games.
+    assert [(state, [income[2:] for income in players]) for state, players in play_turns(expected_game_data, 20)] == \
+        [(state, [income[2:] for income in players]) for state, players in branch]
+
+    # The branch can be undone back to the turns played before it.
+    assert history.rewind(game_data, 10) == 10
+    assert snapshot(game_data) == snapshots[10]
+    assert history.rewind(game_data, 50) == 50
+    assert snapshot(game_data) == branch[-1]
+
+
+def test_history_keeps_the_latest_turns():
+    game_data: game.SavedGameData = create_game(0)
+    history: game.GameHistory = game.GameHistory(max_turns=10)
+    snapshots: list = [snapshot(game_data)] + play_turns(game_data, 30, history)
+    assert len(history) == 10
+    assert history.rewind(game_data, 0) == 20
+    assert snapshot(game_data) == snapshots[20]
+    assert not history.undo(game_data)
+
+
+def test_cancelled_turn_leaves_game_unchanged():
+    game_data: game.SavedGameData = create_game(0)
+    history: game.GameHistory = game.GameHistory()
+    play_turns(game_data, 10, history)
+    before: tuple = snapshot(game_data)
+    history.begin_turn(game_data)
+    game.start_turn(game_data)
+    history.cancel_turn(game_data)
+    assert snapshot(game_data) == before
+    assert len(history) == 10
@@ -0,0 +1,45 @@
+"""
+This file contains tests of the running totals of the income of the players against rebuilding them.
+"""
+
+
+import pytest
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+from ollama_cli_board_game.ollama_cli_board_game import BigNumber
+
+
+SEEDS: list = list(range(10))
+RELATIVE_TOLERANCE: BigNumber = BigNumber("1e-12")  # about 4500 units in the last place of a 53-bit mantissa
+
+
+def rebuilt_income(player):
+    # The income of the player summed from its places and upgrades, as Player.recompute_income() does.
+    upgrades: list = player.get_upgrade_list()
+    gold_per_turn: BigNumber = game.big_number_sum_of_list([place.gold_per_turn for place in player.get_owned_list()]) \
+        * game.big_number_product_of_list([upgrade.gold_gain_multiplier for upgrade in upgrades])
+    exp_per_turn: BigNumber = game.big_number_sum_of_list([place.exp_per_turn for place in player.get_owned_list()]) \
+        * game.big_number_product_of_list([upgrade.exp_gain_multiplier for upgrade in upgrades])
+    return gold_per_turn, exp_per_turn
+
+
+def assert_close(value, expected):
+    assert abs(value - expected) <= abs(expected) * RELATIVE_TOLERANCE, (value, expected)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_running_totals_stay_close_to_rebuilt_ones(seed):
+    game_data, _, _ = game.create_new_game("Player", game.GameSettings(), seed)
+    game_data.resume_random()
+    policy: game.RandomPolicy = game.RandomPolicy()
+    kinds: set = set()
+    for _ in range(600):
+        result: game.TurnResult = game.play_turn(game_data, policy, policy)
+        kinds.update(event.kind for event in result.events if event.succeeded)
+        for player in [game_data.player_data, game_data.ai_player]:
+            gold_per_turn, exp_per_turn = rebuilt_income(player)
+            assert_close(player.get_gold_per_turn(), gold_per_turn)
+            assert_close(player.get_exp_per_turn(), exp_per_turn)
+
+    # Places were bought, upgraded (leveling them up) and acquired from the other player.
+    assert {game.TurnEvent.BUY_PLACE, game.TurnEvent.UPGRADE_PLACE, game.TurnEvent.ACQUIRE_PLACE} <= kinds
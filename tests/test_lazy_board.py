@@ -0,0 +1,49 @@
+"""
+This file contains tests of games loaded from memory-mapped saved games, whose tiles are decoded only when needed.
+"""
+
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+def load_played_game(tmp_path, turns=300, seed=7):
+    game_data, places, upgrades = game.create_new_game("Player", game.GameSettings(), seed)
+    for i, named in enumerate(places + upgrades):
+        named.name = "Name" + str(i)
+
+    game_data.resume_random()
+    policy: game.RandomPolicy = game.RandomPolicy()
+    for _ in range(turns):
+        game.play_turn(game_data, policy, policy)
+
+    file_name: str = str(tmp_path / "Player")
+    game.save_game_data(game_data, file_name, compress=False)
+    loaded_game_data: game.SavedGameData = game.load_game_data(file_name, lazy=True)
+    assert isinstance(loaded_game_data.board, game.LazyBoard)
+    return loaded_game_data
+
+
+def test_clone_of_lazily_loaded_game(tmp_path):
+    game_data: game.SavedGameData = load_played_game(tmp_path)
+    state: dict = game.describe_game_state(game_data)
+    clone: game.SavedGameData = game_data.clone()
+    assert game.describe_game_state(clone) == state
+    assert clone.board.get_names() == game_data.board.get_names()
+
+    # The places the players of the clone own are the places on the board of the clone.
+    tiles: list = clone.board.get_tiles()
+    for player in [clone.player_data, clone.ai_player]:
+        assert len(player.get_owned_list()) > 0
+        for place in player.get_owned_list():
+            assert any(tile is place for tile in tiles)
+            assert place.owner is player
+
+    # Playing the clone leaves the loaded game as it was, and plays exactly like the loaded game.
+    policy: game.RandomPolicy = game.RandomPolicy()
+    for _ in range(100):
+        game.play_turn(clone, policy, policy)
+    assert game.describe_game_state(game_data) == state
+
+    for _ in range(100):
+        game.play_turn(game_data, policy, policy)
+    assert game.describe_game_state(game_data) == game.describe_game_state(clone)
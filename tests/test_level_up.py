@@ -0,0 +1,116 @@
+"""
+This file contains property tests of leveling up players with a binary search over the table of required EXP
+against leveling up one level at a time, as the game used to.
+"""
+
+
+import math
+import random
+
+import pytest
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+from ollama_cli_board_game.ollama_cli_board_game import BigNumber
+
+
+SEEDS: list = list(range(20))
+
+
+@pytest.fixture(autouse=True)
+def empty_required_exp_table(monkeypatch):
+    # Every test grows the shared table from the first levels again.
+    monkeypatch.setattr(game.Player, "REQUIRED_EXP_TABLE", [BigNumber(0), BigNumber("1e6")])
+
+
+def level_up_one_level_at_a_time(level, exp, required_exp):
+    # The level up loop of the game before the table of required EXP.
+    while exp >= required_exp:
+        level += 1
+        required_exp *= BigNumber.power_of_ten(game.triangular(level))
+
+    return level, exp, required_exp
+
+
+def create_player(level, exp, required_exp):
+    player: game.Player = game.Player("Player")
+    player.level = level
+    player.exp = exp
+    player.required_exp = required_exp
+    return player
+
+
+def required_exp_of_level(level):
+    # The EXP a player needs to leave the given level, multiplied one level at a time.
+    required_exp: BigNumber = BigNumber("1e6")
+    for i in range(2, level + 1):
+        required_exp *= BigNumber.power_of_ten(game.triangular(i))
+
+    return required_exp
+
+
+def assert_levels_up_like_the_loop(level, exp, required_exp):
+    player: game.Player = create_player(level, exp, required_exp)
+    player.level_up()
+    assert (player.level, player.exp, player.required_exp) == level_up_one_level_at_a_time(level, exp, required_exp)
+
+
+def random_exp(rng, max_exponent):
+    return BigNumber(rng.random()) * BigNumber.power_of_ten(rng.randint(0, max_exponent))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_random_exp_from_level_one(seed):
+    rng: random.Random = random.Random(seed)
+    for _ in range(50):
+        assert_levels_up_like_the_loop(1, random_exp(rng, 20000), BigNumber("1e6"))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_gaining_exp_turn_after_turn(seed):
+    # Leveling up a player again and again as the game does, with the table shared by both players.
+    rng: random.Random = random.Random(seed)
+    player: game.Player = game.Player("Player")
+    level, exp, required_exp = player.level, player.exp, player.required_exp
+    for _ in range(200):
+        gain: BigNumber = random_exp(rng, rng.choice([3, 10, 1000]))
+        player.exp += gain
+        player.level_up()
+        level, exp, required_exp = level_up_one_level_at_a_time(level, exp + gain, required_exp)
+        assert (player.level, player.exp, player.required_exp) == (level, exp, required_exp)
+
+
+def test_multi_level_jumps():
+    for start_level in range(1, 8):
+        for target_level in range(start_level, 40):
+            exp: BigNumber = required_exp_of_level(target_level) * BigNumber(0.75)
+            assert_levels_up_like_the_loop(start_level, exp, required_exp_of_level(start_level))
+
+
+def test_exact_thresholds():
+    for level in range(1, 60):
+        threshold: BigNumber = required_exp_of_level(level)
+        below: BigNumber = BigNumber.from_parts(math.nextafter(threshold.mantissa, 0.0), threshold.exponent)
+        above: BigNumber = BigNumber.from_parts(math.nextafter(threshold.mantissa, 1.0), threshold.exponent)
+        for exp in [below, threshold, above]:
+            assert_levels_up_like_the_loop(1, exp, BigNumber("1e6"))
+            assert_levels_up_like_the_loop(level, exp, threshold)
+
+
+def test_table_growth():
+    table: list = game.Player.REQUIRED_EXP_TABLE
+    assert len(table) == 2
+    for level in [5, 3, 20, 12, 45]:
+        assert_levels_up_like_the_loop(1, required_exp_of_level(level), BigNumber("1e6"))
+        # The table grows one level beyond the EXP, and every level in it is the one the loop reaches.
+        assert len(table) >= level + 2
+        assert all(table[i] == required_exp_of_level(i) for i in range(1, len(table)))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_required_exp_off_the_table(seed):
+    # Players of older saved games may have required EXP which is not in the table, and level up with the loop.
+    rng: random.Random = random.Random(seed)
+    for _ in range(20):
+        level: int = rng.randint(1, 10)
+        required_exp: BigNumber = random_exp(rng, 100)
+        assert_levels_up_like_the_loop(level, random_exp(rng, 200), required_exp)
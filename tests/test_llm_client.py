@@ -0,0 +1,54 @@
+"""
+This file contains tests of the client every LLM request goes through, with fake backends instead of Ollama.
+"""
+
+
+import pytest
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+class FakeBackend:
+    # Answering with the prompt and failing every request whose prompt starts with "fail".
+    model: str = "fake"
+
+    def generate(self, prompt):
+        if prompt.startswith("fail"):
+            raise ConnectionError("The server is down")
+        return prompt.upper(), len(prompt), 2
+
+
+def test_client_counts_requests_errors_and_tokens():
+    llm: game.LLMClient = game.LLMClient(FakeBackend())
+    assert llm.invoke("abc") == "ABC"
+    assert llm.invoke("hello") == "HELLO"
+    with pytest.raises(ConnectionError):
+        llm.invoke("fail now")
+
+    assert llm.model == "fake"
+    assert (llm.stats.requests, llm.stats.errors) == (3, 1)
+    assert (llm.stats.prompt_tokens, llm.stats.completion_tokens) == (8, 4)
+    assert "Errors: 1\n" in str(llm.stats)
+
+
+def test_percentiles():
+    stats: game.LLMStats = game.LLMStats()
+    assert stats.percentile(50) == 0.0
+    for latency in range(1, 101):
+        stats.record(latency / 100)
+
+    assert stats.percentile(0) == 0.01
+    assert stats.percentile(50) == pytest.approx(0.51)
+    assert stats.percentile(95) == pytest.approx(0.95)
+    assert stats.percentile(99) == pytest.approx(0.99)
+    assert stats.percentile(100) == 1.0
+    assert "Latency p50 / p95 / p99: 0.510s / 0.950s / 0.990s\n" in str(stats)
+
+
+def test_percentiles_of_the_latest_requests():
+    stats: game.LLMStats = game.LLMStats(window=10)
+    for latency in [100.0] * 50 + [1.0] * 10:
+        stats.record(latency)
+
+    assert stats.requests == 60
+    assert stats.percentile(99) == 1.0
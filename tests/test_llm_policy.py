@@ -0,0 +1,121 @@
+"""
+This file contains tests of the AI player deciding with the LLM, with fake backends instead of Ollama. The fallback
+policy declines everything, so that the decisions of the LLM (which says yes) can be told apart from it.
+"""
+
+
+import threading
+import time
+
+import pytest
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+class FakeBackend:
+    # Answering every prompt with the given answer, after waiting for the release event if one is given, or failing
+    # if the answer is an exception.
+    model: str = "fake"
+
+    def __init__(self, answer="YES", release=None):
+        self.answer = answer
+        self.release: threading.Event or None = release
+        self.prompts: list = []
+
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        if self.release is not None:
+            self.release.wait(10)
+        if isinstance(self.answer, Exception):
+            raise self.answer
+        return self.answer, len(prompt), 1
+
+
+@pytest.fixture
+def place():
+    game_data, places, upgrades = game.create_new_game("Player", game.GameSettings(), 0)
+    return game_data, places[0]
+
+
+def create_policy(backend, deadline=5.0):
+    return game.LLMPolicy(game.LLMClient(backend), game.DecisionPolicy(), deadline=deadline)
+
+
+def test_waits_for_decision_then_reuses_it(place):
+    game_data, subject = place
+    backend: FakeBackend = FakeBackend("YES")
+    policy: game.LLMPolicy = create_policy(backend)
+    assert policy.decide_buy_place(game_data, game_data.ai_player, subject)
+    assert policy.decide_buy_place(game_data, game_data.ai_player, subject)
+    policy.close()
+
+    assert len(backend.prompts) == 1
+    assert (policy.stats.requests, policy.stats.waits, policy.stats.cache_hits, policy.stats.fallbacks) == (2, 1, 1, 0)
+    assert "Cache Hits: 1\n" in str(policy.stats)
+
+
+def test_missed_deadline_falls_back_and_caches_late_answer(place):
+    game_data, subject = place
+    release: threading.Event = threading.Event()
+    backend: FakeBackend = FakeBackend("YES", release)
+    policy: game.LLMPolicy = create_policy(backend, deadline=0.05)
+    assert not policy.decide_buy_place(game_data, game_data.ai_player, subject)
+    assert (policy.stats.fallbacks, policy.stats.waits) == (1, 0)
+    assert policy.stats.percentile(100) < 1.0
+
+    # The answer arriving after the deadline decides the next time.
+    release.set()
+    for _ in range(100):
+        if policy.decide_buy_place(game_data, game_data.ai_player, subject):
+            break
+    policy.close()
+
+    assert len(backend.prompts) == 1
+    assert policy.stats.cache_hits + policy.stats.waits == 1
+
+
+@pytest.mark.parametrize("answer", [ConnectionError("The server is down"), "Maybe later.", ""])
+def test_failed_or_unclear_answer_falls_back(place, answer):
+    game_data, subject = place
+    policy: game.LLMPolicy = create_policy(FakeBackend(answer))
+    assert not policy.decide_buy_place(game_data, game_data.ai_player, subject)
+    assert not policy.decide_buy_place(game_data, game_data.ai_player, subject)
+    policy.close()
+
+    # Nothing is cached, so the LLM is asked again.
+    assert (policy.stats.requests, policy.stats.fallbacks, policy.stats.cache_hits) == (2, 2, 0)
+    assert policy.llm.stats.requests == 2
+
+
+def test_upgrade_shop_decision():
+    game_data, places, upgrades = game.create_new_game("Player", game.GameSettings(), 0)
+    upgrade_shop: game.UpgradeShop = game_data.board.get_shops()[0]
+    policy: game.LLMPolicy = create_policy(FakeBackend("I buy upgrade 2."))
+    assert policy.choose_upgrade(game_data, game_data.ai_player, upgrade_shop) is upgrades[1]
+    policy.close()
+
+    policy = create_policy(FakeBackend("NONE"))
+    assert policy.choose_upgrade(game_data, game_data.ai_player, upgrade_shop) is None
+    policy.close()
+
+
+def test_prefetched_decisions_are_cache_hits():
+    game_data, places, upgrades = game.create_new_game("Player", game.GameSettings(), 0)
+    player: game.Player = game_data.ai_player
+    tiles: list = game_data.board.get_tiles()
+    player.location = next(i for i in range(len(tiles) - 6) if isinstance(tiles[i + 1], game.Place))
+    backend: FakeBackend = FakeBackend("YES, 1")  # an answer to both questions, in case a shop is in reach
+    policy: game.LLMPolicy = create_policy(backend)
+    assert policy.prefetch(game_data, player) > 0
+    for _ in range(1000):
+        if policy.prefetch(game_data, player) == 0:  # every decision has been made
+            break
+        time.sleep(0.01)
+
+    # Landing on the next tile with the gold the player was expected to have by then, the LLM is not asked again.
+    backend.answer = ConnectionError("The server is down")
+    player.gold = player.gold + player.get_gold_per_turn()
+    assert policy.decide_buy_place(game_data, player, tiles[player.location + 1])
+    policy.close()
+    assert len(backend.prompts) == len(set(backend.prompts))
+    assert (policy.stats.cache_hits, policy.stats.waits, policy.stats.fallbacks) == (1, 0, 0)
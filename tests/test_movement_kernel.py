@@ -0,0 +1,45 @@
+"""
+This file contains tests of the NumPy movement kernel of the balance simulator against moving players one at a time
+with Player.roll_dice().
+"""
+
+
+import pytest
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+np = pytest.importorskip("numpy")
+
+
+SEEDS: list = [0, 1, 2]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_kernel_moves_like_roll_dice(seed):
+    comparison: dict = game.compare_movement_kernel(seed=seed)
+    assert comparison["location_p_value"] >= game.MOVEMENT_KERNEL_MIN_P_VALUE, comparison
+    assert comparison["laps_p_value"] >= game.MOVEMENT_KERNEL_MIN_P_VALUE, comparison
+    assert comparison["mean_kernel_laps"] == pytest.approx(comparison["mean_scalar_laps"], rel=0.01)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_kernel_bookkeeping(seed):
+    # Every player has moved the sum of its dice values, and every step lands every player on one tile.
+    rng = np.random.default_rng(seed)
+    board_lengths = np.array([7, 37, 120])
+    tile_types = rng.integers(game.EmptySpace.TILE_TYPE, game.UpgradeShop.TILE_TYPE + 1,
+                              size=(len(board_lengths), int(board_lengths.max())), dtype=np.int8)
+    tile_types[:, 0] = game.StartTile.TILE_TYPE
+    kernel: game.MovementKernel = game.MovementKernel(tile_types, board_lengths, np.repeat(np.arange(3), 50), rng)
+    moved = np.zeros(len(kernel.locations), dtype=np.int64)
+    for _ in range(200):
+        dice_values, passed_start, landed_types = kernel.step()
+        assert dice_values.min() >= 1 and dice_values.max() <= 6
+        assert (landed_types == tile_types[kernel.player_boards, kernel.locations]).all()
+        moved += dice_values
+
+    player_board_lengths = board_lengths[kernel.player_boards]
+    assert (kernel.laps * player_board_lengths + kernel.locations == moved).all()
+    assert (kernel.locations < player_board_lengths).all()
+    assert kernel.landings.sum() == 200 * len(kernel.locations)
+    assert kernel.landings_by_type.sum() == 200 * len(kernel.locations)
@@ -0,0 +1,36 @@
+"""
+This file contains tests of the persistent pool of LLM generated names.
+"""
+
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+class FailingLLM:
+    def invoke(self, prompt):
+        raise AssertionError("The LLM must not be asked when the name pool covers the board")
+
+
+def draw_names(file_name, count):
+    names: list = [None] * count
+    name_pool: game.NamePool = game.NamePool.load(file_name)
+
+    def on_response(index, name):
+        names[index] = name
+
+    game.generate_names_with_pool(FailingLLM(), "model", name_pool, ["prompt"] * count, on_response)
+    return names
+
+
+def test_drawn_names_rotate_across_processes(tmp_path):
+    file_name: str = str(tmp_path / game.NAME_POOL_FILE_NAME)
+    name_pool: game.NamePool = game.NamePool(file_name)
+    for i in range(6):
+        name_pool.add("model", "prompt", "Name" + str(i))
+    name_pool.save()
+
+    # Every call loads the pool again like a new game would, so the order the names were used in must be saved
+    # even though no name was asked from the LLM.
+    assert draw_names(file_name, 3) == ["Name0", "Name1", "Name2"]
+    assert draw_names(file_name, 3) == ["Name3", "Name4", "Name5"]
+    assert draw_names(file_name, 3) == ["Name0", "Name1", "Name2"]
@@ -0,0 +1,118 @@
+"""
+This file contains tests of the catalog of the saved games.
+"""
+
+
+import os
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+def save_game(directory, player_name, seed=0):
+    settings: game.GameSettings = game.GameSettings()
+    game_data, _, _ = game.create_new_game(player_name, settings, seed)
+    file_name: str = os.path.join(directory, player_name)
+    game.save_game_data(game_data, file_name)
+    return game_data, settings, file_name
+
+
+def test_replay_traces_and_journals_are_not_catalogued(tmp_path, monkeypatch):
+    game_data, settings, file_name = save_game(str(tmp_path), "Player")
+    journal: game.AutosaveJournal = game.AutosaveJournal(file_name)
+    journal.snapshot(game_data)
+    journal.close()
+    game.ReplayRecorder(file_name + game.REPLAY_FILE_SUFFIX).start(game_data, settings)
+    assert sorted(os.listdir(str(tmp_path))) == ["Player", "Player" + game.JOURNAL_FILE_SUFFIX,
+                                                 "Player" + game.REPLAY_FILE_SUFFIX]
+    assert game.list_saved_games(str(tmp_path)) == ["Player"]
+
+    catalog_file_name: str = str(tmp_path / game.CATALOG_FILE_NAME)
+    catalog: game.SaveCatalog = game.SaveCatalog.load(catalog_file_name)
+    assert len(catalog) == 1 and catalog.lookup("Player")["turn"] == 0
+    assert catalog.rebuild(str(tmp_path)) == []
+    assert not game.SaveCatalog.load(catalog_file_name).refresh(str(tmp_path))
+
+    monkeypatch.setattr(game.sys, "argv", ["rebuild_catalog", str(tmp_path)])
+    assert game.rebuild_catalog() == 0
+
+
+def save_games(directory, count):
+    # Saving games in which the turn of game i is 10 * ((7 * i) % count), so that the order of the turns is not the
+    # order of the names.
+    for i in range(count):
+        game_data, _, _ = game.create_new_game("Player" + str(i), game.GameSettings(), i)
+        game_data.turn = 10 * ((7 * i) % count)
+        game.save_game_data(game_data, os.path.join(directory, "Player" + str(i)))
+
+
+def test_lookup_sort_and_pages(tmp_path):
+    save_games(str(tmp_path), 25)
+    catalog: game.SaveCatalog = game.SaveCatalog.load(str(tmp_path / game.CATALOG_FILE_NAME))
+    assert len(catalog) == 25
+    assert catalog.lookup("Player3")["turn"] == 10 * 21
+    assert catalog.lookup("Player3")["file_size"] == os.path.getsize(str(tmp_path / "Player3"))
+    assert catalog.lookup("Nobody") is None
+
+    assert catalog.get_page_count(page_size=10) == 3
+    pages: list = [catalog.get_page(page, "turn", reverse=False, page_size=10) for page in range(4)]
+    assert [len(page) for page in pages] == [10, 10, 5, 0]
+    turns: list = [entry["turn"] for page in pages for entry in page]
+    assert turns == sorted(turns) == [10 * i for i in range(25)]
+    descending: list = [entry["player_name"] for page in range(3)
+                        for entry in catalog.get_page(page, "turn", reverse=True, page_size=10)]
+    assert descending == [entry["player_name"] for page in pages for entry in page][::-1]
+
+    # Entries with the same key are ordered by name.
+    catalog.update(dict(catalog.lookup("Player1"), turn=0))
+    assert [entry["player_name"] for entry in catalog.get_page(0, "turn", reverse=False, page_size=2)] == \
+        ["Player0", "Player1"]
+
+
+def test_catalog_is_saved_and_loaded(tmp_path):
+    save_games(str(tmp_path), 5)
+    catalog_file_name: str = str(tmp_path / game.CATALOG_FILE_NAME)
+    catalog: game.SaveCatalog = game.SaveCatalog.load(catalog_file_name)
+    assert os.path.exists(catalog_file_name)
+    assert game.SaveCatalog.load(catalog_file_name).get_page(0, "turn") == catalog.get_page(0, "turn")
+
+
+def test_refresh_reads_only_changed_games(tmp_path, monkeypatch):
+    directory: str = str(tmp_path)
+    save_games(directory, 5)
+    catalog: game.SaveCatalog = game.SaveCatalog.load(str(tmp_path / game.CATALOG_FILE_NAME))
+    read: list = []
+    read_save_summaries = game.read_save_summaries
+
+    def recording_read_save_summaries(file_names):
+        read.extend(os.path.basename(file_name) for file_name in file_names)
+        return read_save_summaries(file_names)
+
+    monkeypatch.setattr(game, "read_save_summaries", recording_read_save_summaries)
+    assert not catalog.refresh(directory)
+    assert read == []
+
+    # Adding a game.
+    game_data, _, _ = save_game(directory, "Newcomer", seed=9)
+    assert catalog.refresh(directory)
+    assert read == ["Newcomer"] and len(catalog) == 6
+    assert catalog.lookup("Newcomer")["turn"] == 0
+
+    # Modifying a game.
+    game_data.turn = 500
+    game.save_game_data(game_data, os.path.join(directory, "Newcomer"))
+    modified_time: float = catalog.lookup("Newcomer")["last_played"] + 10
+    os.utime(os.path.join(directory, "Newcomer"), (modified_time, modified_time))
+    read.clear()
+    assert catalog.refresh(directory)
+    assert read == ["Newcomer"]
+    assert catalog.lookup("Newcomer")["turn"] == 500
+    assert catalog.get_page(0, "turn", reverse=True)[0]["player_name"] == "Newcomer"
+
+    # Deleting a game.
+    os.remove(os.path.join(directory, "Player2"))
+    read.clear()
+    assert catalog.refresh(directory)
+    assert read == [] and len(catalog) == 5
+    assert catalog.lookup("Player2") is None
+    assert "Player2" not in [entry["player_name"] for entry in catalog.get_page(0, "turn")]
+    assert not catalog.refresh(directory)
@@ -0,0 +1,174 @@
+"""
+This file contains tests of the binary format of saved games and of importing saved games of the first version.
+"""
+
+
+import os
+import pickle
+import struct
+
+import pytest
+from mpmath import mpf
+
+import legacy_game
+from ollama_cli_board_game import ollama_cli_board_game as game
+from ollama_cli_board_game.ollama_cli_board_game import BigNumber
+
+
+def create_played_game(turns=200, seed=3):
+    game_data, places, upgrades = game.create_new_game("Player", game.GameSettings(), seed)
+    for i, named in enumerate(places + upgrades):
+        named.name = "Name" + str(i)
+
+    game_data.resume_random()
+    policy: game.RandomPolicy = game.RandomPolicy()
+    for _ in range(turns):
+        game.play_turn(game_data, policy, policy)
+
+    return game_data
+
+
+def describe(game_data):
+    # The saved state of the game together with everything the state leaves out.
+    return (game.describe_game_state(game_data), sorted(game_data.board.get_names()), game_data.seed,
+            [(player.name, player.player_id, player.get_gold_per_turn(), player.get_exp_per_turn())
+             for player in [game_data.player_data, game_data.ai_player]])
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_round_trip(tmp_path, compress, lazy):
+    game_data: game.SavedGameData = create_played_game()
+    file_name: str = str(tmp_path / "Player")
+    game.save_game_data(game_data, file_name, compress=compress)
+    loaded_game_data: game.SavedGameData = game.load_game_data(file_name, lazy=lazy)
+    assert describe(loaded_game_data) == describe(game_data)
+
+    # Saving the loaded game again writes the same file.
+    game.save_game_data(loaded_game_data, str(tmp_path / "Again"), compress=compress)
+    with open(file_name, "rb") as f, open(str(tmp_path / "Again"), "rb") as g:
+        assert f.read() == g.read()
+
+
+def write_modified(tmp_path, modify):
+    game_data: game.SavedGameData = create_played_game(turns=20)
+    file_name: str = str(tmp_path / "Player")
+    game.save_game_data(game_data, file_name, compress=False)
+    with open(file_name, "rb") as f:
+        data: bytearray = bytearray(f.read())
+
+    modify(data)
+    with open(file_name, "wb") as f:
+        f.write(data)
+
+    return file_name
+
+
+def test_newer_version_is_rejected(tmp_path):
+    file_name: str = write_modified(tmp_path, lambda data: struct.pack_into("<H", data, len(game.SAVE_FILE_MAGIC),
+                                                                            game.SAVE_FILE_VERSION + 1))
+    with pytest.raises(ValueError, match="newer version"):
+        game.load_game_data(file_name)
+
+
+@pytest.mark.parametrize("section", ["static", "state"])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_corrupted_section_is_rejected(tmp_path, section, lazy):
+    def flip_byte(data):
+        header: tuple = game.SAVE_FILE_HEADER.unpack_from(data, 0)
+        offset, length = (header[5], header[6]) if section == "static" else (header[7], header[8])
+        data[offset + length // 2] ^= 0xFF
+
+    with pytest.raises(ValueError, match="corrupted"):
+        game.load_game_data(write_modified(tmp_path, flip_byte), lazy=lazy)
+
+
+def test_legacy_save_is_imported(tmp_path):
+    legacy_game_data: legacy_game.SavedGameData = legacy_game.create_legacy_game("Player", seed=5, tile_count=100)
+    legacy_game_data.turn = 42
+    places: list = legacy_game.get_places(legacy_game_data)
+    legacy_game_data.player_data.buy_place(places[0])
+    legacy_game_data.player_data.buy_place(places[1])
+    legacy_game_data.ai_player.buy_place(places[2])
+    upgrade_shop: legacy_game.UpgradeShop = next(tile for tile in legacy_game_data.board.get_tiles()
+                                                 if isinstance(tile, legacy_game.UpgradeShop))
+    legacy_game_data.player_data.buy_upgrade(upgrade_shop.get_upgrades_sold()[0])
+    file_name: str = str(tmp_path / "Player")
+    with open(file_name, "wb") as f:
+        pickle.dump(legacy_game_data, f)
+
+    game_data: game.SavedGameData = game.load_game_data(file_name)
+    assert game_data.turn == 42
+    assert isinstance(game_data.start_bonus, BigNumber)
+    assert game_data.start_bonus == BigNumber(legacy_game_data.start_bonus)
+    assert game_data.player_data.gold == BigNumber(legacy_game_data.player_data.gold)
+    tiles: list = game_data.board.get_tiles()
+    owned: list = game_data.player_data.get_owned_list()
+    assert [place.name for place in owned] == [places[0].name, places[1].name]
+    assert all(any(tile is place for tile in tiles) and place.owner is game_data.player_data for place in owned)
+    assert game_data.player_data.get_gold_per_turn() == \
+        (BigNumber(places[0].gold_per_turn) + BigNumber(places[1].gold_per_turn)) * \
+        BigNumber(legacy_game_data.player_data.get_upgrade_list()[0].gold_gain_multiplier)
+    assert game_data.ai_player.get_gold_per_turn() == BigNumber(places[2].gold_per_turn)
+    assert game_data.seed is not None
+
+    # The next save is written in the new format.
+    game.save_game_data(game_data, file_name)
+    with open(file_name, "rb") as f:
+        assert f.read(len(game.SAVE_FILE_MAGIC)) == game.SAVE_FILE_MAGIC
+    assert describe(game.load_game_data(file_name)) == describe(game_data)
+
+
+def test_legacy_save_cannot_run_code(tmp_path):
+    file_name: str = str(tmp_path / "Player")
+    with open(file_name, "wb") as f:
+        pickle.dump(os.system, f)
+
+    with pytest.raises(pickle.UnpicklingError):
+        game.load_game_data(file_name)
+
+
+def test_legacy_numbers_are_converted_exactly():
+    for value in [mpf("1e100000"), mpf(123456789) / 7, mpf("0")]:
+        assert BigNumber(value).to_mpf() == value
+
+
+def test_legacy_duplicated_ownership_is_repaired(tmp_path):
+    # The first version left an acquired place in the list of its previous owner too, and a list could hold a place
+    # twice.
+    legacy_game_data: legacy_game.SavedGameData = legacy_game.create_legacy_game("Player", seed=6, tile_count=100)
+    places: list = legacy_game.get_places(legacy_game_data)
+    player, ai_player = legacy_game_data.player_data, legacy_game_data.ai_player
+    player.buy_place(places[0])
+    player.buy_place(places[1])
+    player.buy_place(places[2])
+    ai_player.acquire_place(places[0], player)
+    player.get_owned_list().append(places[1])
+    ai_player.buy_place(places[3])
+    ai_player.get_owned_list().append(places[3])
+    assert [place.name for place in player.get_owned_list()] == [places[i].name for i in [0, 1, 2, 0, 1]]
+    file_name: str = str(tmp_path / "Player")
+    with open(file_name, "wb") as f:
+        pickle.dump(legacy_game_data, f)
+
+    game_data: game.SavedGameData = game.load_game_data(file_name)
+    players: list = [game_data.player_data, game_data.ai_player]
+    tiles: list = game_data.board.get_tiles()
+    for tile in tiles:
+        if isinstance(tile, game.Place):
+            owners: list = [player for player in players if tile in player.get_owned_places()]
+            assert owners == ([] if tile.owner is None else [tile.owner])
+
+    assert [place.name for place in game_data.player_data.get_owned_list()] == [places[1].name, places[2].name]
+    assert [place.name for place in game_data.ai_player.get_owned_list()] == [places[0].name, places[3].name]
+    assert game_data.player_data.get_gold_per_turn() == \
+        BigNumber(places[1].gold_per_turn) + BigNumber(places[2].gold_per_turn)
+    assert game_data.player_data.get_exp_per_turn() == \
+        BigNumber(places[1].exp_per_turn) + BigNumber(places[2].exp_per_turn)
+    # The acquired place is counted once, at the level it was acquired at.
+    assert game_data.ai_player.get_gold_per_turn() == \
+        BigNumber(places[0].gold_per_turn) + BigNumber(places[3].gold_per_turn)
+    for player in players:
+        gold_per_turn: BigNumber = player.get_gold_per_turn()
+        player.recompute_income()
+        assert player.get_gold_per_turn() == gold_per_turn
@@ -0,0 +1,89 @@
+"""
+This file contains tests of the AI player searching the next turns, which makes its moves on the game itself and
+unmakes them.
+"""
+
+
+import pytest
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+SEEDS: list = [0, 1, 2]
+
+
+def snapshot(game_data):
+    # Everything a search could change: the saved state, the objects the players own in their order, the income
+    # of the players, every place and the random numbers of the game.
+    players: list = [game_data.player_data, game_data.ai_player]
+    tiles: list = game_data.board.get_tiles()
+    return (game.describe_game_state(game_data),
+            [(player.get_state(), [id(place) for place in player.get_owned_list()],
+              [id(upgrade) for upgrade in player.get_upgrade_list()], player.get_gold_per_turn(),
+              player.get_exp_per_turn()) for player in players],
+            [(i, tiles[i].get_state()) for i in range(len(tiles)) if isinstance(tiles[i], game.Place)],
+            game_data.rng.getstate())
+
+
+class CheckingPolicy(game.DecisionPolicy):
+    # Deciding like the search policy and checking that the game is the same afterwards. The search policy falls
+    # back on the base policy, which draws no random numbers.
+    def __init__(self, search_policy):
+        self.search_policy: game.SearchPolicy = search_policy
+        self.decisions: int = 0
+
+    def __check(self, decide, game_data, player, tile):
+        before: tuple = snapshot(game_data)
+        decision = decide(game_data, player, tile)
+        assert snapshot(game_data) == before
+        self.decisions += 1
+        return decision
+
+    def decide_buy_place(self, game_data, player, place):
+        return self.__check(self.search_policy.decide_buy_place, game_data, player, place)
+
+    def decide_upgrade_place(self, game_data, player, place):
+        return self.__check(self.search_policy.decide_upgrade_place, game_data, player, place)
+
+    def decide_acquire_place(self, game_data, player, place):
+        return self.__check(self.search_policy.decide_acquire_place, game_data, player, place)
+
+    def choose_upgrade(self, game_data, player, upgrade_shop):
+        return self.__check(self.search_policy.choose_upgrade, game_data, player, upgrade_shop)
+
+
+def create_game(seed):
+    settings: game.GameSettings = game.GameSettings()
+    settings.tile_count_range = [40, 60]
+    game_data, _, _ = game.create_new_game("Player", settings, seed)
+    game_data.resume_random()
+    return game_data
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("time_budget", [60.0, 0.0005])
+def test_search_leaves_game_unchanged(seed, time_budget):
+    # A search running out of time stops in the middle of its moves, which are unmade all the same.
+    game_data: game.SavedGameData = create_game(seed)
+    policy: CheckingPolicy = CheckingPolicy(game.SearchPolicy(game.DecisionPolicy(), time_budget=time_budget,
+                                                              max_depth=2))
+    for _ in range(150):
+        game.play_turn(game_data, game.RandomPolicy(), policy)
+
+    assert policy.decisions > 10
+    assert policy.search_policy.nodes > 0
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_make_unmake_finds_what_copying_finds(seed):
+    # Searching with moves made and unmade decides like searching on deep copies of the game.
+    games: list = [create_game(seed), create_game(seed)]
+    policies: list = [game.SearchPolicy(game.RandomPolicy(), time_budget=60.0, max_depth=2, copy_state=copy_state)
+                      for copy_state in [False, True]]
+    for _ in range(40):
+        for game_data, policy in zip(games, policies):
+            game.play_turn(game_data, game.RandomPolicy(), policy)
+
+        assert game.describe_game_state(games[0]) == game.describe_game_state(games[1])
+
+    assert policies[0].nodes == policies[1].nodes > 0
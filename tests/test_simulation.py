@@ -0,0 +1,32 @@
+"""
+This file contains tests of the balance simulator playing games from seeds.
+"""
+
+
+import random
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+def test_games_depend_only_on_their_seeds():
+    settings: game.GameSettings = game.GameSettings()
+    results: list = [game.simulate_game(seed, settings, 300) for seed in [0, 1, 0]]
+    assert results[0] == results[2]
+    assert results[0] != results[1]
+
+    random.seed(7)
+    assert game.simulate_game(1, settings, 300) == results[1]
+
+
+def test_games_leave_global_random_numbers_alone():
+    random.seed(7)
+    expected: list = [random.random() for _ in range(5)]
+    random.seed(7)
+    game.simulate_game(0, game.GameSettings(), 100)
+    assert [random.random() for _ in range(5)] == expected
+
+
+def test_random_names_are_drawn_from_the_given_generator():
+    names: list = [game.generate_random_name(random.Random(3)) for _ in range(2)]
+    assert names[0] == names[1]
+    assert 3 <= len(names[0]) <= 25 and names[0] == names[0].capitalize()
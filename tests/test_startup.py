@@ -0,0 +1,85 @@
+"""
+This file contains tests of the time the game takes to show its first prompt, with a stub Ollama server.
+"""
+
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+# Importing the game in a new interpreter, choosing the first model at the first prompt and printing the startup
+# timings at the second prompt, which is only shown once the model has been checked with the server.
+GAME_SCRIPT: str = """
+import builtins
+import json
+import os
+
+answers = iter(["1"])
+
+
+def scripted_input(prompt=""):
+    from ollama_cli_board_game import ollama_cli_board_game as game
+    for answer in answers:
+        return answer
+
+    print("STARTUP TIMINGS " + json.dumps(game.startup_timings), flush=True)
+    os._exit(0)
+
+
+builtins.input = scripted_input
+from ollama_cli_board_game import ollama_cli_board_game as game
+game.main()
+"""
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    requests: list = []
+
+    def __reply(self, data):
+        body: bytes = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        StubOllamaHandler.requests.append(("GET", self.path))
+        self.__reply({"models": [{"name": game.normalize_model_name(game.MODELS[0])}]})
+
+    def do_POST(self):
+        StubOllamaHandler.requests.append(("POST", self.path))
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.__reply({"response": "", "done": True})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_first_prompt_within_target(tmp_path):
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        run_directory = tmp_path / "run"
+        run_directory.mkdir()
+        environment: dict = dict(os.environ, OLLAMA_HOST="127.0.0.1:" + str(server.server_address[1]),
+                                 PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        output: str = subprocess.run([sys.executable, "-c", GAME_SCRIPT], cwd=str(run_directory), env=environment,
+                                     capture_output=True, text=True, timeout=60).stdout
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    lines: list = [line for line in output.splitlines() if line.startswith("STARTUP TIMINGS ")]
+    assert len(lines) == 1, output
+    startup_timings: dict = json.loads(lines[0][len("STARTUP TIMINGS "):])
+    assert startup_timings["first_prompt"] < game.STARTUP_TIME_TARGET
+    # The chosen model was checked over HTTP rather than with 'ollama list'.
+    assert ("GET", "/api/tags") in StubOllamaHandler.requests
@@ -0,0 +1,51 @@
+"""
+This file contains tests of writing files atomically, which saved games, the catalog and the caches go through.
+"""
+
+
+import os
+import threading
+
+import pytest
+
+from ollama_cli_board_game import ollama_cli_board_game as game
+
+
+def test_concurrent_writers(tmp_path):
+    file_name: str = str(tmp_path / "saved_game")
+    payloads: list = [bytes([i]) * (64 * 1024 + i) for i in range(8)]
+    errors: list = []
+
+    def write(payload):
+        try:
+            for _ in range(50):
+                game.write_file_atomically(file_name, payload)
+        except Exception as error:
+            errors.append(error)
+
+    threads: list = [threading.Thread(target=write, args=(payload,)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with open(file_name, "rb") as f:
+        assert f.read() in payloads
+    assert os.listdir(str(tmp_path)) == ["saved_game"]
+
+
+def test_failed_write_leaves_no_temporary_file(tmp_path, monkeypatch):
+    file_name: str = str(tmp_path / "saved_game")
+    game.write_file_atomically(file_name, b"old")
+
+    def failing_replace(source, destination):
+        raise OSError("The disk is full")
+
+    monkeypatch.setattr(game.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        game.write_file_atomically(file_name, b"new")
+
+    with open(file_name, "rb") as f:
+        assert f.read() == b"old"
+    assert os.listdir(str(tmp_path)) == ["saved_game"]